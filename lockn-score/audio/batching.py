@@ -0,0 +1,131 @@
+"""Cross-stream micro-batched PANNs inference.
+
+With one `BounceDetector` per table microphone, every stream calls the
+model with a batch of one on each 50 ms hop. On CPU the per-call overhead
+(framework dispatch, feature extraction setup, small-matrix kernels)
+dominates, so N mics cost close to N times one mic.
+
+`BatchInferenceServer` owns a single model shared by many detectors.
+Detectors submit their ready window and block; a worker thread takes the
+first pending window, keeps gathering until `max_batch` windows are
+queued or `max_wait_seconds` has passed, stacks them (waveforms, or mel
+matrices, see `features`) into one batch, runs the model once and hands
+each caller its row of clipwise scores. Streams hop in lockstep (same block and hop
+size), so in steady state one batch carries a window from every mic.
+
+The deadline bounds the latency added to a stream that finds no partner
+and should stay well below the hop.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from .config import AudioConfig, DEFAULT_CONFIG
+
+
+class BatchInferenceServer:
+    """Shared model runner that batches windows submitted by many streams.
+
+    Example:
+        server = BatchInferenceServer.from_config(cfg)
+        detectors = [BounceDetector(cfg, server=server) for _ in mics]
+        ...
+        server.close()
+    """
+
+    def __init__(self, model: Any, max_batch: int = 8, max_wait_seconds: float = 0.005):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self._requests: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Counters for tuning max_batch / max_wait_seconds.
+        self.batches = 0
+        self.windows = 0
+
+    @classmethod
+    def from_config(cls, config: AudioConfig = DEFAULT_CONFIG, device: Optional[str] = None) -> "BatchInferenceServer":
+        from .detector import load_model
+
+        return cls(
+            load_model(config, device),
+            max_batch=config.batch_max_size,
+            max_wait_seconds=config.batch_max_wait_seconds,
+        )
+
+    @property
+    def mean_batch(self) -> float:
+        return self.windows / self.batches if self.batches else 0.0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="panns-batch", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, window: np.ndarray) -> "Future[np.ndarray]":
+        """Queue a 1-D window; the future resolves to its clipwise scores."""
+        self.start()
+        future: "Future[np.ndarray]" = Future()
+        self._requests.put((window, future))
+        return future
+
+    def infer(self, window: np.ndarray) -> np.ndarray:
+        """Clipwise scores for `window`, batched with other streams' windows."""
+        return self.submit(window).result()
+
+    def _gather(self, first: Tuple[np.ndarray, Future]) -> Tuple[List[Tuple[np.ndarray, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._requests.get(timeout=timeout) if timeout > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch, stopping = self._gather(first)
+            # Windows may be views into the callers' rings; stacking copies
+            # them while the callers are blocked on their futures.
+            windows = np.stack([window for window, _ in batch])
+            try:
+                clipwise_output, _ = self.model.inference(windows)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.windows += len(batch)
+            for row, (_, future) in enumerate(batch):
+                future.set_result(clipwise_output[row])
+        # Fail anything still queued after close.
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request[1].set_exception(RuntimeError("inference server closed"))
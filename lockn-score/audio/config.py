@@ -36,6 +36,42 @@ class AudioConfig:
     # Model choice
     model_name: str = "Cnn6"  # alternatives: "Cnn14", "Wavegram_Logmel_Cnn14"
 
+    # Inference runtime: "torch" (panns_inference) or "onnx" (a model
+    # exported by onnx_backend, optionally int8-quantized; CPU only, no
+    # torch import). onnx_threads bounds ONNX Runtime's intra-op threads
+    # per model; one per mic leaves cores for the other streams.
+    backend: str = "torch"
+    onnx_path: str = ""
+    onnx_threads: int = 1
+
+    # PANNs log-mel front end; must match the checkpoint. With
+    # incremental_features the detector computes it itself, reusing the
+    # frames shared by overlapping windows (see features.LogMelStream).
+    mel_n_fft: int = 1024
+    mel_hop: int = 320
+    mel_bins: int = 64
+    mel_fmin: float = 50.0
+    mel_fmax: float = 14000.0
+    incremental_features: bool = True
+
+    # Onset pre-gate (see onset.OnsetGate): only windows holding an energy
+    # onset within the last window_seconds are run through the model. A
+    # hop is an onset when a onset_frame_seconds frame of high-passed
+    # energy exceeds onset_ratio x the background (tracked over about
+    # onset_background_seconds) and onset_floor. Lower ratio = more
+    # sensitive.
+    onset_gate: bool = True
+    onset_ratio: float = 6.0
+    onset_floor: float = 1e-7
+    onset_frame_seconds: float = 0.005
+    onset_background_seconds: float = 1.0
+
+    # Cross-stream batching (see batching.BatchInferenceServer): windows
+    # from many mics are stacked into one model call of up to
+    # batch_max_size, waiting at most batch_max_wait_seconds for partners.
+    batch_max_size: int = 8
+    batch_max_wait_seconds: float = 0.005
+
     # Target AudioSet labels used for bounce detection.
     # "Basketball bounce" is the closest explicit class. We add impact
     # sounds to improve recall in noisy environments.
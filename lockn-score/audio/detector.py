@@ -14,27 +14,33 @@ Fine-tuning approach (recommended for higher precision):
    from the audioset_tagging_cnn repo. Replace last layer with
    bounce/no-bounce classes and fine-tune with your dataset.
 3) Export fine-tuned checkpoint and load it here.
+
+Several detectors (one per table mic) can share one model through a
+`batching.BatchInferenceServer`, which runs their windows as one batch.
+With `incremental_features` the log-mel front end runs here, computing
+only the frames each hop adds (`features.LogMelStream`), and the model
+is fed the mel matrix. With `onset_gate`, windows without an energy
+onset are not inferred at all (`onset.OnsetGate`).
+
+`AudioConfig.backend` picks the runtime: "torch" runs panns_inference,
+"onnx" runs an exported (optionally int8) model on ONNX Runtime
+(`onnx_backend`). torch is only imported by the torch backend.
 """
 from __future__ import annotations
 
 import time
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
 import numpy as np
 
-try:
-    import torch
-    from panns_inference import AudioTagging, labels as panns_labels
-except Exception as exc:  # pragma: no cover
-    torch = None  # type: ignore
-    AudioTagging = None  # type: ignore
-    panns_labels = None  # type: ignore
-    _panns_error = exc
-else:
-    _panns_error = None
-
 from .config import AudioConfig, DEFAULT_CONFIG
+from .features import LogMelStream, strip_front_end
+from .onset import OnsetGate
+from .ring import SampleRing
+
+if TYPE_CHECKING:
+    from .batching import BatchInferenceServer
 
 
 @dataclass
@@ -43,64 +49,128 @@ class BounceEvent:
     score: float
 
 
+def _panns():
+    # Imported on first use: torch alone takes seconds to import, and the
+    # ONNX backend does not need it.
+    try:
+        import panns_inference
+        import torch
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError(
+            f"panns_inference not available: {exc}. "
+            "Install with: pip install panns-inference torch torchaudio"
+        ) from exc
+    return panns_inference, torch
+
+
+def default_device(config: AudioConfig = DEFAULT_CONFIG) -> str:
+    if config.backend == "onnx":
+        return "cpu"
+    _, torch = _panns()
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_model(config: AudioConfig = DEFAULT_CONFIG, device: Optional[str] = None):
+    """Load the tagging model selected by `config.backend`."""
+    if config.backend == "onnx":
+        if not config.onnx_path:
+            raise ValueError("AudioConfig.onnx_path is required for the onnx backend")
+        from .onnx_backend import OnnxTagging
+
+        return OnnxTagging(config.onnx_path, threads=config.onnx_threads)
+    if config.backend != "torch":
+        raise ValueError(f"unknown audio backend {config.backend!r}")
+    panns_inference, _ = _panns()
+    return panns_inference.AudioTagging(
+        checkpoint_path=None, device=device or default_device(config), model_type=config.model_name
+    )
+
+
+def model_labels(model) -> List[str]:
+    """Class names of `model`'s clipwise output."""
+    labels = getattr(model, "labels", None)
+    if labels is None:
+        labels = _panns()[0].labels
+    return list(labels)
+
+
 class BounceDetector:
-    def __init__(self, config: AudioConfig = DEFAULT_CONFIG, device: Optional[str] = None):
+    def __init__(
+        self,
+        config: AudioConfig = DEFAULT_CONFIG,
+        device: Optional[str] = None,
+        server: Optional["BatchInferenceServer"] = None,
+    ):
         self.config = config
-        self.device = device or ("cuda" if torch and torch.cuda.is_available() else "cpu")
+        self.device = device or default_device(config)
 
-        if AudioTagging is None:
-            raise RuntimeError(
-                f"panns_inference not available: {_panns_error}. "
-                "Install with: pip install panns-inference torch torchaudio"
-            )
-
-        # Load PANNs model
-        self.model = AudioTagging(checkpoint_path=None, device=self.device, model_type=self.config.model_name)
-        self.label_map = {name: idx for idx, name in enumerate(panns_labels)}
+        # Load PANNs model, or share the server's (it runs our windows).
+        self.server = server
+        self.model = server.model if server is not None else load_model(config, self.device)
+        self.label_map = {name: idx for idx, name in enumerate(model_labels(self.model))}
         self.target_indices = [
             self.label_map[name] for name in self.config.target_labels if name in self.label_map
         ]
         if not self.target_indices:
             raise RuntimeError("No target labels found in PANNs label list.")
 
-        self._buffer: List[np.ndarray] = []
-        self._buffer_samples: int = 0
         self._last_fire_time: float = -1.0
         self._samples_seen: int = 0
 
         self._window_samples = int(self.config.sample_rate * self.config.window_seconds)
         self._hop_samples = int(self.config.sample_rate * self.config.hop_seconds)
-
-    def _append_audio(self, audio: np.ndarray) -> None:
-        if audio.ndim > 1:
-            audio = audio.mean(axis=1)
-        self._buffer.append(audio.astype(np.float32, copy=False))
-        self._buffer_samples += len(audio)
+        # Pending audio never exceeds one window plus a hop: chunks are
+        # written piecewise and windows popped in between (see process_chunk).
+        self._ring = SampleRing(self._window_samples + self._hop_samples)
+        # Detectors sharing a server must agree on this: the shared model
+        # takes either waveforms or mel matrices. An exported ONNX model
+        # says which it was exported for.
+        takes_logmel = getattr(self.model, "takes_logmel", None)
+        if takes_logmel is None:
+            takes_logmel = config.incremental_features and strip_front_end(self.model)
+        self._features: Optional[LogMelStream] = None
+        if takes_logmel:
+            self._features = LogMelStream(config, self._window_samples, self._hop_samples)
+        self.gate: Optional[OnsetGate] = OnsetGate(config) if config.onset_gate else None
+
+    @property
+    def stream_time(self) -> float:
+        """Sample-clock time (seconds since stream start) of the newest sample received."""
+        return (self._samples_seen + self._ring.size) / self.config.sample_rate
 
     def _pop_window(self) -> Optional[np.ndarray]:
-        if self._buffer_samples < self._window_samples:
+        """View of the next window, advancing by one hop; valid until the next write."""
+        ring = self._ring
+        if ring.size < self._window_samples:
             return None
-        # Concatenate only as needed
-        data = np.concatenate(self._buffer)
-        window = data[: self._window_samples]
-        remaining = data[self._hop_samples :]
-        self._buffer = [remaining] if len(remaining) else []
-        self._buffer_samples = len(remaining)
+        window = ring.view(self._window_samples)
+        ring.consume(self._hop_samples)
         return window
 
     def process_chunk(self, audio: np.ndarray) -> List[BounceEvent]:
         """Process a chunk of audio and return any bounce detections."""
-        self._append_audio(audio)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
         events: List[BounceEvent] = []
+        written = 0
         while True:
+            # When no full window is pending the ring had room for the rest
+            # of the chunk, so every sample has been written once this exits.
+            written += self._ring.write(audio[written:])
             window = self._pop_window()
             if window is None:
                 break
-            # PANNs expects batch shape (1, samples)
-            window = window.reshape(1, -1)
-            with torch.no_grad():
-                _, clipwise_output = self.model.inference(window)
-            scores = clipwise_output[0]
+            if self.gate is not None:
+                # The first window is all new audio; after that, one hop.
+                new = window if self._samples_seen == 0 else window[-self._hop_samples :]
+                if not self.gate.admit(new):
+                    if self._features is not None:
+                        self._features.reset()  # the next admitted window is not consecutive
+                    self._samples_seen += self._hop_samples
+                    continue
+            if self._features is not None:
+                window = self._features.update(window)
+            scores = self._infer(window)
             score = float(np.max(scores[self.target_indices]))
 
             current_time = time.perf_counter()
@@ -112,6 +182,15 @@ class BounceDetector:
             self._samples_seen += self._hop_samples
         return events
 
+    def _infer(self, window: np.ndarray) -> np.ndarray:
+        """Clipwise scores of one window (samples, or a mel matrix)."""
+        if self.server is not None:
+            return self.server.infer(window)
+        # PANNs expects batch shape (1, samples), or (1, 1, frames, mel_bins)
+        # once its front end is stripped. inference() runs without autograd.
+        clipwise_output, _ = self.model.inference(window[None])
+        return clipwise_output[0]
+
 
 def detect_bounces_from_stream(stream: Iterable[np.ndarray], config: AudioConfig = DEFAULT_CONFIG) -> Iterable[BounceEvent]:
     detector = BounceDetector(config=config)
@@ -0,0 +1,141 @@
+"""Incremental log-mel front end for overlapping detector windows.
+
+PANNs models start with an STFT (`n_fft` 1024, hop 320, centred with
+reflect padding) and a 64-bin log-mel filterbank over each 1 s window.
+Consecutive windows overlap by 95%, so recomputing the front end from raw
+samples on every hop repeats almost all of it.
+
+`LogMelStream` keeps the log-mel matrix of the previous window. A frame
+whose `n_fft` span lies inside the window does not depend on where the
+window starts, so when the window advances by a whole number of STFT hops
+those interior frames shift up and only the frames over the new samples
+are computed. The few frames near each edge that read reflect padding are
+recomputed per window. The result matches a full recompute (up to float32
+rounding), and only about a tenth of the frames are transformed per hop
+at the default settings.
+
+`strip_front_end` replaces a loaded model's spectrogram and log-mel layers
+with identities so the backbone takes these matrices directly.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .config import AudioConfig, DEFAULT_CONFIG
+
+
+def _hz_to_mel(freqs: np.ndarray) -> np.ndarray:
+    # Slaney scale: linear below 1 kHz, logarithmic above.
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mels = freqs / (200.0 / 3)
+    log = freqs >= 1000.0
+    mels[log] = 15.0 + np.log(freqs[log] / 1000.0) / (np.log(6.4) / 27.0)
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    mels = np.asarray(mels, dtype=np.float64)
+    freqs = mels * (200.0 / 3)
+    log = mels >= 15.0
+    freqs[log] = 1000.0 * np.exp((np.log(6.4) / 27.0) * (mels[log] - 15.0))
+    return freqs
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, fmin: float, fmax: float) -> np.ndarray:
+    """Slaney-normalised mel filters, `(n_mels, n_fft // 2 + 1)`, as `librosa.filters.mel`."""
+    fft_freqs = np.linspace(0.0, sample_rate / 2, 1 + n_fft // 2)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel(np.array([fmin]))[0], _hz_to_mel(np.array([fmax]))[0], n_mels + 2))
+    fdiff = np.diff(mel_freqs)
+    ramps = np.subtract.outer(mel_freqs, fft_freqs)
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2 : n_mels + 2] - mel_freqs[:n_mels]))[:, None]
+    return weights.astype(np.float32)
+
+
+class LogMelStream:
+    """Log-mel matrix of consecutive windows, reusing their shared frames.
+
+    `update` expects the window that follows the previous one by
+    `hop_samples`; call `reset` when the stream restarts. The returned
+    `(1, frames, mel_bins)` array is reused by the next `update`.
+    """
+
+    def __init__(self, config: AudioConfig = DEFAULT_CONFIG, window_samples: int = 0, hop_samples: int = 0):
+        self.window_samples = window_samples or int(config.sample_rate * config.window_seconds)
+        hop_samples = hop_samples or int(config.sample_rate * config.hop_seconds)
+        self.n_fft = config.mel_n_fft
+        self.frame_hop = config.mel_hop
+        self.pad = self.n_fft // 2
+        if self.window_samples <= self.n_fft:
+            raise ValueError("window must be longer than mel_n_fft")
+        self.frames = 1 + self.window_samples // self.frame_hop
+        # Frames lo..hi read no padding; they are reusable across windows.
+        self._lo = -(-self.pad // self.frame_hop)
+        self._hi = (self.window_samples - self.pad) // self.frame_hop
+        # Frames shifted per hop; 0 (recompute everything) when the window
+        # does not advance by whole STFT hops.
+        self._shift = hop_samples // self.frame_hop if hop_samples % self.frame_hop == 0 else 0
+
+        n = np.arange(self.n_fft)
+        self._hann = (0.5 - 0.5 * np.cos(2 * np.pi * n / self.n_fft)).astype(np.float32)
+        self._mel_basis = np.ascontiguousarray(
+            mel_filterbank(config.sample_rate, self.n_fft, config.mel_bins, config.mel_fmin, config.mel_fmax).T
+        )
+        self._mel = np.zeros((1, self.frames, config.mel_bins), dtype=np.float32)
+        self._primed = False
+        self.frames_computed = 0
+
+    def reset(self) -> None:
+        self._primed = False
+
+    def _log_mel(self, samples: np.ndarray) -> np.ndarray:
+        """Log-mel rows of every `n_fft` frame of `samples`, stepping `frame_hop`."""
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.n_fft)[:: self.frame_hop]
+        spectrum = np.fft.rfft(frames * self._hann, axis=-1)
+        power = spectrum.real**2 + spectrum.imag**2
+        mel = power.astype(np.float32) @ self._mel_basis
+        self.frames_computed += len(frames)
+        return 10.0 * np.log10(np.maximum(mel, 1e-10))
+
+    def update(self, window: np.ndarray) -> np.ndarray:
+        """Log-mel matrix of `window`, the stream's next window."""
+        mel = self._mel[0]
+        hop, pad, lo, hi, shift = self.frame_hop, self.pad, self._lo, self._hi, self._shift
+        first = lo
+        if self._primed and 0 < shift <= hi - lo:
+            mel[lo : hi + 1 - shift] = mel[lo + shift : hi + 1]
+            first = hi + 1 - shift
+        mel[first : hi + 1] = self._log_mel(window[first * hop - pad : hi * hop + pad])
+
+        left = np.pad(window[: (lo - 1) * hop + pad + 1], (pad, 0), mode="reflect")
+        mel[:lo] = self._log_mel(left)
+        if hi + 1 < self.frames:
+            right = np.pad(window[(hi + 1) * hop - pad :], (0, pad), mode="reflect")
+            mel[hi + 1 :] = self._log_mel(right)
+        self._primed = True
+        return self._mel
+
+
+def strip_front_end(tagger: Any) -> bool:
+    """Make a loaded PANNs tagger (or bare model) take log-mel input; False if unsupported.
+
+    Idempotent, so detectors sharing one model may all call it. Models that
+    also read the raw waveform (Wavegram_Logmel_Cnn14) are left unchanged.
+    """
+    try:
+        import torch
+    except Exception:  # pragma: no cover
+        return False
+    model = getattr(tagger, "model", tagger)
+    model = getattr(model, "module", model)  # unwrap DataParallel
+    if hasattr(model, "pre_conv0"):
+        return False
+    if not (hasattr(model, "spectrogram_extractor") and hasattr(model, "logmel_extractor")):
+        return False
+    model.spectrogram_extractor = torch.nn.Identity()
+    model.logmel_extractor = torch.nn.Identity()
+    return True
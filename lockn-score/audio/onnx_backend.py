@@ -0,0 +1,150 @@
+"""ONNX Runtime backend for the bounce detector.
+
+The torch backend imports torch and panns_inference at startup (seconds)
+and runs fp32 on CPU when there is no GPU. This backend runs a PANNs model
+exported once with `export`, optionally with dynamic int8 quantization
+of its weights, on ONNX Runtime only.
+
+`OnnxTagging` mirrors `panns_inference.AudioTagging`: `inference(batch)`
+returns `(clipwise_output, embedding)` and `labels` names the classes. The
+class names and the expected input are stored in the model's metadata:
+an export with `logmel=True` (the default) leaves out the spectrogram and
+log-mel layers and takes the `(batch, 1, frames, mel_bins)` matrices from
+`features.LogMelStream`. Otherwise it takes `(batch, samples)` waveforms.
+
+Select it with `AudioConfig(backend="onnx", onnx_path=...)`. Export (needs
+torch, panns_inference, onnx and onnxruntime) from the lockn-score
+directory::
+
+    python -m audio.onnx_backend cnn6.int8.onnx [--waveform] [--no-quantize]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except Exception as exc:  # pragma: no cover - optional dependency
+    ort = None  # type: ignore
+    _onnxruntime_error = exc
+else:
+    _onnxruntime_error = None
+
+from .config import AudioConfig, DEFAULT_CONFIG
+
+LABELS_KEY = "lockn.labels"
+INPUT_KEY = "lockn.input"
+
+
+class OnnxTagging:
+    """Drop-in for `panns_inference.AudioTagging` running an exported model on CPU."""
+
+    def __init__(self, path: str, threads: int = 1):
+        if ort is None:
+            raise RuntimeError(
+                f"onnxruntime not available: {_onnxruntime_error}. "
+                "Install with: pip install onnxruntime"
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if LABELS_KEY not in meta:
+            raise ValueError(f"{path} was not exported by audio.onnx_backend (no {LABELS_KEY} metadata)")
+        self.labels = json.loads(meta[LABELS_KEY])
+        self.takes_logmel = meta.get(INPUT_KEY) == "logmel"
+        self._input = self.session.get_inputs()[0].name
+
+    def inference(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        clipwise_output, embedding = self.session.run(
+            None, {self._input: np.ascontiguousarray(audio, dtype=np.float32)}
+        )
+        return clipwise_output, embedding
+
+
+def export(
+    model: Any,
+    labels: Sequence[str],
+    path: str,
+    config: AudioConfig = DEFAULT_CONFIG,
+    logmel: bool = True,
+    quantize: bool = True,
+    opset: int = 17,
+) -> str:
+    """Export a PANNs model (`torch.nn.Module`) to ONNX at `path`.
+
+    With `logmel` the model's front end is stripped in place first (see
+    `features.strip_front_end`). With `quantize` the weights are stored as
+    int8 (`onnxruntime.quantization.quantize_dynamic`).
+    """
+    import onnx
+    import torch
+
+    from .features import LogMelStream, strip_front_end
+
+    model = getattr(model, "module", model).cpu().eval()
+    window = int(config.sample_rate * config.window_seconds)
+    if logmel:
+        if not strip_front_end(model):
+            raise ValueError(f"{type(model).__name__} cannot take log-mel input; export with logmel=False")
+        example = torch.zeros(1, 1, LogMelStream(config).frames, config.mel_bins)
+    else:
+        example = torch.zeros(1, window)
+
+    class Outputs(torch.nn.Module):
+        def __init__(self, inner: torch.nn.Module) -> None:
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, x):
+            output = self.inner(x)
+            return output["clipwise_output"], output["embedding"]
+
+    props = {LABELS_KEY: json.dumps(list(labels)), INPUT_KEY: "logmel" if logmel else "waveform"}
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = os.path.join(tmp, "model.onnx") if quantize else path
+        torch.onnx.export(
+            Outputs(model),
+            example,
+            fp32_path,
+            input_names=["input"],
+            output_names=["clipwise_output", "embedding"],
+            dynamic_axes={name: {0: "batch"} for name in ("input", "clipwise_output", "embedding")},
+            opset_version=opset,
+        )
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8)
+    # Set metadata last: quantization does not carry it over.
+    proto = onnx.load(path)
+    onnx.helper.set_model_props(proto, props)
+    onnx.save(proto, path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the configured PANNs model to ONNX.")
+    parser.add_argument("path", help="output .onnx file")
+    parser.add_argument("--waveform", action="store_true", help="keep the front end; take raw samples")
+    parser.add_argument("--no-quantize", action="store_true", help="keep fp32 weights")
+    args = parser.parse_args()
+
+    from .detector import load_model, model_labels
+
+    cfg = DEFAULT_CONFIG
+    tagger = load_model(cfg, device="cpu")
+    export(tagger.model, model_labels(tagger), args.path, cfg, logmel=not args.waveform, quantize=not args.no_quantize)
+    print(f"wrote {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Fixed-size float32 sample ring with contiguous zero-copy windows.
+
+`SampleRing` stores every sample twice, at `i` and `i + capacity` of one
+`2 * capacity` array (a mirrored ring). Any run of up to `capacity`
+pending samples is then a contiguous slice, so the detector can hand a
+window to the model as a view: no concatenation, no per-hop allocation.
+Each incoming sample is written twice, which is far cheaper than copying
+the whole window on every hop.
+
+A window view stays valid until the next `write`; consumed samples may
+be overwritten after that.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class SampleRing:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._start = 0  # index of the oldest pending sample, < capacity
+        self.size = 0  # pending samples
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.size
+
+    def write(self, samples: np.ndarray) -> int:
+        """Append as many of `samples` as fit; returns how many were written."""
+        capacity = self.capacity
+        free = capacity - self.size
+        n = len(samples)
+        if n > free:
+            samples = samples[:free]
+            n = free
+        if n <= 0:
+            return 0
+        data = self._data
+        pos = self._start + self.size
+        if pos >= capacity:
+            pos -= capacity
+        end = pos + n
+        if end <= capacity:
+            data[pos:end] = samples
+            data[pos + capacity : end + capacity] = samples
+        else:
+            first = capacity - pos
+            data[pos:capacity] = samples[:first]
+            data[pos + capacity :] = samples[:first]
+            data[: end - capacity] = samples[first:]
+            data[capacity:end] = samples[first:]
+        self.size += n
+        return n
+
+    def view(self, length: int) -> np.ndarray:
+        """The oldest `length` pending samples as a contiguous read-only view."""
+        if length > self.size:
+            raise ValueError(f"only {self.size} samples pending, {length} requested")
+        window = self._data[self._start : self._start + length]
+        window.flags.writeable = False
+        return window
+
+    def consume(self, count: int) -> None:
+        """Drop the oldest `count` pending samples."""
+        count = min(count, self.size)
+        self._start = (self._start + count) % self.capacity
+        self.size -= count
+
+    def clear(self) -> None:
+        self._start = 0
+        self.size = 0
@@ -0,0 +1 @@
+"""Micro-benchmarks for LockN Score hot paths."""
@@ -0,0 +1,107 @@
+"""Bounce detector backends: startup, per-hop latency and memory.
+
+Measures, each in a fresh process so startup and memory are not shared:
+
+- `torch`: panns_inference on torch (fp32 on CPU).
+- `onnx-fp32` / `onnx-int8`: the same model exported by
+  `audio.onnx_backend.export`, without and with dynamic int8 weights.
+
+Startup is the wall time to import `audio.detector` and load the model.
+Per-hop latency is the median `inference` time of one window in the
+shape the model takes (a log-mel matrix with `incremental_features`, raw
+samples otherwise), after warm-up. Memory is the process's peak RSS.
+
+Exports go to `--onnx-dir` (reused if present). Needs torch,
+panns-inference, onnx and onnxruntime. Run from the lockn-score
+directory::
+
+    python -m benchmarks.bench_audio_backend [--hops N] [--onnx-dir DIR] [--threads N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from typing import Dict
+
+
+def measure(backend: str, onnx_path: str, hops: int, threads: int) -> Dict[str, float]:
+    """Runs in the child process; see `main`."""
+    start = time.perf_counter()
+    from audio.config import DEFAULT_CONFIG
+    from audio.detector import load_model
+    from audio.features import LogMelStream, strip_front_end
+
+    cfg = replace(DEFAULT_CONFIG, backend=backend, onnx_path=onnx_path, onnx_threads=threads)
+    if backend == "torch":
+        import torch
+
+        torch.set_num_threads(threads)
+    model = load_model(cfg, device="cpu")
+    startup = time.perf_counter() - start
+
+    import resource
+
+    import numpy as np
+
+    takes_logmel = getattr(model, "takes_logmel", None)
+    if takes_logmel is None:
+        takes_logmel = cfg.incremental_features and strip_front_end(model)
+    window = np.random.default_rng(0).standard_normal(int(cfg.sample_rate * cfg.window_seconds)).astype(np.float32)
+    batch = (LogMelStream(cfg).update(window) if takes_logmel else window)[None]
+    for _ in range(5):
+        model.inference(batch)
+    times = []
+    for _ in range(hops):
+        t0 = time.perf_counter()
+        model.inference(batch)
+        times.append(time.perf_counter() - t0)
+    return {
+        "startup_s": startup,
+        "hop_ms": 1000 * float(np.median(times)),
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hops", type=int, default=200)
+    parser.add_argument("--onnx-dir", default="onnx-models")
+    parser.add_argument("--threads", type=int, default=1, help="intra-op threads per model")
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "ONNX_PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], args.child[1], args.hops, args.threads)))
+        return
+
+    from audio.config import DEFAULT_CONFIG
+    from audio.detector import load_model, model_labels
+    from audio.onnx_backend import export
+
+    os.makedirs(args.onnx_dir, exist_ok=True)
+    paths = {name: os.path.join(args.onnx_dir, f"{DEFAULT_CONFIG.model_name}.{name}.onnx") for name in ("fp32", "int8")}
+    for name, path in paths.items():
+        if not os.path.exists(path):
+            tagger = load_model(DEFAULT_CONFIG, device="cpu")
+            logmel = DEFAULT_CONFIG.incremental_features
+            export(tagger.model, model_labels(tagger), path, DEFAULT_CONFIG, logmel=logmel, quantize=name == "int8")
+
+    runs = {"torch": ("torch", ""), "onnx-fp32": ("onnx", paths["fp32"]), "onnx-int8": ("onnx", paths["int8"])}
+    for name, (backend, path) in runs.items():
+        command = [sys.executable, "-m", "benchmarks.bench_audio_backend", "--child", backend, path]
+        command += ["--hops", str(args.hops), "--threads", str(args.threads)]
+        stats = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+        print(
+            f"[{name:<9}] startup {stats['startup_s']:6.2f} s  hop {stats['hop_ms']:7.2f} ms  "
+            f"peak RSS {stats['rss_mb']:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
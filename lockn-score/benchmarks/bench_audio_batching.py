@@ -0,0 +1,102 @@
+"""PANNs inference throughput for N microphones: per-stream vs cross-stream batched.
+
+Runs `--mics` threads, one per table microphone, each feeding
+`--seconds` of synthetic 32 kHz audio through its own `BounceDetector` in
+`block_seconds` chunks as fast as it can, with:
+
+- `single`: every detector loads its own model and runs a batch of one per
+  hop, as the detector did before `audio.batching`.
+- `batched`: all detectors share one `BatchInferenceServer`, which stacks
+  their pending windows into one model call.
+
+For each it reports hops/s per mic and in total, and for `batched` the mean
+batch size the server achieved. A mic keeps up in real time while its
+hops/s stays above `1 / hop_seconds` (20 with the defaults).
+
+Needs panns-inference and torch (the model checkpoint is downloaded on
+first use). Run from the lockn-score directory::
+
+    python -m benchmarks.bench_audio_batching [--mics 1 4 8] [--seconds N] [--device cpu]
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from audio.batching import BatchInferenceServer
+from audio.config import DEFAULT_CONFIG, AudioConfig
+from audio.detector import BounceDetector, load_model
+
+
+def _chunks(seconds: float, cfg: AudioConfig, seed: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    total = int(seconds * cfg.sample_rate)
+    block = int(cfg.block_seconds * cfg.sample_rate)
+    audio = (0.01 * rng.standard_normal(total)).astype(np.float32)
+    return [audio[i : i + block] for i in range(0, total, block)]
+
+
+def run(detectors: List[BounceDetector], seconds: float, cfg: AudioConfig) -> float:
+    """Wall seconds for every detector to stream `seconds` of audio concurrently."""
+    streams = [_chunks(seconds, cfg, seed) for seed in range(len(detectors))]
+    barrier = threading.Barrier(len(detectors) + 1)
+
+    def stream(detector: BounceDetector, chunks: List[np.ndarray]) -> None:
+        barrier.wait()
+        for chunk in chunks:
+            detector.process_chunk(chunk)
+
+    threads = [threading.Thread(target=stream, args=args) for args in zip(detectors, streams)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def measure(
+    name: str,
+    make: Callable[[], BounceDetector],
+    mics: int,
+    args: argparse.Namespace,
+    server: Optional[BatchInferenceServer] = None,
+) -> None:
+    cfg = DEFAULT_CONFIG
+    detectors = [make() for _ in range(mics)]
+    wall = run(detectors, args.seconds, cfg)
+    hops = mics * int((args.seconds - cfg.window_seconds) / cfg.hop_seconds + 1)
+    line = f"[{name:<7}] {mics:>2} mics  {hops / wall:8.1f} hops/s  {hops / wall / mics:6.1f} per mic"
+    if server is not None:
+        line += f"  mean batch {server.mean_batch:.2f}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mics", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio per mic")
+    parser.add_argument("--device", default=None)
+    args = parser.parse_args()
+
+    cfg = DEFAULT_CONFIG
+    for mics in args.mics:
+        measure("single", lambda: BounceDetector(cfg, args.device), mics, args)
+
+        server = BatchInferenceServer(
+            load_model(cfg, args.device),
+            max_batch=max(cfg.batch_max_size, mics),
+            max_wait_seconds=cfg.batch_max_wait_seconds,
+        )
+        measure("batched", lambda: BounceDetector(cfg, args.device, server=server), mics, args, server)
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Per-hop cost of the log-mel front end: full recompute vs LogMelStream.
+
+Streams `--seconds` of synthetic 32 kHz audio through a `SampleRing` and
+computes the PANNs log-mel matrix of every 1 s window at the 50 ms hop,
+with:
+
+- `full`: the whole centred STFT and mel projection of each window, as
+  the model's own front end does (reset before every window).
+- `incremental`: `audio.features.LogMelStream`, which reuses the interior
+  frames shared with the previous window.
+
+Reports time and STFT frames per hop, and the largest difference between
+the two matrices.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_audio_features [--seconds N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from audio.config import DEFAULT_CONFIG
+from audio.features import LogMelStream
+from audio.ring import SampleRing
+
+
+def _windows(seconds: float) -> List[np.ndarray]:
+    cfg = DEFAULT_CONFIG
+    window = int(cfg.sample_rate * cfg.window_seconds)
+    hop = int(cfg.sample_rate * cfg.hop_seconds)
+    audio = np.random.default_rng(0).standard_normal(int(seconds * cfg.sample_rate)).astype(np.float32)
+    ring = SampleRing(len(audio))
+    ring.write(audio)
+    windows = []
+    while ring.size >= window:
+        windows.append(ring.view(window))
+        ring.consume(hop)
+    return windows
+
+
+def run(windows: List[np.ndarray], incremental: bool, repeat: int) -> Tuple[float, float, List[np.ndarray]]:
+    """`(us per hop, frames per hop, matrices)` for one pass over `windows`."""
+    best = float("inf")
+    mels: List[np.ndarray] = []
+    stream = LogMelStream(DEFAULT_CONFIG)
+    for _ in range(repeat):
+        stream = LogMelStream(DEFAULT_CONFIG)
+        mels = []
+        start = time.perf_counter_ns()
+        for window in windows:
+            if not incremental:
+                stream.reset()
+            mels.append(stream.update(window)[0].copy())
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(windows) / 1000, stream.frames_computed / len(windows), mels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    windows = _windows(args.seconds)
+    results = {name: run(windows, name == "incremental", args.repeat) for name in ("full", "incremental")}
+    for name, (us, frames, _) in results.items():
+        print(f"[{name:<11}] {us:8.1f} us/hop  {frames:6.1f} frames/hop")
+    diff = max(float(np.max(np.abs(a - b))) for a, b in zip(results["full"][2], results["incremental"][2]))
+    print(f"{len(windows)} windows, max |full - incremental| = {diff:.2e} dB")
+
+
+if __name__ == "__main__":
+    main()
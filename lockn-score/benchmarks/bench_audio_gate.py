@@ -0,0 +1,91 @@
+"""Onset pre-gate: cost per hop and share of PANNs calls it avoids.
+
+Synthesises a session of `--rallies` rallies, each `--rally-seconds` of
+bounces every `--bounce-interval` seconds, separated by `--idle-seconds`
+of room noise, and runs `audio.onset.OnsetGate` over it hop by hop as
+`BounceDetector.process_chunk` does. Reports the gate's own time per hop
+and the fraction of hops admitted to the model, overall and during idle
+gaps. With `--model-ms` (the measured Cnn6 forward time on the target
+machine) it also estimates model CPU per mic with and without the gate.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_audio_gate [--rallies N] [--idle-seconds S] [--model-ms MS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from audio.config import DEFAULT_CONFIG
+from audio.onset import OnsetGate
+
+
+def session(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    """`(audio, idle mask per hop)` of the synthetic session."""
+    rate = DEFAULT_CONFIG.sample_rate
+    hop = int(rate * DEFAULT_CONFIG.hop_seconds)
+    period = args.idle_seconds + args.rally_seconds
+    total = int(args.rallies * period * rate)
+    rng = np.random.default_rng(0)
+    audio = 0.002 * rng.standard_normal(total)
+    idle = np.ones(total // hop, dtype=bool)
+    for rally in range(args.rallies):
+        start = rally * period + args.idle_seconds
+        for t in np.arange(start, start + args.rally_seconds, args.bounce_interval):
+            i = int(t * rate)
+            audio[i : i + 320] += 0.3 * rng.standard_normal(320) * np.exp(-np.arange(320) / 60)
+        # Hops whose window can still hold a bounce are not idle.
+        first = int(start * rate) // hop
+        last = int((start + args.rally_seconds + DEFAULT_CONFIG.window_seconds) * rate) // hop
+        idle[first:last] = False
+    return audio.astype(np.float32), idle
+
+
+def run(audio: np.ndarray, repeat: int) -> Tuple[float, List[bool]]:
+    """`(us per hop, admitted per hop)`, best of `repeat`."""
+    hop = int(DEFAULT_CONFIG.sample_rate * DEFAULT_CONFIG.hop_seconds)
+    hops = [audio[i : i + hop] for i in range(0, len(audio) - hop + 1, hop)]
+    best = float("inf")
+    admitted: List[bool] = []
+    for _ in range(repeat):
+        gate = OnsetGate()
+        start = time.perf_counter_ns()
+        admitted = [gate.admit(samples) for samples in hops]
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(hops) / 1000, admitted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rallies", type=int, default=10)
+    parser.add_argument("--rally-seconds", type=float, default=6.0)
+    parser.add_argument("--bounce-interval", type=float, default=0.45)
+    parser.add_argument("--idle-seconds", type=float, default=20.0)
+    parser.add_argument("--model-ms", type=float, default=None, help="measured model forward time")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    audio, idle = session(args)
+    us, admitted = run(audio, args.repeat)
+    mask = np.array(admitted[: len(idle)])
+    idle = idle[: len(mask)]
+    print(f"{len(mask)} hops, gate {us:.1f} us/hop")
+    print(f"  admitted overall: {mask.mean():6.1%}")
+    print(f"  admitted in idle: {mask[idle].mean():6.1%}")
+    print(f"  admitted in play: {mask[~idle].mean():6.1%}")
+    model_ms: Optional[float] = args.model_ms
+    if model_ms is not None:
+        hop_ms = DEFAULT_CONFIG.hop_seconds * 1000
+        for name, share in (("idle", mask[idle].mean()), ("overall", mask.mean())):
+            ungated = model_ms / hop_ms
+            gated = (share * model_ms + us / 1000) / hop_ms
+            print(f"  model CPU per mic, {name:<7}: {ungated:6.1%} -> {gated:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Per-hop cost of BounceDetector windowing: list + concatenate vs SampleRing.
+
+Feeds `--seconds` of synthetic 32 kHz audio in `block_seconds` chunks and
+pops a 1 s window every 50 ms hop, as `BounceDetector.process_chunk`
+does before inference, with:
+
+- `concat`: the previous implementation, which keeps a list of chunks and
+  runs `np.concatenate` over everything pending on every hop, then slices
+  off the remainder.
+- `ring`: `audio.ring.SampleRing`, a mirrored float32 ring whose windows
+  are zero-copy views.
+
+For each it reports time per hop, bytes copied per hop and the peak
+memory traced by `tracemalloc` while streaming. `--streams N` interleaves
+N independent streams (one per table), so pending audio no longer stays
+in cache between hops as it does with a single stream. Both must produce
+identical windows; the benchmark checks that first.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_audio_window [--seconds N] [--streams N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from audio.config import DEFAULT_CONFIG
+from audio.ring import SampleRing
+
+
+class ConcatWindows:
+    """The list-of-chunks windowing `BounceDetector` used before `SampleRing`."""
+
+    def __init__(self, window: int, hop: int) -> None:
+        self.window = window
+        self.hop = hop
+        self.buffer: List[np.ndarray] = []
+        self.pending = 0
+        self.copied = 0
+
+    def windows(self, chunk: np.ndarray) -> Iterator[np.ndarray]:
+        self.buffer.append(chunk.astype(np.float32, copy=False))
+        self.pending += len(chunk)
+        while self.pending >= self.window:
+            data = np.concatenate(self.buffer)
+            self.copied += data.nbytes
+            remaining = data[self.hop :]
+            self.buffer = [remaining] if len(remaining) else []
+            self.pending = len(remaining)
+            yield data[: self.window]
+
+
+class RingWindows:
+    """`BounceDetector.process_chunk`'s windowing over a `SampleRing`."""
+
+    def __init__(self, window: int, hop: int) -> None:
+        self.window = window
+        self.hop = hop
+        self.ring = SampleRing(window + hop)
+        self.copied = 0
+
+    def windows(self, chunk: np.ndarray) -> Iterator[np.ndarray]:
+        ring = self.ring
+        written = 0
+        while True:
+            n = ring.write(chunk[written:])
+            written += n
+            self.copied += 2 * n * 4  # mirrored float32 writes
+            if ring.size < self.window:
+                break
+            window = ring.view(self.window)
+            ring.consume(self.hop)
+            yield window
+
+
+def _chunks(seconds: float, block: int, sample_rate: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(0)
+    total = int(seconds * sample_rate)
+    audio = rng.standard_normal(total).astype(np.float32)
+    return [audio[i : i + block] for i in range(0, total, block)]
+
+
+def check_equal(chunks: List[np.ndarray], window: int, hop: int) -> int:
+    concat = ConcatWindows(window, hop)
+    ring = RingWindows(window, hop)
+    count = 0
+    for chunk in chunks:
+        for a, b in zip(concat.windows(chunk), ring.windows(chunk), strict=True):
+            if not np.array_equal(a, b):
+                raise AssertionError(f"window {count} differs")
+            count += 1
+    return count
+
+
+Windower = Union[ConcatWindows, RingWindows]
+
+
+def _stream(windowers: List[Windower], chunks: List[np.ndarray]) -> int:
+    hops = 0
+    for chunk in chunks:
+        for windower in windowers:
+            for _window in windower.windows(chunk):
+                hops += 1
+    return hops
+
+
+def run(
+    factory: Callable[[], Windower], chunks: List[np.ndarray], streams: int, repeat: int
+) -> Tuple[float, float, int]:
+    """`(ns per hop, bytes copied per hop, peak traced bytes)` over `streams` streams."""
+    best = float("inf")
+    hops = 0
+    windowers: List[Windower] = []
+    for _ in range(repeat):
+        windowers = [factory() for _ in range(streams)]
+        start = time.perf_counter_ns()
+        hops = _stream(windowers, chunks)
+        best = min(best, time.perf_counter_ns() - start)
+    copied = sum(w.copied for w in windowers) / hops
+
+    windowers = [factory() for _ in range(streams)]
+    tracemalloc.start()
+    _stream(windowers, chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best / hops, copied, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--streams", type=int, default=1, help="interleaved streams (tables)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cfg = DEFAULT_CONFIG
+    window = int(cfg.sample_rate * cfg.window_seconds)
+    hop = int(cfg.sample_rate * cfg.hop_seconds)
+    block = int(cfg.sample_rate * cfg.block_seconds)
+    chunks = _chunks(args.seconds, block, cfg.sample_rate)
+    hops = check_equal(chunks, window, hop)
+    print(f"{hops} hops of a {window}-sample window per stream, identical windows from both")
+
+    for name, factory in (
+        ("concat", lambda: ConcatWindows(window, hop)),
+        ("ring", lambda: RingWindows(window, hop)),
+    ):
+        ns, copied, peak = run(factory, chunks, args.streams, args.repeat)
+        print(f"[{name}]")
+        print(f"  us/hop (best of {args.repeat}): {ns / 1000:.1f}")
+        print(f"  bytes copied/hop:   {copied:,.0f}")
+        print(f"  peak traced bytes:  {peak:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Per-event cost of the fusion hot path.
+
+Feeds two synthetic 120 fps streams through `FusionEngine` -- a long rally
+(vision with low-confidence noise, periodic audio bounces and ticks) and an
+idle table between rallies -- and reports for each:
+
+- wall time per event (best of N runs, GC enabled as in production),
+  without and with `EngineMetrics` attached,
+- how many distinct `RallyStatus` / `FusionOutput` objects were allocated
+  per event, and their size in bytes.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_fusion_hotpath [--events N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import List, Tuple
+
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.metrics import EngineMetrics
+
+Event = Tuple[str, float, float, float, float]
+
+
+def synthetic_events(count: int, fps: float = 120.0) -> List[Event]:
+    """Build a long in-table rally with low-confidence noise mixed in."""
+    events: List[Event] = []
+    dt = 1.0 / fps
+    for i in range(count):
+        ts = i * dt
+        if i % 30 == 0:
+            events.append(("audio", ts, 0.0, 0.0, 0.8))
+        elif i % 6 == 0:
+            events.append(("tick", ts, 0.0, 0.0, 0.0))
+        elif i % 5 == 0:
+            events.append(("vision", ts, 0.5, 0.5, 0.1))  # below threshold
+        else:
+            events.append(("vision", ts, 0.3 + (i % 40) / 100, 0.5, 0.9))
+    return events
+
+
+def idle_events(count: int, fps: float = 120.0) -> List[Event]:
+    """Table between rallies: ticks and sub-threshold detections only."""
+    dt = 1.0 / fps
+    return [
+        ("tick", i * dt, 0.0, 0.0, 0.0) if i % 6 == 0 else ("vision", i * dt, 0.5, 0.5, 0.1)
+        for i in range(count)
+    ]
+
+
+def _engine(metrics: bool = False) -> FusionEngine:
+    # Effectively never time out so the whole stream stays IN_PLAY.
+    engine = FusionEngine(FusionConfig(vision_timeout_ms=10**9, rally_timeout_ms=10**9))
+    if metrics:
+        engine.metrics = EngineMetrics()
+    return engine
+
+
+def time_per_event(events: List[Event], metrics: bool = False) -> float:
+    engine = _engine(metrics)
+    process_vision = engine.process_vision
+    process_audio = engine.process_audio
+    tick = engine.tick
+    start = time.perf_counter()
+    for kind, ts, x, y, conf in events:
+        if kind == "vision":
+            process_vision(ts, x, y, conf)
+        elif kind == "audio":
+            process_audio(ts, conf)
+        else:
+            tick(ts)
+    return (time.perf_counter() - start) / len(events) * 1e9
+
+
+def allocations_per_event(events: List[Event]) -> dict:
+    """Count distinct result objects; holding every result prevents id reuse."""
+    engine = _engine()
+    outputs = []
+    for kind, ts, x, y, conf in events:
+        if kind == "vision":
+            outputs.append(engine.process_vision(ts, x, y, conf))
+        elif kind == "audio":
+            outputs.append(engine.process_audio(ts, conf))
+        else:
+            outputs.append(engine.tick(ts))
+    statuses = {id(o.status): o.status for o in outputs}
+    sample = outputs[-1]
+    return {
+        "outputs_per_event": len({id(o) for o in outputs}) / len(events),
+        "statuses_per_event": len(statuses) / len(events),
+        "status_bytes": _deep_size(sample.status),
+        "output_bytes": _deep_size(sample),
+    }
+
+
+def _deep_size(obj: object) -> int:
+    size = sys.getsizeof(obj)
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, build in (("rally", synthetic_events), ("idle", idle_events)):
+        events = build(args.events)
+        ns = min(time_per_event(events) for _ in range(args.repeat))
+        ns_metrics = min(time_per_event(events, metrics=True) for _ in range(args.repeat))
+        allocs = allocations_per_event(events[:100_000])
+        print(f"[{name}] {len(events)} events")
+        print(f"  ns/event (best of {args.repeat}): {ns:.1f}")
+        print(f"  ns/event with metrics: {ns_metrics:.1f}")
+        print(f"  FusionOutput/event:  {allocs['outputs_per_event']:.3f}")
+        print(f"  RallyStatus/event:   {allocs['statuses_per_event']:.3f}")
+        print(f"  RallyStatus bytes:   {allocs['status_bytes']}")
+        print(f"  FusionOutput bytes:  {allocs['output_bytes']}")
+
+
+if __name__ == "__main__":
+    main()
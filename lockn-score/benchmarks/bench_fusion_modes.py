@@ -0,0 +1,193 @@
+"""Bounce accuracy and cost of the threshold vs probabilistic fusion modes.
+
+Replays labelled rallies through `replay` with `fusion_mode="threshold"`
+and `"probabilistic"` and reports, per mode:
+
+- precision / recall / F1 of counted bounces against the labels (a count
+  matches a label within `--tolerance-ms`),
+- wall time per event of the online `RallyTracker`.
+
+By default rallies are synthesized: 60 fps vision with dropouts and
+sub-threshold noise, one audio event per bounce with weak hits and
+clock jitter, plus stray audio (e.g. a neighbouring table). Pass
+`--recording file.npz` to evaluate a recorded rally instead; it must hold
+`vision_ts`, `vision_x`, `vision_y`, `vision_conf`, `audio_ts`,
+`audio_conf` and the labelled `bounce_ts` arrays.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_fusion_modes [--rallies N] [--recording FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import replace
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.fusion.config import FusionConfig
+from src.fusion.rally_tracker import RallyTracker
+from src.fusion.replay import KIND_AUDIO, KIND_VISION, replay
+
+MODES = ("threshold", "probabilistic")
+
+Recording = Dict[str, np.ndarray]
+
+
+def synthetic_rally(rng: random.Random, bounces: int = 12, fps: float = 60.0) -> Recording:
+    """One labelled rally ending with the ball leaving the table."""
+    start = 0.2
+    bounce_ts = [start + 0.15 + i * rng.uniform(0.42, 0.6) for i in range(bounces)]
+    bounce_ts = sorted(bounce_ts)
+    end = bounce_ts[-1] + 0.3
+    v_ts: List[float] = []
+    v_x: List[float] = []
+    v_y: List[float] = []
+    v_conf: List[float] = []
+    t = start
+    while t < end:
+        if rng.random() < 0.1:
+            pass  # dropped frame
+        elif rng.random() < 0.1:
+            v_ts.append(t)
+            v_x.append(rng.uniform(0.0, 1.0))
+            v_y.append(rng.uniform(0.0, 1.0))
+            v_conf.append(rng.uniform(0.05, 0.3))
+        else:
+            v_ts.append(t)
+            v_x.append(rng.uniform(0.2, 0.8))
+            v_y.append(rng.uniform(0.3, 0.7))
+            v_conf.append(rng.uniform(0.45, 0.98))
+        t += 1 / fps
+    v_ts.append(end)
+    v_x.append(0.98)
+    v_y.append(0.5)
+    v_conf.append(0.9)
+
+    a_ts: List[float] = []
+    a_conf: List[float] = []
+    for ts in bounce_ts:
+        if rng.random() < 0.92:
+            a_ts.append(ts + rng.gauss(0.0, 0.015))
+            a_conf.append(rng.betavariate(2.5, 1.5))
+    for _ in range(int((end - start) * 0.8)):
+        a_ts.append(rng.uniform(start, end))
+        a_conf.append(rng.betavariate(1.0, 2.5))
+    order = np.argsort(a_ts, kind="stable")
+    return {
+        "vision_ts": np.array(v_ts),
+        "vision_x": np.array(v_x),
+        "vision_y": np.array(v_y),
+        "vision_conf": np.array(v_conf),
+        "audio_ts": np.array(a_ts)[order],
+        "audio_conf": np.array(a_conf)[order],
+        "bounce_ts": np.array(bounce_ts),
+    }
+
+
+def load_recording(path: str) -> Recording:
+    with np.load(path) as data:
+        return {key: np.asarray(data[key], dtype=np.float64) for key in data.files}
+
+
+def match(counted: Sequence[float], labels: Sequence[float], tolerance_s: float) -> int:
+    """Greedy one-to-one matches between counted bounces and labels."""
+    hits = 0
+    used = [False] * len(labels)
+    for ts in counted:
+        for i, label in enumerate(labels):
+            if not used[i] and abs(ts - label) <= tolerance_s:
+                used[i] = True
+                hits += 1
+                break
+    return hits
+
+
+def _config(mode: str) -> FusionConfig:
+    return replace(FusionConfig(), fusion_mode=mode, rally_timeout_ms=10**6)
+
+
+def _events(recording: Recording) -> List[Tuple[int, float, float, float, float]]:
+    events = [
+        (KIND_VISION, ts, x, y, c)
+        for ts, x, y, c in zip(
+            recording["vision_ts"], recording["vision_x"], recording["vision_y"], recording["vision_conf"]
+        )
+    ]
+    events += [(KIND_AUDIO, ts, 0.0, 0.0, c) for ts, c in zip(recording["audio_ts"], recording["audio_conf"])]
+    events.sort(key=lambda e: (e[1], e[0]))
+    return [(k, float(ts), float(x), float(y), float(c)) for k, ts, x, y, c in events]
+
+
+def time_per_event(config: FusionConfig, recordings: List[Recording], repeat: int) -> float:
+    streams = [_events(r) for r in recordings]
+    total = sum(len(s) for s in streams)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for events in streams:
+            tracker = RallyTracker(config)
+            apply_vision = tracker.apply_vision
+            apply_audio = tracker.apply_audio
+            for kind, ts, x, y, conf in events:
+                if kind == KIND_VISION:
+                    apply_vision(ts, x, y, conf)
+                else:
+                    apply_audio(ts, conf)
+        best = min(best, time.perf_counter() - start)
+    return best / total * 1e9
+
+
+def evaluate(mode: str, recordings: List[Recording], tolerance_s: float) -> Dict[str, float]:
+    config = _config(mode)
+    counted = labelled = hits = 0
+    for r in recordings:
+        result = replay(
+            config,
+            r["vision_ts"],
+            r["vision_x"],
+            r["vision_y"],
+            r["vision_conf"],
+            r["audio_ts"],
+            r["audio_conf"],
+        )
+        counted += len(result.bounce_timestamps)
+        labelled += len(r["bounce_ts"])
+        hits += match(result.bounce_timestamps, r["bounce_ts"].tolist(), tolerance_s)
+    precision = hits / counted if counted else 0.0
+    recall = hits / labelled if labelled else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1, "counted": counted, "labelled": labelled}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rallies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recording", help="labelled .npz recording to evaluate")
+    parser.add_argument("--tolerance-ms", type=float, default=80.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.recording:
+        recordings = [load_recording(args.recording)]
+    else:
+        rng = random.Random(args.seed)
+        recordings = [synthetic_rally(rng) for _ in range(args.rallies)]
+
+    for mode in MODES:
+        scores = evaluate(mode, recordings, args.tolerance_ms / 1000)
+        ns = time_per_event(_config(mode), recordings, args.repeat)
+        print(f"[{mode}] {scores['counted']} counted / {scores['labelled']} labelled")
+        print(f"  precision: {scores['precision']:.3f}")
+        print(f"  recall:    {scores['recall']:.3f}")
+        print(f"  F1:        {scores['f1']:.3f}")
+        print(f"  ns/event (best of {args.repeat}): {ns:.1f}")
+
+
+if __name__ == "__main__":
+    main()
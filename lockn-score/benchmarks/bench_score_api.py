@@ -0,0 +1,310 @@
+"""Load test for the Score API: throughput and latency per endpoint.
+
+Replays one event stream per session for `--sessions` concurrent
+sessions. Each session sends its events in order (vision, audio and tick
+posts, optionally grouped into batch posts) and reads its state every
+`--state-every` events. Two transports are supported:
+
+- `asgi` (default): `httpx.ASGITransport` calls the app in-process, so
+  results measure routing, validation and the engine without sockets.
+- `http`: real HTTP against `--url`; without `--url` a local uvicorn
+  server is started for the run (requires uvicorn).
+
+For each endpoint the report gives the request count, throughput and
+p50/p95/p99 latency in milliseconds, summarized by
+`qa_metrics.compute_latency_metrics` (imported from the directory above
+lockn-score). `--save-baseline FILE` stores the
+results; `--baseline FILE` compares against a stored run and exits
+non-zero when a p95/p99 latency grows, or throughput drops, by more than
+`--tolerance`. Baselines are machine-specific: record them on the box the
+check runs on.
+
+`--encoding binary` sends vision/audio bodies as the fixed-layout records
+of `src.api.wire` instead of JSON.
+
+Streams are synthetic by default; `--recording file.npz` replays a
+recorded rally (see `bench_fusion_modes`) in every session instead.
+Either way events are stamped as offsets from the current `time.time()`,
+so capture-to-score latency and the rally timeouts see realistic clocks.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_score_api [--sessions N] [--events N]
+        [--encoding json|binary] [--transport asgi|http]
+        [--baseline FILE] [--save-baseline FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_fusion_modes import load_recording
+from src.api import wire
+
+QA_DIR = Path(__file__).resolve().parents[2]
+if str(QA_DIR) not in sys.path:
+    sys.path.insert(0, str(QA_DIR))
+
+from qa_metrics import compute_latency_metrics  # noqa: E402
+
+# (endpoint label, path suffix, JSON body / binary records or None, query params or None)
+Request = Tuple[str, str, Optional[Any], Optional[Dict[str, float]]]
+
+LATENCY_KEYS = ("p95", "p99")
+
+
+def synthetic_stream(
+    count: int, fps: float = 120.0, start: Optional[float] = None
+) -> List[Tuple[str, float, float, float, float]]:
+    """Vision at `fps` with an audio bounce every 30 frames and periodic ticks.
+
+    Timestamps run from `start` (default: now).
+    """
+    events = []
+    dt = 1.0 / fps
+    start = time.time() if start is None else start
+    for i in range(count):
+        ts = start + i * dt
+        if i % 30 == 0:
+            events.append(("audio", ts, 0.0, 0.0, 0.8))
+        elif i % 12 == 0:
+            events.append(("tick", ts, 0.0, 0.0, 0.0))
+        else:
+            events.append(("vision", ts, 0.3 + (i % 40) / 100, 0.5, 0.9))
+    return events
+
+
+def recorded_stream(path: str, start: Optional[float] = None) -> List[Tuple[str, float, float, float, float]]:
+    """Events of a recording, shifted so the first one is at `start` (default: now)."""
+    recording = load_recording(path)
+    events = [
+        ("vision", float(ts), float(x), float(y), float(c))
+        for ts, x, y, c in zip(
+            recording["vision_ts"], recording["vision_x"], recording["vision_y"], recording["vision_conf"]
+        )
+    ]
+    events += [
+        ("audio", float(ts), 0.0, 0.0, float(c))
+        for ts, c in zip(recording["audio_ts"], recording["audio_conf"])
+    ]
+    events.sort(key=lambda e: e[1])
+    if events:
+        shift = (time.time() if start is None else start) - events[0][1]
+        events = [(kind, ts + shift, x, y, c) for kind, ts, x, y, c in events]
+    return events
+
+
+def build_requests(
+    events: List[Tuple[str, float, float, float, float]],
+    batch: int,
+    state_every: int,
+    binary: bool = False,
+) -> List[Request]:
+    """Turn an event stream into the HTTP requests one session sends."""
+    requests: List[Request] = []
+    pending: List[Tuple[float, float, float, float]] = []
+
+    def vision_body(detections: List[Tuple[float, float, float, float]]) -> Any:
+        if binary:
+            return wire.encode_vision(detections)
+        keys = ("timestamp", "x", "y", "confidence")
+        bodies = [dict(zip(keys, d)) for d in detections]
+        return {"detections": bodies} if batch > 1 else bodies[0]
+
+    for i, (kind, ts, x, y, conf) in enumerate(events):
+        if kind == "vision":
+            pending.append((ts, x, y, conf))
+            if len(pending) >= batch:
+                label = "vision_batch" if batch > 1 else "vision"
+                suffix = "/vision/batch" if batch > 1 else "/vision"
+                requests.append((label, suffix, vision_body(pending), None))
+                pending = []
+        elif kind == "audio":
+            body = wire.encode_audio([(ts, conf)]) if binary else {"timestamp": ts, "confidence": conf}
+            requests.append(("audio", "/audio", body, None))
+        else:
+            requests.append(("tick", "/tick", None, {"timestamp": ts}))
+        if state_every and (i + 1) % state_every == 0:
+            requests.append(("state", "/state", None, None))
+    if pending:
+        requests.append(("vision_batch", "/vision/batch", vision_body(pending), None))
+    return requests
+
+
+async def _run_session(
+    client: httpx.AsyncClient,
+    session_id: str,
+    requests: List[Request],
+    latencies: Dict[str, List[float]],
+) -> None:
+    base = f"/score/{session_id}"
+    for label, suffix, body, params in requests:
+        start = time.perf_counter()
+        if label == "state":
+            response = await client.get(base + suffix)
+        elif isinstance(body, bytes):
+            content_type = wire.AUDIO_CONTENT_TYPE if label == "audio" else wire.VISION_CONTENT_TYPE
+            response = await client.post(base + suffix, content=body, headers={"content-type": content_type})
+        else:
+            response = await client.post(base + suffix, json=body, params=params)
+        latencies[label].append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{label} returned {response.status_code}: {response.text}")
+
+
+async def run_load(
+    client: httpx.AsyncClient, sessions: int, requests: List[Request]
+) -> Tuple[Dict[str, List[float]], float]:
+    """Run every session concurrently; returns per-endpoint latencies and wall time."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_run_session(client, f"load-{i}", requests, latencies) for i in range(sessions))
+    )
+    return latencies, time.perf_counter() - start
+
+
+def report(latencies: Dict[str, List[float]], wall_s: float) -> Dict[str, Any]:
+    endpoints = {}
+    for label, samples in sorted(latencies.items()):
+        summary = compute_latency_metrics(samples)
+        summary["count"] = len(samples)
+        summary["throughput"] = len(samples) / wall_s
+        endpoints[label] = summary
+    total = sum(len(s) for s in latencies.values())
+    return {"wall_s": wall_s, "requests": total, "throughput": total / wall_s, "endpoints": endpoints}
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of `result` against `baseline`, as human-readable lines."""
+    if result.get("workload") != baseline.get("workload"):
+        return [f"workload {result.get('workload')} differs from baseline {baseline.get('workload')}"]
+    failures = []
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        failures.append(
+            f"throughput {result['throughput']:.0f} req/s < baseline {baseline['throughput']:.0f}"
+        )
+    for label, base in baseline["endpoints"].items():
+        current = result["endpoints"].get(label)
+        if current is None:
+            failures.append(f"{label}: missing from this run")
+            continue
+        for key in LATENCY_KEYS:
+            if current[key] > base[key] * (1 + tolerance):
+                failures.append(f"{label} {key} {current[key]:.3f} ms > baseline {base[key]:.3f} ms")
+    return failures
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server() -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited; is it installed?")
+        try:
+            httpx.get(url + "/score/state", timeout=1.0)
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 30 s")
+
+
+async def _main_async(args: argparse.Namespace, requests: List[Request]) -> Dict[str, Any]:
+    if args.transport == "asgi":
+        from src.api import score_api
+
+        score_api.registry.max_sessions = max(score_api.registry.max_sessions, args.sessions)
+        transport = httpx.ASGITransport(app=score_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            latencies, wall_s = await run_load(client, args.sessions, requests)
+        score_api.registry.clear()
+        return report(latencies, wall_s)
+
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        latencies, wall_s = await run_load(client, args.sessions, requests)
+    return report(latencies, wall_s)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--events", type=int, default=500, help="events per session")
+    parser.add_argument("--batch", type=int, default=1, help="vision detections per batch post")
+    parser.add_argument("--state-every", type=int, default=20)
+    parser.add_argument("--encoding", choices=("json", "binary"), default="json")
+    parser.add_argument("--recording", help="replay this .npz recording in every session")
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--url", help="server to load over HTTP (default: start uvicorn)")
+    parser.add_argument("--baseline", help="fail on regression against this JSON file")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    events = recorded_stream(args.recording) if args.recording else synthetic_stream(args.events)
+    requests = build_requests(events, args.batch, args.state_every, args.encoding == "binary")
+
+    server: Optional[subprocess.Popen] = None
+    if args.transport == "http" and not args.url:
+        server, args.url = _start_server()
+    try:
+        result = asyncio.run(_main_async(args, requests))
+        result["workload"] = {
+            "transport": args.transport,
+            "sessions": args.sessions,
+            "requests_per_session": len(requests),
+            "batch": args.batch,
+            "encoding": args.encoding,
+            "recording": os.path.basename(args.recording) if args.recording else None,
+        }
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"[{args.transport}] {args.sessions} sessions, {result['requests']} requests "
+          f"in {result['wall_s']:.2f} s ({result['throughput']:.0f} req/s)")
+    for label, summary in result["endpoints"].items():
+        print(
+            f"  {label:<13} n={summary['count']:<7} {summary['throughput']:8.0f} req/s  "
+            f"p50 {summary['p50']:.3f}  p95 {summary['p95']:.3f}  p99 {summary['p99']:.3f} ms"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as handle:
+            json.dump(result, handle, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            failures = compare(result, json.load(handle), args.tolerance)
+        for line in failures:
+            print(f"REGRESSION: {line}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Score API throughput: sync threadpool handlers vs async single-writer handlers.
+
+Runs the same concurrent load (see `bench_score_api`) against two apps
+through `httpx.ASGITransport`:
+
+- `sync`: the ingestion handlers declared as plain `def` routes, as the
+  API used to be, so FastAPI runs every request on its threadpool and
+  concurrent sessions contend for the GIL and the pool.
+- `async`: `score_api.app` as shipped, where handlers are `async def` and
+  apply writes inline on the event loop through `score_api.writers`.
+
+Both apps call the same `_post_*` functions, so the difference is only the
+dispatch. For each app and concurrency level the report gives requests/s
+and p50/p99 latency.
+
+Run from the lockn-score directory::
+
+    python -m benchmarks.bench_score_handlers [--sessions 1 8 32] [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.bench_score_api import (
+    Request,
+    build_requests,
+    compute_latency_metrics,
+    run_load,
+    synthetic_stream,
+)
+from src.api import score_api
+
+
+def sync_app() -> FastAPI:
+    """The ingestion routes as threadpool (`def`) handlers."""
+    app = FastAPI()
+
+    @app.post("/score/{session_id}/vision")
+    def post_vision(session_id: str, payload: score_api.VisionPayload) -> score_api.ScoreState:
+        return score_api._post_vision(session_id, payload)
+
+    @app.post("/score/{session_id}/audio")
+    def post_audio(session_id: str, payload: score_api.AudioPayload) -> score_api.ScoreState:
+        return score_api._post_audio(session_id, payload)
+
+    @app.post("/score/{session_id}/vision/batch")
+    def post_vision_batch(
+        session_id: str, payload: score_api.VisionBatchPayload
+    ) -> score_api.ScoreBatchState:
+        return score_api._post_vision_batch(session_id, payload)
+
+    @app.post("/score/{session_id}/tick")
+    def post_tick(session_id: str, timestamp: Optional[float] = None) -> score_api.ScoreState:
+        return score_api._post_tick(session_id, timestamp)
+
+    @app.get("/score/{session_id}/state")
+    def get_state(session_id: str) -> score_api.ScoreState:
+        return score_api._get_state(session_id)
+
+    return app
+
+
+async def measure(app: FastAPI, sessions: int, requests: List[Request]) -> Dict[str, float]:
+    score_api.registry.clear()
+    score_api.registry.max_sessions = max(score_api.registry.max_sessions, sessions)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies, wall_s = await run_load(client, sessions, requests)
+    score_api.registry.clear()
+    samples = [ms for values in latencies.values() for ms in values]
+    stats = compute_latency_metrics(samples)
+    stats["throughput"] = len(samples) / wall_s
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--events", type=int, default=300, help="events per session")
+    parser.add_argument("--state-every", type=int, default=20)
+    args = parser.parse_args()
+
+    requests = build_requests(synthetic_stream(args.events), 1, args.state_every)
+    apps = {"sync": sync_app(), "async": score_api.app}
+    for sessions in args.sessions:
+        for name, app in apps.items():
+            stats = asyncio.run(measure(app, sessions, requests))
+            print(
+                f"[{name:<5}] {sessions:>3} sessions  {stats['throughput']:8.0f} req/s  "
+                f"p50 {stats['p50']:.3f}  p99 {stats['p99']:.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Session ownership and shared status for multi-worker deployments.
+
+With `uvicorn --workers N` every worker is a separate process with its
+own `SessionRegistry`. `WorkerCluster` makes them agree:
+
+- Each worker claims an index `0..N-1` by locking `worker-<i>.lock` in a
+  shared directory; a session is owned by worker `crc32(id) % N`.
+- The owner alone runs the session's engine. Writes arriving at another
+  worker are forwarded to the owner over its Unix socket
+  (`worker-<i>.sock`) as length-prefixed JSON and answered with the
+  owner's response body.
+- Owners publish every status change into a `StatusTable` in shared
+  memory, so any worker answers state reads locally without a hop.
+
+`StatusTable` gives each worker its own region of fixed-size records.
+Only the owning worker writes a region (serialised by a thread lock), and
+each record is guarded by a sequence lock: writers make the sequence odd,
+write, and make it even again; readers retry until they see the same even
+sequence before and after copying the record.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.fusion.rally_tracker import RallyState, RallyStatus
+
+RECORD = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("key", "<u8"),
+        ("state", "<i8"),
+        ("rally_count", "<i8"),
+        ("last_bounce_ts", "<f8"),
+        ("last_ball_ts", "<f8"),
+    ]
+)
+
+EMPTY_KEY = 0
+TOMBSTONE_KEY = 1
+
+_STATES = list(RallyState)
+_STATE_INDEX = {state: index for index, state in enumerate(_STATES)}
+_LENGTH = struct.Struct("<I")
+
+Handler = Callable[[str, str, Any], Tuple[int, Any]]
+
+
+def session_key(session_id: str) -> int:
+    """64-bit key of a session id, never one of the reserved keys."""
+    key = int.from_bytes(hashlib.blake2b(session_id.encode(), digest_size=8).digest(), "little")
+    return key if key > TOMBSTONE_KEY else key + 2
+
+
+def owner_of(session_id: str, workers: int) -> int:
+    return zlib.crc32(session_id.encode()) % workers
+
+
+class StatusTable:
+    """Shared-memory `RallyStatus` records, one open-addressed region per worker."""
+
+    def __init__(self, name: str, workers: int, slots: int = 256, create: bool = False) -> None:
+        self.workers = workers
+        self.slots = slots
+        size = RECORD.itemsize * workers * slots
+        if create:
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=name)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        # The segment outlives any one worker; without this the resource
+        # tracker unlinks it when the process that attached it exits.
+        resource_tracker.unregister(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+        if self._shm.size < size:
+            raise ValueError(f"shared segment {name!r} is smaller than {size} bytes")
+        self.records = np.ndarray((workers, slots), dtype=RECORD, buffer=self._shm.buf)
+        self._lock = threading.Lock()
+
+    def clear_region(self, worker: int) -> None:
+        with self._lock:
+            self.records[worker] = np.zeros(self.slots, dtype=RECORD)
+
+    def _find(self, region: np.ndarray, key: int) -> int:
+        """Slot holding `key`, or -1."""
+        keys = region["key"]
+        slot = key % self.slots
+        for _ in range(self.slots):
+            current = int(keys[slot])
+            if current == key:
+                return slot
+            if current == EMPTY_KEY:
+                return -1
+            slot = (slot + 1) % self.slots
+        return -1
+
+    def publish(self, worker: int, session_id: str, status: RallyStatus) -> None:
+        """Write a session's status into `worker`'s region (owner only)."""
+        key = session_key(session_id)
+        region = self.records[worker]
+        with self._lock:
+            slot = self._find(region, key)
+            if slot < 0:
+                slot = self._claim(region, key)
+            record = region[slot : slot + 1]
+            seq = int(record["seq"][0])
+            record["seq"] = seq + 1
+            record["key"] = key
+            record["state"] = _STATE_INDEX[status.state]
+            record["rally_count"] = status.rally_count
+            record["last_bounce_ts"] = np.nan if status.last_bounce_ts is None else status.last_bounce_ts
+            record["last_ball_ts"] = np.nan if status.last_ball_ts is None else status.last_ball_ts
+            record["seq"] = seq + 2
+
+    def _claim(self, region: np.ndarray, key: int) -> int:
+        keys = region["key"]
+        slot = key % self.slots
+        for _ in range(self.slots):
+            if int(keys[slot]) in (EMPTY_KEY, TOMBSTONE_KEY):
+                return slot
+            slot = (slot + 1) % self.slots
+        raise RuntimeError("shared status table is full; raise its slot count")
+
+    def remove(self, worker: int, session_id: str) -> None:
+        region = self.records[worker]
+        with self._lock:
+            slot = self._find(region, session_key(session_id))
+            if slot >= 0:
+                record = region[slot : slot + 1]
+                seq = int(record["seq"][0])
+                record["seq"] = seq + 1
+                record["key"] = TOMBSTONE_KEY
+                record["seq"] = seq + 2
+
+    def read(self, worker: int, session_id: str) -> Optional[Tuple[int, RallyStatus]]:
+        """`(sequence, status)` of a session, or None if it has none yet."""
+        key = session_key(session_id)
+        region = self.records[worker]
+        # Bounded so a writer that died mid-update cannot hang readers.
+        for _ in range(10_000):
+            slot = self._find(region, key)
+            if slot < 0:
+                return None
+            before = int(region["seq"][slot])
+            if before & 1:
+                continue
+            record = region[slot].copy()
+            if int(region["seq"][slot]) != before:
+                continue
+            if int(record["key"]) != key:
+                continue  # the slot was reused while we looked it up
+            bounce = float(record["last_bounce_ts"])
+            ball = float(record["last_ball_ts"])
+            return before, RallyStatus(
+                state=_STATES[int(record["state"])],
+                rally_count=int(record["rally_count"]),
+                last_bounce_ts=None if bounce != bounce else bounce,
+                last_ball_ts=None if ball != ball else ball,
+            )
+        return None
+
+    def close(self) -> None:
+        del self.records
+        self._shm.close()
+
+    def unlink(self) -> None:
+        # SharedMemory.unlink unregisters the name again; balance it.
+        resource_tracker.register(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+        self._shm.unlink()
+
+
+def _send(sock: socket.socket, message: Any) -> None:
+    data = json.dumps(message).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _receive(sock: socket.socket) -> Any:
+    header = _receive_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    data = _receive_exact(sock, length)
+    if data is None:
+        raise ConnectionError("connection closed mid-message")
+    return json.loads(data)
+
+
+def _receive_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed mid-message")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _ForwardServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class WorkerCluster:
+    """This worker's view of the cluster: its index, peers and the status table."""
+
+    def __init__(self, directory: str, workers: int, slots: int = 256) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.directory = Path(directory)
+        self.workers = workers
+        self.slots = slots
+        self.index = -1
+        self.table: Optional[StatusTable] = None
+        self._lock_file: Optional[int] = None
+        self._server: Optional[_ForwardServer] = None
+        self._local = threading.local()
+        # Every thread's connection cache, so `close` can reach them all.
+        self._caches: List[Dict[int, socket.socket]] = []
+        self._caches_lock = threading.Lock()
+
+    @property
+    def segment_name(self) -> str:
+        digest = hashlib.blake2b(str(self.directory.resolve()).encode(), digest_size=6).hexdigest()
+        return f"lockn-score-{digest}"
+
+    def socket_path(self, worker: int) -> Path:
+        return self.directory / f"worker-{worker}.sock"
+
+    def owner(self, session_id: str) -> int:
+        return owner_of(session_id, self.workers)
+
+    def is_local(self, session_id: str) -> bool:
+        return self.owner(session_id) == self.index
+
+    def start(self, handler: Handler) -> None:
+        """Claim a worker index, attach the status table and serve forwards."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for index in range(self.workers):
+            fd = os.open(self.directory / f"worker-{index}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self.index = index
+            self._lock_file = fd
+            break
+        else:
+            raise RuntimeError(f"all {self.workers} worker slots in {self.directory} are taken")
+
+        self.table = StatusTable(self.segment_name, self.workers, self.slots, create=True)
+        self.table.clear_region(self.index)
+
+        path = self.socket_path(self.index)
+        path.unlink(missing_ok=True)
+
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(inner) -> None:  # noqa: N805 - socketserver API
+                while True:
+                    request = _receive(inner.request)
+                    if request is None:
+                        return
+                    code, body = handler(request["op"], request["session"], request["body"])
+                    _send(inner.request, {"code": code, "body": body})
+
+        self._server = _ForwardServer(str(path), _Handler)
+        threading.Thread(
+            target=self._server.serve_forever, name="score-cluster", daemon=True
+        ).start()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self.socket_path(self.index).unlink(missing_ok=True)
+            self._server = None
+        with self._caches_lock:
+            for connections in self._caches:
+                while connections:
+                    connections.popitem()[1].close()
+        if self.table is not None:
+            self.table.close()
+            self.table = None
+        if self._lock_file is not None:
+            os.close(self._lock_file)
+            self._lock_file = None
+        self.index = -1
+
+    def forward(self, session_id: str, op: str, body: Any = None) -> Tuple[int, Any]:
+        """Run `op` on the session's owner; returns `(status_code, body)`.
+
+        Raises `OSError` when the owner cannot be reached. A request is only
+        retried (once, on a fresh connection: the owner may have restarted)
+        when connecting or sending failed. Once it was sent the owner may
+        have applied it, so losing the reply raises instead of re-sending a
+        non-idempotent write.
+
+        Each calling thread keeps one connection per owner open for reuse;
+        `close` closes those of every thread.
+        """
+        owner = self.owner(session_id)
+        connections: Dict[int, socket.socket] = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+            with self._caches_lock:
+                self._caches.append(connections)
+        message = {"op": op, "session": session_id, "body": body}
+        for attempt in (0, 1):
+            sock = connections.pop(owner, None)
+            try:
+                if sock is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.connect(str(self.socket_path(owner)))
+                _send(sock, message)
+            except OSError:
+                if sock is not None:
+                    sock.close()
+                if attempt:
+                    raise
+                continue
+            try:
+                reply = _receive(sock)
+            except OSError:
+                sock.close()
+                raise
+            if reply is None:
+                sock.close()
+                raise ConnectionError(f"worker {owner} closed the connection before replying")
+            connections[owner] = sock
+            return reply["code"], reply["body"]
+        raise ConnectionError(f"worker {owner} is unreachable")
+
+    def publish(self, session_id: str, status: RallyStatus) -> None:
+        if self.table is not None:
+            self.table.publish(self.index, session_id, status)
+
+    def remove(self, session_id: str) -> None:
+        if self.table is not None:
+            self.table.remove(self.index, session_id)
+
+    def read(self, session_id: str) -> Optional[Tuple[int, RallyStatus]]:
+        if self.table is None:
+            return None
+        return self.table.read(self.owner(session_id), session_id)
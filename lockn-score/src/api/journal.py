@@ -0,0 +1,489 @@
+"""Durable session state: append-only event journal plus snapshots.
+
+Every event (and clock sync pair) a session ingests is appended to a
+per-session journal as fixed-size `wire.FRAME` records with resolved
+timestamps, so replaying the journal reproduces the engine exactly.
+Records are buffered in memory and written by a background thread every
+`commit_interval_s` with one fsync per session (group commit); a crash loses at most that window.
+
+Every `snapshot_every` records the engine's state is captured into a
+snapshot that starts a new journal generation, and the previous generation
+is deleted. Recovery restores the snapshot into a fresh engine and replays
+only the current generation, so it costs at most `snapshot_every` record
+applications.
+
+A snapshot holds `engine_state`: a versioned tuple of the plain-value
+`snapshot()` of the tracker, reorder buffer, history and clock fits,
+never the engine object itself, so renaming or moving a class does not
+strand the files. The tuple is taken on the session's writer; it is serialized and
+written by the commit thread.
+
+Files per session, named from the percent-encoded session id::
+
+    <id>.snapshot    magic, generation, pickled state tuple (atomically replaced)
+    <id>.<gen>.log   records since that snapshot
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from src.api import wire
+from src.fusion.clock_sync import SOURCE_AUDIO, SOURCE_VISION, ClockAligner
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionBatchOutput, FusionEngine, FusionOutput
+
+# Journal-only record kinds, after the wire kinds.
+KIND_RESET = 3
+KIND_FLUSH = 4
+# A clock sync pair is two records: KIND_CLOCK holds the source timestamp
+# (source index in x), the KIND_CLOCK_REF after it the reference timestamp.
+KIND_CLOCK = 5
+KIND_CLOCK_REF = 6
+
+CLOCK_SOURCES = (SOURCE_VISION, SOURCE_AUDIO)
+
+SNAPSHOT_MAGIC = b"LKS2"
+SNAPSHOT_HEADER = struct.Struct("<4sQ")  # magic, generation
+SNAPSHOT_VERSION = 3  # layout of the `engine_state` tuple
+
+_pack = wire.FRAME.pack
+
+
+class JournaledEngine(FusionEngine):
+    """`FusionEngine` that records every input to a `SessionJournal`."""
+
+    def __init__(self, config: Optional[FusionConfig] = None) -> None:
+        super().__init__(config)
+        self.journal: Optional["SessionJournal"] = None
+
+    def process_vision(
+        self, timestamp: Optional[float], x: float, y: float, confidence: float
+    ) -> FusionOutput:
+        journal = self.journal
+        if journal is None:
+            return super().process_vision(timestamp, x, y, confidence)
+        ts = timestamp if timestamp is not None else time.time()
+        output = super().process_vision(ts, x, y, confidence)
+        journal.append(_pack(wire.KIND_VISION, ts, x, y, confidence), self)
+        return output
+
+    def process_audio(self, timestamp: Optional[float], confidence: float) -> FusionOutput:
+        journal = self.journal
+        if journal is None:
+            return super().process_audio(timestamp, confidence)
+        ts = timestamp if timestamp is not None else time.time()
+        output = super().process_audio(ts, confidence)
+        journal.append(_pack(wire.KIND_AUDIO, ts, 0.0, 0.0, confidence), self)
+        return output
+
+    def tick(self, timestamp: Optional[float] = None) -> FusionOutput:
+        journal = self.journal
+        if journal is None:
+            return super().tick(timestamp)
+        ts = timestamp if timestamp is not None else time.time()
+        output = super().tick(ts)
+        journal.append(_pack(wire.KIND_TICK, ts, 0.0, 0.0, 0.0), self)
+        return output
+
+    def reset(self) -> None:
+        super().reset()
+        if self.journal is not None:
+            self.journal.append(_pack(KIND_RESET, 0.0, 0.0, 0.0, 0.0), self)
+
+    def observe_clock(
+        self, source: str, source_ts: float, reference_ts: Optional[float] = None
+    ) -> bool:
+        journal = self.journal
+        if journal is None:
+            return super().observe_clock(source, source_ts, reference_ts)
+        if reference_ts is None:
+            reference_ts = self.clock.reference_clock() if self.clock is not None else time.time()
+        accepted = super().observe_clock(source, source_ts, reference_ts)
+        journal.append(
+            _pack(KIND_CLOCK, source_ts, CLOCK_SOURCES.index(source), 0.0, 0.0)
+            + _pack(KIND_CLOCK_REF, reference_ts, 0.0, 0.0, 0.0),
+            self,
+            2,
+        )
+        return accepted
+
+    def flush(self) -> FusionBatchOutput:
+        output = super().flush()
+        if self.journal is not None:
+            self.journal.append(_pack(KIND_FLUSH, 0.0, 0.0, 0.0, 0.0), self)
+        return output
+
+    def process_vision_batch(
+        self, detections: Iterable[Tuple[Optional[float], float, float, float]]
+    ) -> FusionBatchOutput:
+        journal = self.journal
+        if journal is None:
+            return super().process_vision_batch(detections)
+        now = time.time()
+        resolved = [
+            (ts if ts is not None else now, x, y, conf) for ts, x, y, conf in detections
+        ]
+        output = super().process_vision_batch(resolved)
+        journal.append(
+            b"".join(_pack(wire.KIND_VISION, ts, x, y, conf) for ts, x, y, conf in resolved),
+            self,
+            len(resolved),
+        )
+        return output
+
+    def process_audio_batch(
+        self, bounces: Iterable[Tuple[Optional[float], float]]
+    ) -> FusionBatchOutput:
+        journal = self.journal
+        if journal is None:
+            return super().process_audio_batch(bounces)
+        now = time.time()
+        resolved = [(ts if ts is not None else now, conf) for ts, conf in bounces]
+        output = super().process_audio_batch(resolved)
+        journal.append(
+            b"".join(_pack(wire.KIND_AUDIO, ts, 0.0, 0.0, conf) for ts, conf in resolved),
+            self,
+            len(resolved),
+        )
+        return output
+
+
+def apply_records(engine: FusionEngine, data: bytes) -> int:
+    """Re-apply journal records to `engine`; returns how many were applied."""
+    count = 0
+    clock: Optional[Tuple[str, float]] = None
+    for kind, ts, x, y, confidence in wire.FRAME.iter_unpack(data):
+        if kind == wire.KIND_VISION:
+            engine.process_vision(ts, x, y, confidence)
+        elif kind == wire.KIND_AUDIO:
+            engine.process_audio(ts, confidence)
+        elif kind == wire.KIND_TICK:
+            engine.tick(ts)
+        elif kind == KIND_RESET:
+            engine.reset()
+        elif kind == KIND_FLUSH:
+            engine.flush()
+        elif kind == KIND_CLOCK:
+            clock = (CLOCK_SOURCES[int(x)], ts)
+        elif kind == KIND_CLOCK_REF:
+            if clock is None:
+                raise ValueError("clock reference record without its source record")
+            engine.observe_clock(clock[0], clock[1], ts)
+            clock = None
+        else:
+            raise ValueError(f"unknown journal record kind {kind}")
+        count += 1
+    return count
+
+
+def engine_state(engine: FusionEngine) -> Tuple[Any, ...]:
+    """Versioned snapshot of `engine` as a tuple of plain Python values."""
+    reorder = engine.reorder
+    history = engine.history
+    clock = engine.clock
+    return (
+        SNAPSHOT_VERSION,
+        engine.tracker.snapshot(),
+        None if reorder is None else reorder.snapshot(),
+        None if history is None else history.snapshot(),
+        None if clock is None else clock.snapshot(),
+    )
+
+
+def restore_engine(engine: FusionEngine, state: Tuple[Any, ...]) -> None:
+    """Load an `engine_state` tuple into a freshly constructed `engine`.
+
+    Parts the engine's config does not enable (e.g. no reorder buffer) are
+    skipped.
+    """
+    version = state[0]
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    _, tracker, reorder, history, clock = state
+    engine.tracker.restore(tracker)
+    if engine.reorder is not None and reorder is not None:
+        engine.reorder.restore(reorder)
+    if engine.history is not None and history is not None:
+        engine.history.restore(history)
+    if clock is not None:
+        engine.clock = ClockAligner()
+        engine.clock.restore(clock)
+
+
+class SessionJournal:
+    """Write side of one session's journal; owned by a `JournalStore`."""
+
+    def __init__(self, store: "JournalStore", session_id: str, generation: int) -> None:
+        self.store = store
+        self.session_id = session_id
+        self.generation = generation
+        self.records_since_snapshot = 0
+        self._buffer = bytearray()
+        self._snapshot: Optional[Tuple[Any, ...]] = None
+        self._file: Optional[BinaryIO] = None
+        self._file_generation = -1
+        self._io_lock = threading.Lock()
+
+    def append(self, records: bytes, engine: FusionEngine, count: int = 1) -> None:
+        store = self.store
+        with store._lock:
+            self._buffer += records
+            self.records_since_snapshot += count
+            store._dirty[self.session_id] = self
+            due = self.records_since_snapshot >= store.snapshot_every
+        if due:
+            self.snapshot(engine)
+
+    def snapshot(self, engine: FusionEngine) -> None:
+        """Capture `engine` and start a new generation at this point.
+
+        Buffered records are covered by the snapshot and discarded; the
+        state is serialized and written on the next commit.
+        """
+        state = engine_state(engine)
+        with self.store._lock:
+            self.generation += 1
+            self._snapshot = state
+            self._buffer = bytearray()
+            self.records_since_snapshot = 0
+            self.store._dirty[self.session_id] = self
+
+    def commit(self) -> None:
+        """Write pending snapshot/records and fsync them."""
+        store = self.store
+        with self._io_lock:
+            with store._lock:
+                snapshot, self._snapshot = self._snapshot, None
+                data, self._buffer = bytes(self._buffer), bytearray()
+                generation = self.generation
+            if snapshot is not None:
+                self._close_file()
+                _write_atomic(
+                    store.snapshot_path(self.session_id),
+                    SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation)
+                    + pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL),
+                    store.fsync,
+                )
+                for old in store.log_generations(self.session_id):
+                    if old < generation:
+                        _unlink(store.log_path(self.session_id, old))
+            if data or snapshot is not None:
+                if self._file_generation != generation:
+                    self._close_file()
+                    self._file = open(store.log_path(self.session_id, generation), "ab")
+                    self._file_generation = generation
+                assert self._file is not None
+                self._file.write(data)
+                self._file.flush()
+                if store.fsync:
+                    os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self.commit()
+        with self._io_lock:
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_generation = -1
+
+
+class JournalStore:
+    """Per-session journals under one directory with a group-commit thread.
+
+    `open_engine` is an engine factory for `SessionRegistry`: it recovers
+    the session from disk when it has state there, otherwise starts empty,
+    and attaches a journal either way. It reads (and may truncate) files,
+    so call it off the event loop.
+
+    `release` does no I/O while the commit thread runs: the session's last
+    commit and close are handed to that thread, and reopening the session
+    finishes them first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        config: Optional[FusionConfig] = None,
+        commit_interval_s: float = 0.005,
+        snapshot_every: int = 10_000,
+        fsync: bool = True,
+    ) -> None:
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.config = config or FusionConfig()
+        self.commit_interval_s = commit_interval_s
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._journals: Dict[str, SessionJournal] = {}
+        self._dirty: Dict[str, SessionJournal] = {}
+        self._released: Dict[str, SessionJournal] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot_path(self, session_id: str) -> Path:
+        return self.directory / f"{quote(session_id, safe='')}.snapshot"
+
+    def log_path(self, session_id: str, generation: int) -> Path:
+        return self.directory / f"{quote(session_id, safe='')}.{generation}.log"
+
+    def log_generations(self, session_id: str) -> List[int]:
+        prefix = quote(session_id, safe="") + "."
+        generations = []
+        for path in self.directory.glob(f"{prefix}*.log"):
+            middle = path.name[len(prefix):-len(".log")]
+            if middle.isdigit():
+                generations.append(int(middle))
+        return sorted(generations)
+
+    def open_engine(
+        self, session_id: str, config: Optional[FusionConfig] = None
+    ) -> JournaledEngine:
+        """Recover (or create) the engine for `session_id` and journal it.
+
+        `config` overrides the store's, e.g. to follow a registry's config.
+        """
+        self._close_session(session_id)  # make the previous owner's records recoverable
+        engine, generation, _ = self.recover(session_id, config)
+        journal = SessionJournal(self, session_id, generation)
+        engine.journal = journal
+        with self._lock:
+            self._journals[session_id] = journal
+        return engine
+
+    def recover(
+        self, session_id: str, config: Optional[FusionConfig] = None
+    ) -> Tuple[JournaledEngine, int, int]:
+        """Rebuild `(engine, generation, records_replayed)` from disk.
+
+        A torn record at the end of the log (crash mid-write) is truncated.
+        """
+        engine = JournaledEngine(config or self.config)
+        generation = 0
+        snapshot_path = self.snapshot_path(session_id)
+        if snapshot_path.exists():
+            data = snapshot_path.read_bytes()
+            magic, generation = SNAPSHOT_HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{snapshot_path} is not a session snapshot")
+            restore_engine(engine, pickle.loads(data[SNAPSHOT_HEADER.size:]))
+        for stale in self.log_generations(session_id):
+            if stale != generation:
+                _unlink(self.log_path(session_id, stale))
+
+        replayed = 0
+        log_path = self.log_path(session_id, generation)
+        if log_path.exists():
+            data = log_path.read_bytes()
+            whole = len(data) - len(data) % wire.FRAME.size
+            if whole != len(data):
+                with open(log_path, "r+b") as f:
+                    f.truncate(whole)
+            replayed = apply_records(engine, data[:whole])
+        return engine, generation, replayed
+
+    def release(self, session_id: str) -> None:
+        """Commit and close a session's journal, keeping its files.
+
+        With the commit thread running this only queues the close for it.
+        """
+        with self._lock:
+            journal = self._journals.pop(session_id, None)
+            self._dirty.pop(session_id, None)
+            if journal is not None and self._thread is not None:
+                self._released[session_id] = journal
+                return
+        if journal is not None:
+            journal.close()
+
+    def drop(self, session_id: str) -> None:
+        """Forget a session entirely, deleting its files."""
+        self._close_session(session_id)
+        _unlink(self.snapshot_path(session_id))
+        for generation in self.log_generations(session_id):
+            _unlink(self.log_path(session_id, generation))
+
+    def close_released(self) -> int:
+        """Close journals handed over by `release`; returns how many."""
+        with self._lock:
+            released = list(self._released.items())
+        for session_id, journal in released:
+            # Stays listed until closed, so a reopen waits for the close.
+            journal.close()
+            with self._lock:
+                if self._released.get(session_id) is journal:
+                    del self._released[session_id]
+        return len(released)
+
+    def _close_session(self, session_id: str) -> None:
+        with self._lock:
+            journals = [self._journals.pop(session_id, None), self._released.pop(session_id, None)]
+            self._dirty.pop(session_id, None)
+        for journal in journals:
+            if journal is not None:
+                journal.close()
+
+    def commit_all(self) -> int:
+        """Commit every session with pending writes; returns how many."""
+        with self._lock:
+            dirty = list(self._dirty.values())
+            self._dirty.clear()
+        for journal in dirty:
+            journal.commit()
+        return len(dirty)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="score-journal", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the commit thread and flush everything."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.close_released()
+        self.commit_all()
+        with self._lock:
+            journals: List[SessionJournal] = list(self._journals.values())
+        for journal in journals:
+            journal.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.commit_interval_s):
+            self.commit_all()
+            self.close_released()
+
+
+def _write_atomic(path: Path, data: bytes, fsync: bool) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
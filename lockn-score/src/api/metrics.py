@@ -0,0 +1,124 @@
+"""Prometheus exposition of per-session fusion metrics.
+
+`MetricsRegistry` hands out one `EngineMetrics` per session and renders
+all of them in the Prometheus text format (version 0.0.4). Latencies are
+exported as summaries with fixed quantiles, computed from the HDR-style
+histograms at scrape time. Sessions with a reorder buffer also export its
+`ReorderStats`: late events dropped, events released early at capacity,
+and the largest arrival lateness seen.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List
+
+from src.fusion.metrics import EngineMetrics, LatencyHistogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+class MetricsRegistry:
+    """Per-session `EngineMetrics`, created on demand."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, EngineMetrics] = {}
+
+    def for_session(self, session_id: str) -> EngineMetrics:
+        with self._lock:
+            metrics = self._sessions.get(session_id)
+            if metrics is None:
+                metrics = self._sessions[session_id] = EngineMetrics()
+            return metrics
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def render(self) -> str:
+        with self._lock:
+            sessions = sorted(self._sessions.items())
+        lines: List[str] = [
+            "# HELP lockn_score_sessions Sessions with metrics.",
+            "# TYPE lockn_score_sessions gauge",
+            f"lockn_score_sessions {len(sessions)}",
+            "# HELP lockn_score_stage_latency_seconds Time spent per call, by stage.",
+            "# TYPE lockn_score_stage_latency_seconds summary",
+        ]
+        for session_id, metrics in sessions:
+            for stage, histogram in metrics.stages():
+                labels = f'session="{_escape(session_id)}",stage="{stage}"'
+                _summary(lines, "lockn_score_stage_latency_seconds", labels, histogram)
+
+        lines += [
+            "# HELP lockn_score_capture_age_seconds Age of client-stamped events on arrival.",
+            "# TYPE lockn_score_capture_age_seconds summary",
+        ]
+        for session_id, metrics in sessions:
+            if metrics.capture_age.count:
+                labels = f'session="{_escape(session_id)}"'
+                _summary(lines, "lockn_score_capture_age_seconds", labels, metrics.capture_age)
+
+        lines += [
+            "# HELP lockn_score_events_total Events applied, by stage.",
+            "# TYPE lockn_score_events_total counter",
+        ]
+        for session_id, metrics in sessions:
+            for stage, count in sorted(metrics.events.items()):
+                lines.append(
+                    f'lockn_score_events_total{{session="{_escape(session_id)}",stage="{stage}"}} {count}'
+                )
+
+        lines += [
+            "# HELP lockn_score_transitions_total Rally state transitions, by target state.",
+            "# TYPE lockn_score_transitions_total counter",
+        ]
+        for session_id, metrics in sessions:
+            for state, count in sorted(metrics.transitions.items()):
+                lines.append(
+                    f'lockn_score_transitions_total{{session="{_escape(session_id)}",to_state="{state}"}} {count}'
+                )
+
+        reordered = [
+            (f'session="{_escape(session_id)}"', metrics.reorder.stats)
+            for session_id, metrics in sessions
+            if metrics.reorder is not None
+        ]
+        lines += [
+            "# HELP lockn_score_reorder_dropped_late_total Events dropped by the reorder buffer as too late.",
+            "# TYPE lockn_score_reorder_dropped_late_total counter",
+        ]
+        lines += [
+            f"lockn_score_reorder_dropped_late_total{{{labels}}} {stats.dropped_late}"
+            for labels, stats in reordered
+        ]
+        lines += [
+            "# HELP lockn_score_reorder_forced_releases_total Events released early by a full reorder buffer.",
+            "# TYPE lockn_score_reorder_forced_releases_total counter",
+        ]
+        lines += [
+            f"lockn_score_reorder_forced_releases_total{{{labels}}} {stats.forced_releases}"
+            for labels, stats in reordered
+        ]
+        lines += [
+            "# HELP lockn_score_reorder_max_lateness_seconds Largest arrival delay behind the newest event.",
+            "# TYPE lockn_score_reorder_max_lateness_seconds gauge",
+        ]
+        lines += [
+            f"lockn_score_reorder_max_lateness_seconds{{{labels}}} {stats.max_lateness_ms / 1e3:.9g}"
+            for labels, stats in reordered
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _summary(lines: List[str], name: str, labels: str, histogram: LatencyHistogram) -> None:
+    for q in QUANTILES:
+        lines.append(f'{name}{{{labels},quantile="{q}"}} {histogram.quantile(q) / 1e9:.9g}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total / 1e9:.9g}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
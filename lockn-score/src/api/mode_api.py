@@ -0,0 +1,164 @@
+"""Session API for solo/rally/game scoring modes.
+
+`POST /api/session/{mode}` creates a session and returns its id. Events
+arrive either explicitly (`/hit`, `/miss`, `/point`, `/rally-end`,
+`/undo`) or from the fusion layer: rally status changes on the Score API
+session with the same id are fed to the mode via `observe`.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.fusion.rally_tracker import RallyStatus
+from src.modes.base import Mode, ModeError, ModeEvent
+from src.modes.game import GameMode, GameSettings
+from src.modes.rally import RallyMode, RallySettings
+from src.modes.solo import SoloMode, SoloSettings
+
+router = APIRouter(prefix="/api/session")
+
+
+class ModeSessionStore:
+    """Thread-safe map of session id to its `Mode`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Mode] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, mode: Mode) -> str:
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            self._sessions[session_id] = mode
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Mode]:
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def apply(self, mode: Mode, event_type: str, **params: Any) -> None:
+        with self._lock:
+            mode.apply(event_type, **params)
+
+    def undo(self, mode: Mode) -> ModeEvent:
+        with self._lock:
+            return mode.undo()
+
+    def observe(self, session_id: str, status: RallyStatus) -> List[str]:
+        """Feed a fusion status to the mode session with this id, if any."""
+        mode = self._sessions.get(session_id)
+        if mode is None:
+            return []
+        with self._lock:
+            return mode.observe(status)
+
+
+sessions = ModeSessionStore()
+
+
+def _session_body(session_id: str, mode: Mode) -> Dict[str, Any]:
+    return {"session_id": session_id, "mode": mode.name, "state": mode.to_dict()}
+
+
+def _event_body(session_id: str, mode: Mode, event_type: str) -> Dict[str, Any]:
+    body = _session_body(session_id, mode)
+    body["event_type"] = event_type
+    return body
+
+
+def _require(session_id: str) -> Mode:
+    mode = sessions.get(session_id)
+    if mode is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    return mode
+
+
+def _apply(session_id: str, event_type: str, **params: Any) -> Dict[str, Any]:
+    mode = _require(session_id)
+    if event_type not in mode.events:
+        label = event_type.replace("_", "-")
+        raise HTTPException(status_code=400, detail=f"{label} is only for game mode")
+    try:
+        sessions.apply(mode, event_type, **params)
+    except ModeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _event_body(session_id, mode, event_type)
+
+
+@router.post("/solo")
+def create_solo(payload: Optional[SoloSettings] = None) -> Dict[str, Any]:
+    settings = payload or SoloSettings()
+    mode = SoloMode(**settings.model_dump())
+    return _session_body(sessions.create(mode), mode)
+
+
+@router.post("/rally")
+def create_rally(payload: Optional[RallySettings] = None) -> Dict[str, Any]:
+    settings = payload or RallySettings()
+    mode = RallyMode(**settings.model_dump())
+    return _session_body(sessions.create(mode), mode)
+
+
+@router.post("/game")
+def create_game(payload: Optional[GameSettings] = None) -> Dict[str, Any]:
+    settings = payload or GameSettings()
+    mode = GameMode(**settings.model_dump())
+    return _session_body(sessions.create(mode), mode)
+
+
+@router.get("/{session_id}")
+def get_session(session_id: str) -> Dict[str, Any]:
+    return _session_body(session_id, _require(session_id))
+
+
+@router.delete("/{session_id}")
+def delete_session(session_id: str) -> Dict[str, Any]:
+    if not sessions.remove(session_id):
+        raise HTTPException(status_code=404, detail="session not found")
+    return {"session_id": session_id, "status": "deleted"}
+
+
+@router.post("/{session_id}/hit")
+def post_hit(session_id: str) -> Dict[str, Any]:
+    return _apply(session_id, "hit")
+
+
+@router.post("/{session_id}/miss")
+def post_miss(session_id: str) -> Dict[str, Any]:
+    return _apply(session_id, "miss")
+
+
+@router.post("/{session_id}/point")
+def post_point(session_id: str, player: int = Query(..., ge=1, le=2)) -> Dict[str, Any]:
+    return _apply(session_id, "point", player=player)
+
+
+@router.post("/{session_id}/rally-end")
+def post_rally_end(session_id: str, rally_length: int = Query(..., ge=0)) -> Dict[str, Any]:
+    return _apply(session_id, "rally_end", rally_length=rally_length)
+
+
+@router.post("/{session_id}/undo")
+def post_undo(session_id: str) -> Dict[str, Any]:
+    mode = _require(session_id)
+    try:
+        undone = sessions.undo(mode)
+    except ModeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    body = _event_body(session_id, mode, "undo")
+    body["undone"] = undone.event_type
+    return body
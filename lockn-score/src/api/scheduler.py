@@ -0,0 +1,300 @@
+"""Timer-wheel driven rally timeouts for Score API sessions.
+
+Instead of an external client calling `POST /score/tick` on a schedule,
+the `TickScheduler` arms one timer per session while its rally is in play
+and ticks the session only when a vision/rally timeout could fire.
+
+Timers live in a hierarchical hashed `TimerWheel`, so arming, cancelling
+and expiring are O(1) amortized regardless of how many sessions exist, and
+one asyncio task drives every session.
+
+Deadlines are derived from event timestamps but timers run on the
+monotonic clock: each session's event clock is anchored at its last
+ingest (see `TickScheduler`), so any event clock works.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from src.api.sessions import SessionRegistry
+from src.api.writer import QueueFull
+from src.fusion.rally_tracker import RallyStatus
+
+
+class TimerWheel:
+    """Hierarchical hashed timer wheel.
+
+    Level 0 has `slots` buckets of `resolution_s` each; every higher level
+    covers `slots` times the span of the one below. Timers cascade down a
+    level when their bucket comes due. A key has at most one timer.
+    """
+
+    def __init__(
+        self,
+        resolution_s: float = 0.01,
+        slots: int = 64,
+        levels: int = 4,
+        start: float = 0.0,
+    ) -> None:
+        if resolution_s <= 0 or slots < 2 or levels < 1:
+            raise ValueError("invalid timer wheel geometry")
+        self.resolution_s = resolution_s
+        self.slots = slots
+        self.levels = levels
+        self._spans = [slots**level for level in range(levels)]
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        # key -> (level, slot)
+        self._timers: Dict[Hashable, Tuple[int, int]] = {}
+        self._tick = int(start // resolution_s)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._timers
+
+    def keys(self) -> List[Hashable]:
+        return list(self._timers)
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Arm (or re-arm) `key` to expire at `deadline` seconds."""
+        self.cancel(key)
+        expiry = max(math.ceil(deadline / self.resolution_s), self._tick + 1)
+        self._place(key, expiry)
+
+    def cancel(self, key: Hashable) -> bool:
+        location = self._timers.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move time forward to `now`; return keys whose deadline passed."""
+        target = int(now // self.resolution_s)
+        expired: List[Hashable] = []
+        if not self._timers:
+            self._tick = max(self._tick, target)
+            return expired
+        slots = self.slots
+        while self._tick < target and self._timers:
+            self._tick += 1
+            tick = self._tick
+            for level in range(1, self.levels):
+                span = self._spans[level]
+                if tick % span:
+                    break
+                bucket = self._wheels[level][(tick // span) % slots]
+                if bucket:
+                    entries = list(bucket.items())
+                    bucket.clear()
+                    for key, expiry in entries:
+                        del self._timers[key]
+                        self._place(key, expiry)
+            bucket = self._wheels[0][tick % slots]
+            if bucket:
+                for key, expiry in list(bucket.items()):
+                    if expiry <= tick:
+                        del bucket[key]
+                        del self._timers[key]
+                        expired.append(key)
+        self._tick = max(self._tick, target)
+        return expired
+
+    def _place(self, key: Hashable, expiry: int) -> None:
+        tick = self._tick
+        slots = self.slots
+        for level, span in enumerate(self._spans):
+            if expiry // span - tick // span < slots:
+                break
+        else:
+            # Beyond the wheel's range: park in the furthest top-level bucket
+            # and re-place when it cascades.
+            level = self.levels - 1
+            span = self._spans[level]
+            expiry_block = tick // span + slots - 1
+            slot = expiry_block % slots
+            self._wheels[level][slot][key] = expiry
+            self._timers[key] = (level, slot)
+            return
+        slot = (expiry // span) % slots
+        self._wheels[level][slot][key] = expiry
+        self._timers[key] = (level, slot)
+
+
+class TickScheduler:
+    """Ticks sessions from a timer wheel and reports state changes.
+
+    `arm` is called after a session ingests events and is cheap when the
+    session already has a timer: the timer is lazy, and when it fires the
+    session is ticked and re-armed for its current deadline if the rally
+    is still in play. `arm` is thread-safe; `run` must be awaited on the
+    event loop, which is also where `on_status` is called.
+
+    The wheel runs on `clock` (monotonic), not on the events' clock.
+    `arm` anchors the session's newest event timestamp to the clock, and
+    the session's "now" is that timestamp plus the clock time elapsed
+    since. Sessions stamped with sample clocks, `perf_counter` or replayed
+    timestamps therefore time out after the configured timeout like
+    wall-clock ones.
+
+    With `submit` (`SessionWriters.submit`) ticks from `run` are applied
+    as session writes, in order with the session's ingestion.
+    """
+
+    def __init__(
+        self,
+        registry: SessionRegistry,
+        on_status: Optional[Callable[[str, RallyStatus], None]] = None,
+        resolution_s: float = 0.01,
+        clock: Callable[[], float] = time.monotonic,
+        submit: Optional[Callable[..., Awaitable[Any]]] = None,
+    ) -> None:
+        self.registry = registry
+        self.on_status = on_status
+        self.submit = submit
+        self._clock = clock
+        self._wheel = TimerWheel(resolution_s=resolution_s, start=clock())
+        # session id -> (event timestamp, clock time it was ingested at)
+        self._anchors: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._ticks: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    def armed(self) -> Set[str]:
+        with self._lock:
+            return set(self._wheel.keys())
+
+    def event_now(self, session_id: str, now: Optional[float] = None) -> Optional[float]:
+        """Session `session_id`'s event-clock time at clock time `now`."""
+        anchor = self._anchors.get(session_id)
+        if anchor is None:
+            return None
+        now = self._clock() if now is None else now
+        return anchor[0] + (now - anchor[1])
+
+    def arm(self, session_id: str) -> None:
+        """Ensure `session_id` has a timer if its rally could time out."""
+        engine = self.registry.peek(session_id)
+        if engine is None:
+            return
+        latest = engine.event_time()
+        if latest is None:
+            return
+        self._anchors[session_id] = (latest, self._clock())
+        if session_id in self._wheel:
+            return
+        self._schedule(session_id, engine)
+
+    def _schedule(self, session_id: str, engine: Any) -> bool:
+        deadline = engine.next_deadline()
+        anchor = self._anchors.get(session_id)
+        if deadline is None or anchor is None:
+            self._anchors.pop(session_id, None)
+            return False
+        with self._lock:
+            was_idle = not len(self._wheel)
+            self._wheel.schedule(session_id, anchor[1] + (deadline - anchor[0]))
+        if was_idle and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def disarm(self, session_id: str) -> None:
+        with self._lock:
+            self._wheel.cancel(session_id)
+        self._anchors.pop(session_id, None)
+
+    def expire(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Advance the wheel; return `(session id, event-clock now)` of expired timers."""
+        now = self._clock() if now is None else now
+        with self._lock:
+            expired = self._wheel.advance(now)
+        due: List[Tuple[str, float]] = []
+        for session_id in expired:
+            event_now = self.event_now(session_id, now)  # type: ignore[arg-type]
+            if event_now is not None:
+                due.append((session_id, event_now))
+        return due
+
+    def tick_session(self, session_id: str, event_now: float) -> None:
+        """Tick one session at `event_now`, report a change and re-arm it."""
+        engine = self.registry.peek(session_id)
+        if engine is None:
+            self._anchors.pop(session_id, None)
+            return  # evicted since it was armed
+        tracker = engine.tracker
+        before = (tracker.state, tracker.rally_count)
+        status = engine.tick(event_now).status
+        if (status.state, status.rally_count) != before and self.on_status is not None:
+            self.on_status(session_id, status)
+        if session_id not in self._wheel:
+            self._schedule(session_id, engine)
+
+    def fire_due(self, now: Optional[float] = None) -> List[str]:
+        """Tick every session whose timer expired, inline; return their ids."""
+        due = self.expire(now)
+        for session_id, event_now in due:
+            self.tick_session(session_id, event_now)
+        return [session_id for session_id, _ in due]
+
+    async def _submit_tick(self, session_id: str, event_now: float) -> None:
+        assert self.submit is not None
+        try:
+            await self.submit(session_id, self.tick_session, session_id, event_now)
+        except QueueFull:
+            # The session is backlogged; its next ingest re-arms it, and
+            # until then retry on the next wheel tick.
+            engine = self.registry.peek(session_id)
+            if engine is not None:
+                with self._lock:
+                    self._wheel.schedule(session_id, self._clock())
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        resolution = self._wheel.resolution_s
+        try:
+            while True:
+                if not len(self._wheel):
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                await asyncio.sleep(resolution)
+                if self.submit is None:
+                    self.fire_due()
+                    continue
+                for session_id, event_now in self.expire():
+                    task = self._loop.create_task(self._submit_tick(session_id, event_now))
+                    self._ticks.add(task)
+                    task.add_done_callback(self._ticks.discard)
+        finally:
+            self._loop = None
+            self._wakeup = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for task in list(self._ticks):
+            task.cancel()
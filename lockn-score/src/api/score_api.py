@@ -1,17 +1,186 @@
-"""FastAPI endpoints for rally score state."""
+"""FastAPI endpoints for rally score state.
+
+Each table is scored by its own session, addressed as
+`/score/{session_id}/...`. The unprefixed `/score/...` routes operate on
+the `default` session for single-table deployments.
+
+`/score/{session_id}/ws` is a bidirectional stream: clients send vision,
+audio and tick frames (JSON text or the binary records in `wire`) and
+every subscriber of the session receives a `status` message only when the
+rally state or rally count changes.
+
+Rally timeouts fire on their own: while the app is running, `scheduler`
+ticks a session when its vision/rally timeout could expire, so clients no
+longer need to poll `/tick` (it remains available for explicit ticks).
+Timeouts are measured from each session's last ingested event timestamp
+plus elapsed monotonic time, so events need not be stamped with epoch
+seconds; scheduler ticks are session writes through `writers`.
+
+Scoring modes live under `/api/session` (see `mode_api`); a mode session
+receives this API's rally status for the Score session with the same id.
+
+Sources stamp events on their own clocks (the audio detector uses its
+sample clock). Clients post `(source_timestamp, reference_timestamp)` pairs
+to `/score/{session_id}/clock`; from then on that source's event
+timestamps are mapped onto the server's `time.time()` timeline by a
+per-session `ClockAligner` before they reach the engine. Sources that
+never post pairs are used as-is. The aligner is kept on the session's
+engine (`FusionEngine.clock`), so it is evicted with the session and
+journaled and restored with it.
+
+Vision and audio posts (single and batch) accept the fixed-layout binary
+records of `wire` when sent with `Content-Type: application/vnd.lockn.vision`
+or `application/vnd.lockn.audio`; any other content type is parsed as JSON.
+Binary batches go from a zero-copy NumPy view straight into the engine
+without building a pydantic model per record.
+
+`/score/{session_id}/history` returns the session's recent events and
+rally state changes (bounded ring buffers, see `fusion.history`) for a
+time range or the last `last_s` seconds; `/history/export` returns the
+same events as binary `wire` frames that can be replayed through the
+WebSocket or a fresh engine.
+
+Ingestion and other session writes are async handlers that run on the
+event loop through `writers`, a per-session single-writer queue (see
+`writer`): a session's writes are applied one at a time and in order
+without locks or threadpool hops, and writes forwarded by other cluster
+workers join the same queue. A session with `writers.max_pending` queued
+writes answers 503.
+
+Set `LOCKN_SCORE_JOURNAL_DIR` to persist sessions: every ingested event is
+journaled there and sessions are restored from it after a restart.
+Journal disk I/O stays off the event loop: sessions not in memory are
+opened in a thread before their write runs, evicted sessions are closed
+by the journal's commit thread, and deleted sessions' files are removed
+in a thread.
+
+Set `LOCKN_SCORE_METRICS=1` to record per-session engine and handler
+latency histograms, served in Prometheus text format on `/metrics`.
+
+Set `LOCKN_SCORE_WORKERS=N` when running `uvicorn --workers N`. Each
+session is then owned by one worker (see `cluster`): other workers
+forward its writes and WebSocket frames to the owner and answer state
+reads from the shared-memory status table. Workers rendezvous in
+`LOCKN_SCORE_CLUSTER_DIR` (default: `lockn-score` in the temp directory).
+Mode sessions and `/metrics` remain per worker.
+"""
 
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from time import perf_counter_ns
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from src.api import mode_api, wire
+from src.api.cluster import WorkerCluster
+from src.api.journal import JournalStore
+from src.api.metrics import CONTENT_TYPE, MetricsRegistry
+from src.api.scheduler import TickScheduler
+from src.api.sessions import SessionRegistry
+from src.api.streaming import StatusBroadcaster, put_latest
+from src.api.writer import QueueFull, SessionWriters
+from src.fusion.clock_sync import SOURCE_AUDIO, SOURCE_VISION
+from src.fusion.engine import FusionBatchOutput, FusionEngine
+from src.fusion.history import KIND_NAMES, STATES, EventHistory
+from src.fusion.rally_tracker import RallyState, RallyStatus
+
+DEFAULT_SESSION = "default"
+
+JOURNAL_DIR_ENV = "LOCKN_SCORE_JOURNAL_DIR"
+METRICS_ENV = "LOCKN_SCORE_METRICS"
+WORKERS_ENV = "LOCKN_SCORE_WORKERS"
+CLUSTER_DIR_ENV = "LOCKN_SCORE_CLUSTER_DIR"
+
+# How often a WebSocket served by a non-owner worker polls the status table.
+CLUSTER_POLL_S = 0.01
+
+journal: Optional[JournalStore] = None
+if os.environ.get(JOURNAL_DIR_ENV):
+    journal = JournalStore(os.environ[JOURNAL_DIR_ENV])
+
+metrics: Optional[MetricsRegistry] = None
+if os.environ.get(METRICS_ENV, "0") not in ("", "0"):
+    metrics = MetricsRegistry()
+
+cluster: Optional[WorkerCluster] = None
+if int(os.environ.get(WORKERS_ENV) or 1) > 1:
+    cluster = WorkerCluster(
+        os.environ.get(CLUSTER_DIR_ENV) or os.path.join(tempfile.gettempdir(), "lockn-score"),
+        int(os.environ[WORKERS_ENV]),
+    )
+
+def _create_engine(session_id: str) -> FusionEngine:
+    if journal is not None:
+        engine: FusionEngine = journal.open_engine(session_id, registry.config)
+    else:
+        engine = FusionEngine(registry.config)
+    if metrics is not None:
+        engine.metrics = metrics.for_session(session_id)
+        engine.metrics.reorder = engine.reorder
+    return engine
+
+
+def _remove_engine(session_id: str) -> None:
+    _pushed.pop(session_id, None)
+    if cluster is not None:
+        cluster.remove(session_id)
+    if journal is not None:
+        journal.release(session_id)
+    if metrics is not None:
+        metrics.drop(session_id)
+
+
+registry = SessionRegistry(engine_factory=_create_engine, on_remove=_remove_engine)
+broadcaster = StatusBroadcaster()
+writers = SessionWriters()
+# (state, rally_count) last pushed to subscribers, per session.
+_pushed: Dict[str, Tuple[RallyState, int]] = {}
+_IDLE_KEY = (RallyState.IDLE, 0)
+
+
+def _publish_status(session_id: str, status: RallyStatus) -> None:
+    _pushed[session_id] = (status.state, status.rally_count)
+    if cluster is not None:
+        cluster.publish(session_id, status)
+    mode_api.sessions.observe(session_id, status)
+    broadcaster.publish(session_id, _status_message(status))
+
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+scheduler = TickScheduler(registry, on_status=_publish_status, submit=writers.submit)
 
-from src.fusion.engine import FusionEngine
-from src.fusion.rally_tracker import RallyState
 
-app = FastAPI(title="LockN Score API")
-engine = FusionEngine()
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    writers.bind(asyncio.get_running_loop())
+    if cluster is not None:
+        cluster.start(_serve_forward)
+    if journal is not None:
+        journal.start()
+    scheduler.start()
+    try:
+        yield
+    finally:
+        await scheduler.stop()
+        if journal is not None:
+            journal.close()
+        if cluster is not None:
+            cluster.close()
+        writers.bind(None)
+
+
+app = FastAPI(title="LockN Score API", lifespan=_lifespan)
+app.include_router(mode_api.router)
 
 
 class VisionPayload(BaseModel):
@@ -26,6 +195,30 @@ class AudioPayload(BaseModel):
     confidence: float
 
 
+class VisionBatchPayload(BaseModel):
+    detections: List[VisionPayload]
+
+
+class AudioBatchPayload(BaseModel):
+    bounces: List[AudioPayload]
+
+
+class ClockPayload(BaseModel):
+    source: Literal["vision", "audio"]
+    source_timestamp: float
+    reference_timestamp: Optional[float] = None
+
+
+class ClockState(BaseModel):
+    source: str
+    accepted: bool
+    rate: float
+    drift_ppm: float
+    rms_error_s: float
+    samples: int
+    rejected: int
+
+
 class ScoreState(BaseModel):
     state: RallyState
     rally_count: int
@@ -33,36 +226,783 @@ class ScoreState(BaseModel):
     last_ball_ts: Optional[float]
 
 
-@app.get("/score/state", response_model=ScoreState)
-def get_state() -> ScoreState:
-    status = engine.tracker.get_status()
-    return ScoreState(**status.__dict__)
+class TransitionState(BaseModel):
+    timestamp: float
+    from_state: RallyState
+    to_state: RallyState
+    rally_count: int
 
 
-@app.post("/score/vision", response_model=ScoreState)
-def post_vision(payload: VisionPayload) -> ScoreState:
-    output = engine.process_vision(
-        payload.timestamp, payload.x, payload.y, payload.confidence
+class ScoreBatchState(ScoreState):
+    transitions: List[TransitionState]
+
+
+class HistoryEvent(BaseModel):
+    type: Literal["vision", "audio", "tick"]
+    timestamp: float
+    x: float
+    y: float
+    confidence: float
+
+
+class HistoryState(BaseModel):
+    events: List[HistoryEvent]
+    # State changes, plus counted bounces (from_state == to_state).
+    transitions: List[TransitionState]
+
+
+def _score_state(status: RallyStatus) -> ScoreState:
+    return ScoreState(
+        state=status.state,
+        rally_count=status.rally_count,
+        last_bounce_ts=status.last_bounce_ts,
+        last_ball_ts=status.last_ball_ts,
     )
-    status = output.status
-    return ScoreState(**status.__dict__)
 
 
-@app.post("/score/audio", response_model=ScoreState)
-def post_audio(payload: AudioPayload) -> ScoreState:
-    output = engine.process_audio(payload.timestamp, payload.confidence)
+def _batch_state(output: FusionBatchOutput) -> ScoreBatchState:
     status = output.status
-    return ScoreState(**status.__dict__)
+    return ScoreBatchState(
+        state=status.state,
+        rally_count=status.rally_count,
+        last_bounce_ts=status.last_bounce_ts,
+        last_ball_ts=status.last_ball_ts,
+        transitions=[
+            TransitionState(
+                timestamp=t.timestamp,
+                from_state=t.from_state,
+                to_state=t.to_state,
+                rally_count=t.rally_count,
+            )
+            for t in output.transitions
+        ],
+    )
 
 
-@app.post("/score/tick", response_model=ScoreState)
-def post_tick(timestamp: Optional[float] = None) -> ScoreState:
+_IDLE_STATUS = RallyStatus(
+    state=RallyState.IDLE, rally_count=0, last_bounce_ts=None, last_ball_ts=None
+)
+
+
+def _remote(session_id: str) -> bool:
+    return cluster is not None and not cluster.is_local(session_id)
+
+
+def _forward(session_id: str, op: str, body: Any = None) -> Any:
+    """Run `op` on the worker owning `session_id` and return its response body."""
+    assert cluster is not None
+    try:
+        code, reply = cluster.forward(session_id, op, body)
+    except OSError as exc:
+        raise HTTPException(status_code=503, detail=f"session owner unreachable: {exc}") from None
+    if code != 200:
+        raise HTTPException(status_code=code, detail=reply.get("detail"))
+    return reply
+
+
+def _shared_status(session_id: str) -> RallyStatus:
+    assert cluster is not None
+    entry = cluster.read(session_id)
+    return entry[1] if entry is not None else _IDLE_STATUS
+
+
+def _get_state(session_id: str) -> ScoreState:
+    if _remote(session_id):
+        return _score_state(_shared_status(session_id))
+    return _score_state(registry.get(session_id).tracker.get_status())
+
+
+def _client_ts(engine: FusionEngine, source: str, timestamp: Optional[float]) -> Optional[float]:
+    """Align a client timestamp and record its capture age.
+
+    None (stamp with server time) passes through and is not recorded.
+    """
+    if timestamp is None:
+        return None
+    aligner = engine.clock
+    if aligner is not None:
+        timestamp = aligner.align(source, timestamp)
+    if engine.metrics is not None:
+        engine.metrics.record_capture(timestamp)
+    return timestamp
+
+
+def _ingested(session_id: str, engine: FusionEngine, status: RallyStatus, stage: str, start: int) -> None:
+    scheduler.arm(session_id)
+    if _pushed.get(session_id, _IDLE_KEY) != (status.state, status.rally_count):
+        _publish_status(session_id, status)
+    else:
+        mode_api.sessions.observe(session_id, status)
+        if cluster is not None:
+            cluster.publish(session_id, status)
+    if engine.metrics is not None:
+        engine.metrics.record_latency(stage, perf_counter_ns() - start)
+
+
+def _post_vision(session_id: str, payload: VisionPayload) -> ScoreState:
+    if _remote(session_id):
+        return ScoreState(**_forward(session_id, "vision", payload.model_dump()))
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    output = engine.process_vision(
+        _client_ts(engine, SOURCE_VISION, payload.timestamp),
+        payload.x,
+        payload.y,
+        payload.confidence,
+    )
+    _ingested(session_id, engine, output.status, "api_vision", start)
+    return _score_state(output.status)
+
+
+def _post_audio(session_id: str, payload: AudioPayload) -> ScoreState:
+    if _remote(session_id):
+        return ScoreState(**_forward(session_id, "audio", payload.model_dump()))
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    output = engine.process_audio(
+        _client_ts(engine, SOURCE_AUDIO, payload.timestamp), payload.confidence
+    )
+    _ingested(session_id, engine, output.status, "api_audio", start)
+    return _score_state(output.status)
+
+
+def _post_vision_batch(session_id: str, payload: VisionBatchPayload) -> ScoreBatchState:
+    if _remote(session_id):
+        return ScoreBatchState(**_forward(session_id, "vision_batch", payload.model_dump()))
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    output = engine.process_vision_batch(
+        (_client_ts(engine, SOURCE_VISION, d.timestamp), d.x, d.y, d.confidence)
+        for d in payload.detections
+    )
+    _ingested(session_id, engine, output.status, "api_vision_batch", start)
+    return _batch_state(output)
+
+
+def _post_audio_batch(session_id: str, payload: AudioBatchPayload) -> ScoreBatchState:
+    if _remote(session_id):
+        return ScoreBatchState(**_forward(session_id, "audio_batch", payload.model_dump()))
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    output = engine.process_audio_batch(
+        (_client_ts(engine, SOURCE_AUDIO, b.timestamp), b.confidence)
+        for b in payload.bounces
+    )
+    _ingested(session_id, engine, output.status, "api_audio_batch", start)
+    return _batch_state(output)
+
+
+def _post_tick(session_id: str, timestamp: Optional[float]) -> ScoreState:
+    if _remote(session_id):
+        return ScoreState(**_forward(session_id, "tick", {"timestamp": timestamp}))
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
     output = engine.tick(timestamp)
-    status = output.status
-    return ScoreState(**status.__dict__)
+    _ingested(session_id, engine, output.status, "api_tick", start)
+    return _score_state(output.status)
 
 
-@app.post("/score/reset")
-def post_reset() -> dict:
+def _post_clock(session_id: str, payload: ClockPayload) -> ClockState:
+    if _remote(session_id):
+        return ClockState(**_forward(session_id, "clock", payload.model_dump()))
+    engine = registry.get(session_id)
+    accepted = engine.observe_clock(
+        payload.source, payload.source_timestamp, payload.reference_timestamp
+    )
+    assert engine.clock is not None
+    fit = engine.clock.fit(payload.source)
+    return ClockState(
+        source=payload.source,
+        accepted=accepted,
+        rate=fit.rate,
+        drift_ppm=fit.drift_ppm,
+        rms_error_s=fit.rms_error,
+        samples=fit.samples,
+        rejected=fit.rejected,
+    )
+
+
+def _reset(session_id: str) -> dict:
+    if _remote(session_id):
+        return _forward(session_id, "reset")
+    engine = registry.get(session_id)
     engine.reset()
+    _publish_status(session_id, engine.tracker.get_status())
+    return {"ok": True}
+
+
+def _delete(session_id: str) -> dict:
+    if _remote(session_id):
+        return _forward(session_id, "delete")
+    scheduler.disarm(session_id)
+    return {"ok": registry.remove(session_id)}
+
+
+def _history_range(
+    session_id: str, start: Optional[float], end: Optional[float], last_s: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Copy of the session's history; run as a session write so no event lands mid-read."""
+    engine = registry.peek(session_id)
+    if engine is None:
+        raise HTTPException(status_code=404, detail="session not found")
+    history: Optional[EventHistory] = engine.history
+    if history is None:
+        raise HTTPException(status_code=404, detail="session history is disabled")
+    if last_s is not None and history.latest is not None:
+        start = history.latest - last_s
+    return history.query(start, end)
+
+
+def _get_history(
+    session_id: str, start: Optional[float], end: Optional[float], last_s: Optional[float]
+) -> HistoryState:
+    if _remote(session_id):
+        return HistoryState(
+            **_forward(session_id, "history", {"start": start, "end": end, "last_s": last_s})
+        )
+    return _history_state(*_history_range(session_id, start, end, last_s))
+
+
+def _history_state(events: np.ndarray, changes: np.ndarray) -> HistoryState:
+    return HistoryState(
+        events=[
+            HistoryEvent(type=KIND_NAMES[kind], timestamp=ts, x=x, y=y, confidence=conf)
+            for kind, ts, x, y, conf in events.tolist()
+        ],
+        transitions=[
+            TransitionState(
+                timestamp=ts, from_state=STATES[before], to_state=STATES[after], rally_count=count
+            )
+            for ts, before, after, count in changes.tolist()
+        ],
+    )
+
+
+def _export_history(session_id: str, last_s: Optional[float]) -> Response:
+    if _remote(session_id):
+        data = base64.b64decode(_forward(session_id, "history_export", {"last_s": last_s})["bytes"])
+    else:
+        data = _history_range(session_id, None, None, last_s)[0].tobytes()
+    return Response(content=data, media_type=wire.FRAMES_CONTENT_TYPE)
+
+
+async def _history_request(
+    session_id: str, start: Optional[float], end: Optional[float], last_s: Optional[float]
+) -> HistoryState:
+    if _remote(session_id):
+        return await asyncio.to_thread(_get_history, session_id, start, end, last_s)
+    events, changes = await _dispatch(session_id, _history_range, start, end, last_s, create=False)
+    # Building thousands of response models is left off the loop.
+    return await asyncio.to_thread(_history_state, events, changes)
+
+
+async def _export_request(session_id: str, last_s: Optional[float]) -> Response:
+    if _remote(session_id):
+        return await asyncio.to_thread(_export_history, session_id, last_s)
+    events, _ = await _dispatch(session_id, _history_range, None, None, last_s, create=False)
+    return Response(content=events.tobytes(), media_type=wire.FRAMES_CONTENT_TYPE)
+
+
+# -- Request bodies ------------------------------------------------------------
+
+_BINARY_SCHEMA = {"type": "string", "format": "binary"}
+
+
+def _body_openapi(schema: Dict[str, Any], content_type: str) -> Dict[str, Any]:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}, content_type: {"schema": _BINARY_SCHEMA}},
+        }
+    }
+
+
+def _batch_schema(field: str, model: type) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "required": [field],
+        "properties": {field: {"type": "array", "items": model.model_json_schema()}},
+    }
+
+
+_VISION_OPENAPI = _body_openapi(VisionPayload.model_json_schema(), wire.VISION_CONTENT_TYPE)
+_AUDIO_OPENAPI = _body_openapi(AudioPayload.model_json_schema(), wire.AUDIO_CONTENT_TYPE)
+_VISION_BATCH_OPENAPI = _body_openapi(_batch_schema("detections", VisionPayload), wire.VISION_CONTENT_TYPE)
+_AUDIO_BATCH_OPENAPI = _body_openapi(_batch_schema("bounces", AudioPayload), wire.AUDIO_CONTENT_TYPE)
+
+
+def _content_type(request: Request) -> str:
+    return request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+
+def _parse_json(model: Any, body: bytes) -> Any:
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as exc:
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+        raise RequestValidationError(errors) from None
+
+
+async def _open(session_id: str) -> None:
+    """Load a journaled session in a thread; recovery reads the disk."""
+    if journal is not None and session_id not in registry:
+        await asyncio.to_thread(registry.get, session_id)
+
+
+async def _dispatch(
+    session_id: str, handler: Callable[..., Any], *args: Any, create: bool = True
+) -> Any:
+    """Run a handler as a session write, or in a thread when it forwards to another worker.
+
+    With `create`, a session that is not in memory is opened first, off the
+    loop, so the write finds it resident.
+    """
+    if _remote(session_id):
+        return await asyncio.to_thread(handler, session_id, *args)
+    if create:
+        await _open(session_id)
+    try:
+        return await writers.submit(session_id, handler, session_id, *args)
+    except QueueFull as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from None
+
+
+def _records(body: bytes, dtype: np.dtype) -> np.ndarray:
+    try:
+        return wire.decode_records(body, dtype)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+
+
+def _timestamps(engine: FusionEngine, source: str, stamps: np.ndarray) -> np.ndarray:
+    """Align client timestamps and stamp NaN ones with server time.
+
+    Capture ages are recorded for the client-stamped ones only.
+    """
+    missing = np.isnan(stamps)
+    aligner = engine.clock
+    if aligner is not None:
+        stamps = aligner.align(source, stamps)
+    if engine.metrics is not None:
+        engine.metrics.record_captures(stamps[~missing].tolist())
+    if missing.any():
+        stamps = np.where(missing, time.time(), stamps)
+    return stamps
+
+
+def _single(records: np.ndarray) -> np.void:
+    if len(records) != 1:
+        raise HTTPException(status_code=422, detail=f"expected 1 record, got {len(records)}")
+    return records[0]
+
+
+def _optional(timestamp: float) -> Optional[float]:
+    return None if timestamp != timestamp else timestamp
+
+
+def _post_vision_records(session_id: str, records: np.ndarray) -> ScoreBatchState:
+    if _remote(session_id):
+        return _post_vision_batch(
+            session_id,
+            VisionBatchPayload(
+                detections=[
+                    VisionPayload(timestamp=_optional(ts), x=x, y=y, confidence=c)
+                    for ts, x, y, c in records.tolist()
+                ]
+            ),
+        )
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    stamps = _timestamps(engine, SOURCE_VISION, records["timestamp"])
+    output = engine.process_vision_batch(
+        zip(
+            stamps.tolist(),
+            records["x"].tolist(),
+            records["y"].tolist(),
+            records["confidence"].tolist(),
+        )
+    )
+    _ingested(session_id, engine, output.status, "api_vision_batch", start)
+    return _batch_state(output)
+
+
+def _post_audio_records(session_id: str, records: np.ndarray) -> ScoreBatchState:
+    if _remote(session_id):
+        return _post_audio_batch(
+            session_id,
+            AudioBatchPayload(
+                bounces=[AudioPayload(timestamp=_optional(ts), confidence=c) for ts, c in records.tolist()]
+            ),
+        )
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    stamps = _timestamps(engine, SOURCE_AUDIO, records["timestamp"])
+    output = engine.process_audio_batch(zip(stamps.tolist(), records["confidence"].tolist()))
+    _ingested(session_id, engine, output.status, "api_audio_batch", start)
+    return _batch_state(output)
+
+
+async def _vision_request(session_id: str, request: Request) -> ScoreState:
+    body = await request.body()
+    if _content_type(request) == wire.VISION_CONTENT_TYPE:
+        ts, x, y, confidence = _single(_records(body, wire.VISION_RECORD)).tolist()
+        payload = VisionPayload(timestamp=_optional(ts), x=x, y=y, confidence=confidence)
+    else:
+        payload = _parse_json(VisionPayload, body)
+    return await _dispatch(session_id, _post_vision, payload)
+
+
+async def _audio_request(session_id: str, request: Request) -> ScoreState:
+    body = await request.body()
+    if _content_type(request) == wire.AUDIO_CONTENT_TYPE:
+        ts, confidence = _single(_records(body, wire.AUDIO_RECORD)).tolist()
+        payload = AudioPayload(timestamp=_optional(ts), confidence=confidence)
+    else:
+        payload = _parse_json(AudioPayload, body)
+    return await _dispatch(session_id, _post_audio, payload)
+
+
+async def _vision_batch_request(session_id: str, request: Request) -> ScoreBatchState:
+    body = await request.body()
+    if _content_type(request) == wire.VISION_CONTENT_TYPE:
+        return await _dispatch(session_id, _post_vision_records, _records(body, wire.VISION_RECORD))
+    return await _dispatch(session_id, _post_vision_batch, _parse_json(VisionBatchPayload, body))
+
+
+async def _audio_batch_request(session_id: str, request: Request) -> ScoreBatchState:
+    body = await request.body()
+    if _content_type(request) == wire.AUDIO_CONTENT_TYPE:
+        return await _dispatch(session_id, _post_audio_records, _records(body, wire.AUDIO_RECORD))
+    return await _dispatch(session_id, _post_audio_batch, _parse_json(AudioBatchPayload, body))
+
+
+# -- Default session ---------------------------------------------------------
+
+
+@app.get("/score/state", response_model=ScoreState)
+async def get_state() -> ScoreState:
+    return await _dispatch(DEFAULT_SESSION, _get_state)
+
+
+@app.post("/score/vision", response_model=ScoreState, openapi_extra=_VISION_OPENAPI)
+async def post_vision(request: Request) -> ScoreState:
+    return await _vision_request(DEFAULT_SESSION, request)
+
+
+@app.post("/score/audio", response_model=ScoreState, openapi_extra=_AUDIO_OPENAPI)
+async def post_audio(request: Request) -> ScoreState:
+    return await _audio_request(DEFAULT_SESSION, request)
+
+
+@app.post("/score/vision/batch", response_model=ScoreBatchState, openapi_extra=_VISION_BATCH_OPENAPI)
+async def post_vision_batch(request: Request) -> ScoreBatchState:
+    return await _vision_batch_request(DEFAULT_SESSION, request)
+
+
+@app.post("/score/audio/batch", response_model=ScoreBatchState, openapi_extra=_AUDIO_BATCH_OPENAPI)
+async def post_audio_batch(request: Request) -> ScoreBatchState:
+    return await _audio_batch_request(DEFAULT_SESSION, request)
+
+
+@app.post("/score/tick", response_model=ScoreState)
+async def post_tick(timestamp: Optional[float] = None) -> ScoreState:
+    return await _dispatch(DEFAULT_SESSION, _post_tick, timestamp)
+
+
+@app.post("/score/clock", response_model=ClockState)
+async def post_clock(payload: ClockPayload) -> ClockState:
+    return await _dispatch(DEFAULT_SESSION, _post_clock, payload)
+
+
+@app.post("/score/reset")
+async def post_reset() -> dict:
+    return await _dispatch(DEFAULT_SESSION, _reset)
+
+
+@app.get("/score/history", response_model=HistoryState)
+async def get_history(
+    start: Optional[float] = None, end: Optional[float] = None, last_s: Optional[float] = None
+) -> HistoryState:
+    return await _history_request(DEFAULT_SESSION, start, end, last_s)
+
+
+@app.get("/score/history/export")
+async def get_history_export(last_s: Optional[float] = None) -> Response:
+    return await _export_request(DEFAULT_SESSION, last_s)
+
+
+# -- Per-session routes ------------------------------------------------------
+
+
+@app.get("/score/{session_id}/state", response_model=ScoreState)
+async def get_session_state(session_id: str) -> ScoreState:
+    return await _dispatch(session_id, _get_state)
+
+
+@app.post("/score/{session_id}/vision", response_model=ScoreState, openapi_extra=_VISION_OPENAPI)
+async def post_session_vision(session_id: str, request: Request) -> ScoreState:
+    return await _vision_request(session_id, request)
+
+
+@app.post("/score/{session_id}/audio", response_model=ScoreState, openapi_extra=_AUDIO_OPENAPI)
+async def post_session_audio(session_id: str, request: Request) -> ScoreState:
+    return await _audio_request(session_id, request)
+
+
+@app.post(
+    "/score/{session_id}/vision/batch",
+    response_model=ScoreBatchState,
+    openapi_extra=_VISION_BATCH_OPENAPI,
+)
+async def post_session_vision_batch(session_id: str, request: Request) -> ScoreBatchState:
+    return await _vision_batch_request(session_id, request)
+
+
+@app.post(
+    "/score/{session_id}/audio/batch",
+    response_model=ScoreBatchState,
+    openapi_extra=_AUDIO_BATCH_OPENAPI,
+)
+async def post_session_audio_batch(session_id: str, request: Request) -> ScoreBatchState:
+    return await _audio_batch_request(session_id, request)
+
+
+@app.post("/score/{session_id}/tick", response_model=ScoreState)
+async def post_session_tick(session_id: str, timestamp: Optional[float] = None) -> ScoreState:
+    return await _dispatch(session_id, _post_tick, timestamp)
+
+
+@app.post("/score/{session_id}/reset")
+async def post_session_reset(session_id: str) -> dict:
+    return await _dispatch(session_id, _reset)
+
+
+@app.post("/score/{session_id}/clock", response_model=ClockState)
+async def post_session_clock(session_id: str, payload: ClockPayload) -> ClockState:
+    return await _dispatch(session_id, _post_clock, payload)
+
+
+@app.get("/score/{session_id}/history", response_model=HistoryState)
+async def get_session_history(
+    session_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    last_s: Optional[float] = None,
+) -> HistoryState:
+    return await _history_request(session_id, start, end, last_s)
+
+
+@app.get("/score/{session_id}/history/export")
+async def get_session_history_export(session_id: str, last_s: Optional[float] = None) -> Response:
+    return await _export_request(session_id, last_s)
+
+
+@app.get("/metrics")
+def get_metrics() -> Response:
+    if metrics is None:
+        raise HTTPException(status_code=404, detail=f"metrics disabled; set {METRICS_ENV}=1")
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.delete("/score/{session_id}")
+async def delete_session(session_id: str) -> dict:
+    result = await _dispatch(session_id, _delete, create=False)
+    if journal is not None and not _remote(session_id):
+        await asyncio.to_thread(journal.drop, session_id)
+    return result
+
+
+# -- Streaming ---------------------------------------------------------------
+
+
+def _status_message(status: RallyStatus) -> Dict[str, Any]:
+    return {
+        "type": "status",
+        "state": status.state.value,
+        "rally_count": status.rally_count,
+        "last_bounce_ts": status.last_bounce_ts,
+        "last_ball_ts": status.last_ball_ts,
+    }
+
+
+def _apply_binary(session_id: str, engine: FusionEngine, data: bytes) -> None:
+    for kind, timestamp, x, y, confidence in wire.iter_frames(data):
+        if kind == wire.KIND_VISION:
+            engine.process_vision(_client_ts(engine, SOURCE_VISION, timestamp), x, y, confidence)
+        elif kind == wire.KIND_AUDIO:
+            engine.process_audio(_client_ts(engine, SOURCE_AUDIO, timestamp), confidence)
+        else:
+            engine.tick(timestamp)
+
+
+def _apply_json(session_id: str, engine: FusionEngine, text: str) -> None:
+    message = json.loads(text)
+    if not isinstance(message, dict):
+        raise ValueError("expected a JSON object")
+    kind = message.pop("type", None)
+    if kind == "vision":
+        payload = VisionPayload(**message)
+        engine.process_vision(
+            _client_ts(engine, SOURCE_VISION, payload.timestamp),
+            payload.x,
+            payload.y,
+            payload.confidence,
+        )
+    elif kind == "audio":
+        audio = AudioPayload(**message)
+        engine.process_audio(_client_ts(engine, SOURCE_AUDIO, audio.timestamp), audio.confidence)
+    elif kind == "tick":
+        engine.tick(message.get("timestamp"))
+    else:
+        raise ValueError(f"unknown message type {kind!r}")
+
+
+def _apply_stream_message(session_id: str, message: Dict[str, Any]) -> None:
+    """Apply one WebSocket message and publish any state change."""
+    engine = registry.get(session_id)
+    tracker = engine.tracker
+    before = (tracker.state, tracker.rally_count)
+    try:
+        if message.get("bytes") is not None:
+            _apply_binary(session_id, engine, message["bytes"])
+        elif message.get("text") is not None:
+            _apply_json(session_id, engine, message["text"])
+    finally:
+        # Frames before a bad one in the same message were applied.
+        if (tracker.state, tracker.rally_count) != before:
+            _publish_status(session_id, tracker.get_status())
+        elif cluster is not None:
+            cluster.publish(session_id, tracker.get_status())
+        scheduler.arm(session_id)
+
+
+async def _pump(websocket: WebSocket, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+    while True:
+        message = await queue.get()
+        await websocket.send_json(message)
+
+
+async def _poll_shared_status(
+    session_id: str, queue: "asyncio.Queue[Dict[str, Any]]"
+) -> None:
+    """Queue a status message whenever the owner publishes a state or count change."""
+    last = None
+    while True:
+        status = _shared_status(session_id)
+        if (status.state, status.rally_count) != last:
+            last = (status.state, status.rally_count)
+            put_latest(queue, _status_message(status))
+        await asyncio.sleep(CLUSTER_POLL_S)
+
+
+async def _score_stream_remote(websocket: WebSocket, session_id: str) -> None:
+    """Serve a stream for a session owned by another worker."""
+    assert cluster is not None
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=broadcaster.max_queue)
+    tasks = [
+        asyncio.create_task(_pump(websocket, queue)),
+        asyncio.create_task(_poll_shared_status(session_id, queue)),
+    ]
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                body = {"bytes": base64.b64encode(message["bytes"]).decode()}
+            elif message.get("text") is not None:
+                body = {"text": message["text"]}
+            else:
+                continue
+            try:
+                code, reply = await asyncio.to_thread(cluster.forward, session_id, "frames", body)
+            except OSError as exc:
+                code, reply = 503, {"detail": f"session owner unreachable: {exc}"}
+            if code != 200:
+                put_latest(queue, {"type": "error", "detail": reply.get("detail")})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.websocket("/score/{session_id}/ws")
+async def score_stream(websocket: WebSocket, session_id: str) -> None:
+    await websocket.accept()
+    if _remote(session_id):
+        await _score_stream_remote(websocket, session_id)
+        return
+    await _open(session_id)
+    queue = broadcaster.subscribe(session_id)
+    put_latest(queue, _status_message(registry.get(session_id).tracker.get_status()))
+    sender = asyncio.create_task(_pump(websocket, queue))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                await writers.submit(session_id, _apply_stream_message, session_id, message)
+            except (ValueError, TypeError, ValidationError, QueueFull) as exc:
+                put_latest(queue, {"type": "error", "detail": str(exc)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(session_id, queue)
+        sender.cancel()
+
+
+# -- Cluster forwarding --------------------------------------------------------
+
+
+def _ingest_frames(session_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply WebSocket frames forwarded by a non-owner worker."""
+    start = perf_counter_ns()
+    engine = registry.get(session_id)
+    if body.get("bytes") is not None:
+        _apply_binary(session_id, engine, base64.b64decode(body["bytes"]))
+    else:
+        _apply_json(session_id, engine, body["text"])
+    _ingested(session_id, engine, engine.tracker.get_status(), "api_ws", start)
     return {"ok": True}
+
+
+_FORWARDED_OPS: Dict[str, Callable[[str, Any], Any]] = {
+    "vision": lambda sid, body: _post_vision(sid, VisionPayload(**body)),
+    "audio": lambda sid, body: _post_audio(sid, AudioPayload(**body)),
+    "vision_batch": lambda sid, body: _post_vision_batch(sid, VisionBatchPayload(**body)),
+    "audio_batch": lambda sid, body: _post_audio_batch(sid, AudioBatchPayload(**body)),
+    "tick": lambda sid, body: _post_tick(sid, body["timestamp"]),
+    "clock": lambda sid, body: _post_clock(sid, ClockPayload(**body)),
+    "reset": lambda sid, body: _reset(sid),
+    "delete": lambda sid, body: _delete(sid),
+    "history": lambda sid, body: _get_history(sid, body["start"], body["end"], body["last_s"]),
+    "history_export": lambda sid, body: {
+        "bytes": base64.b64encode(_export_history(sid, body["last_s"]).body).decode()
+    },
+    "frames": _ingest_frames,
+}
+
+
+def _serve_forward(op: str, session_id: str, body: Any) -> Tuple[int, Any]:
+    """Run a request forwarded by another worker; returns `(status_code, body)`."""
+    handler = _FORWARDED_OPS.get(op)
+    if handler is None:
+        return 400, {"detail": f"unknown operation {op!r}"}
+    # This runs on a server thread: open a journaled session here, not on the loop.
+    if journal is not None and op not in ("delete", "history", "history_export"):
+        registry.get(session_id)
+    try:
+        result = writers.submit_threadsafe(session_id, handler, session_id, body)
+    except QueueFull as exc:
+        return 503, {"detail": str(exc)}
+    except HTTPException as exc:
+        return exc.status_code, {"detail": exc.detail}
+    except (ValueError, TypeError, KeyError, ValidationError) as exc:
+        return 422, {"detail": str(exc)}
+    if op == "delete" and journal is not None:
+        journal.drop(session_id)
+    if isinstance(result, BaseModel):
+        return 200, result.model_dump(mode="json")
+    return 200, result
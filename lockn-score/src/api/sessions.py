@@ -0,0 +1,132 @@
+"""Session registry mapping table/session ids to fusion engines."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+
+
+class SessionRegistry:
+    """Owns one `FusionEngine` per session, created lazily on first use.
+
+    Sessions are kept in least-recently-used order. A session is evicted
+    when it has been idle for longer than `idle_ttl_s`, or when creating a
+    new session would exceed `max_sessions` (the LRU session goes first).
+
+    `engine_factory` builds the engine for a new session id (e.g. restoring
+    it from a journal); `on_remove` is called with the id of every session
+    evicted or removed, outside the registry lock.
+    """
+
+    def __init__(
+        self,
+        config: Optional[FusionConfig] = None,
+        max_sessions: int = 64,
+        idle_ttl_s: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+        engine_factory: Optional[Callable[[str], FusionEngine]] = None,
+        on_remove: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be >= 1")
+        self.config = config or FusionConfig()
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self._clock = clock
+        self._engine_factory = engine_factory
+        self._on_remove = on_remove
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        # session_id -> (engine, last_used)
+        self._sessions: "OrderedDict[str, tuple[FusionEngine, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    def session_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions)
+
+    def get(self, session_id: str) -> FusionEngine:
+        """Return the engine for `session_id`, creating it if needed.
+
+        Engines are built outside the registry lock (a factory may recover
+        one from disk), so lookups of existing sessions never wait on it;
+        creations are serialised by a separate lock.
+        """
+        now = self._clock()
+        with self._lock:
+            removed = self._evict_idle_locked(now)
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions[session_id] = (entry[0], now)
+                self._sessions.move_to_end(session_id)
+        if entry is None:
+            with self._create_lock:
+                with self._lock:
+                    entry = self._sessions.get(session_id)
+                    if entry is not None:
+                        self._sessions[session_id] = (entry[0], now)
+                        self._sessions.move_to_end(session_id)
+                if entry is None:
+                    if self._engine_factory is not None:
+                        engine = self._engine_factory(session_id)
+                    else:
+                        engine = FusionEngine(self.config)
+                    with self._lock:
+                        while len(self._sessions) >= self.max_sessions:
+                            removed.append(self._sessions.popitem(last=False)[0])
+                        self._sessions[session_id] = (engine, now)
+                    entry = (engine, now)
+        self._notify_removed(removed)
+        return entry[0]
+
+    def peek(self, session_id: str) -> Optional[FusionEngine]:
+        """Return the engine for `session_id` without creating or touching it."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+        if found:
+            self._notify_removed([session_id])
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = list(self._sessions)
+            self._sessions.clear()
+        self._notify_removed(removed)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Drop sessions idle for longer than `idle_ttl_s`; return their ids."""
+        with self._lock:
+            evicted = self._evict_idle_locked(self._clock() if now is None else now)
+        self._notify_removed(evicted)
+        return evicted
+
+    def _notify_removed(self, session_ids: List[str]) -> None:
+        if self._on_remove is not None:
+            for session_id in session_ids:
+                self._on_remove(session_id)
+
+    def _evict_idle_locked(self, now: float) -> List[str]:
+        evicted: List[str] = []
+        # Entries are in LRU order, so stop at the first fresh one.
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.idle_ttl_s:
+                break
+            self._sessions.popitem(last=False)
+            evicted.append(session_id)
+        return evicted
@@ -0,0 +1,53 @@
+"""Per-session fan-out of status messages to streaming subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Set
+
+
+class StatusBroadcaster:
+    """Delivers messages to every subscriber of a session.
+
+    Each subscriber gets a bounded queue. A slow consumer never blocks the
+    publisher: when its queue is full the oldest message is dropped, since
+    only the most recent status matters to a scoreboard.
+
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, max_queue: int = 64) -> None:
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set["asyncio.Queue[Dict[str, Any]]"]] = {}
+
+    def subscribe(self, session_id: str) -> "asyncio.Queue[Dict[str, Any]]":
+        queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(
+        self, session_id: str, queue: "asyncio.Queue[Dict[str, Any]]"
+    ) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[session_id]
+
+    def subscriber_count(self, session_id: str) -> int:
+        return len(self._subscribers.get(session_id, ()))
+
+    def publish(self, session_id: str, message: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(session_id, ()):
+            put_latest(queue, message)
+
+
+def put_latest(queue: "asyncio.Queue[Dict[str, Any]]", message: Dict[str, Any]) -> None:
+    """Enqueue `message`, dropping the oldest entry if the queue is full."""
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(message)
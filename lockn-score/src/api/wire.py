@@ -0,0 +1,92 @@
+"""Compact binary frames for streaming fusion events.
+
+Each record is a fixed 21-byte little-endian struct::
+
+    kind: uint8      0 = vision, 1 = audio, 2 = tick
+    timestamp: f64   seconds; NaN means "use server time"
+    x: f32           vision only (ignored otherwise)
+    y: f32           vision only (ignored otherwise)
+    confidence: f32  vision/audio (ignored for ticks)
+
+A binary WebSocket message may carry any number of concatenated records;
+session history exports (`FRAMES_CONTENT_TYPE`) use the same encoding.
+
+HTTP ingest endpoints accept kind-specific records instead, selected by
+`Content-Type` (JSON remains the default)::
+
+    application/vnd.lockn.vision   timestamp f64, x f32, y f32, confidence f32  (20 bytes)
+    application/vnd.lockn.audio    timestamp f64, confidence f32                (12 bytes)
+
+These are decoded with `numpy.frombuffer` as a zero-copy structured view
+of the request body; NaN timestamps again mean "use server time".
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.fusion.history import EVENT_LAYOUT, KIND_AUDIO, KIND_TICK, KIND_VISION
+
+# Session history stores events in this same layout.
+FRAME = EVENT_LAYOUT
+
+Frame = Tuple[int, Optional[float], float, float, float]
+
+FRAMES_CONTENT_TYPE = "application/vnd.lockn.frames"
+VISION_CONTENT_TYPE = "application/vnd.lockn.vision"
+AUDIO_CONTENT_TYPE = "application/vnd.lockn.audio"
+
+# Packed little-endian structured dtypes (no alignment padding).
+VISION_RECORD = np.dtype(
+    [("timestamp", "<f8"), ("x", "<f4"), ("y", "<f4"), ("confidence", "<f4")]
+)
+AUDIO_RECORD = np.dtype([("timestamp", "<f8"), ("confidence", "<f4")])
+
+
+def encode_frame(
+    kind: int,
+    timestamp: Optional[float],
+    x: float = 0.0,
+    y: float = 0.0,
+    confidence: float = 0.0,
+) -> bytes:
+    ts = math.nan if timestamp is None else timestamp
+    return FRAME.pack(kind, ts, x, y, confidence)
+
+
+def iter_frames(data: bytes) -> Iterator[Frame]:
+    """Decode concatenated records, mapping NaN timestamps to None."""
+    if len(data) % FRAME.size:
+        raise ValueError(
+            f"binary payload length {len(data)} is not a multiple of {FRAME.size}"
+        )
+    for kind, ts, x, y, confidence in FRAME.iter_unpack(data):
+        if kind not in (KIND_VISION, KIND_AUDIO, KIND_TICK):
+            raise ValueError(f"unknown frame kind {kind}")
+        yield kind, (None if math.isnan(ts) else ts), x, y, confidence
+
+
+def decode_records(data: bytes, dtype: np.dtype) -> np.ndarray:
+    """View an HTTP body as records of `dtype` without copying."""
+    if len(data) % dtype.itemsize:
+        raise ValueError(
+            f"binary payload length {len(data)} is not a multiple of {dtype.itemsize}"
+        )
+    return np.frombuffer(data, dtype=dtype)
+
+
+def encode_vision(
+    detections: Iterable[Tuple[Optional[float], float, float, float]]
+) -> bytes:
+    """Encode `(timestamp, x, y, confidence)` detections; None timestamps become NaN."""
+    rows = [(math.nan if ts is None else ts, x, y, c) for ts, x, y, c in detections]
+    return np.array(rows, dtype=VISION_RECORD).tobytes()
+
+
+def encode_audio(bounces: Iterable[Tuple[Optional[float], float]]) -> bytes:
+    """Encode `(timestamp, confidence)` bounces; None timestamps become NaN."""
+    rows = [(math.nan if ts is None else ts, c) for ts, c in bounces]
+    return np.array(rows, dtype=AUDIO_RECORD).tobytes()
@@ -0,0 +1,110 @@
+"""Single-writer queues that serialise each session's engine writes.
+
+Engines are not thread-safe. Instead of locking them, every write runs on
+the event loop thread, one session at a time:
+
+- Async handlers call `SessionWriters.submit`. When the session has no
+  queued writes the call runs inline, without a thread hop; the loop runs
+  one callback at a time, so nothing can interleave with it. Otherwise it
+  joins the back of the session's queue and awaits its turn.
+- Other threads (cluster forward servers) call `submit_threadsafe`, which
+  queues the write on the loop and blocks for its result.
+
+A session's queue is drained by one loop callback in FIFO order, at most
+`drain_batch` writes before yielding so other sessions and I/O get a turn.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+_Future = Union["asyncio.Future[Any]", "concurrent.futures.Future[Any]"]
+_Write = Tuple[Callable[..., Any], Tuple[Any, ...], _Future]
+
+
+class QueueFull(Exception):
+    """A session already has `max_pending` queued writes."""
+
+
+class SessionWriters:
+    """Per-session FIFO write queues drained on one event loop."""
+
+    def __init__(self, max_pending: int = 1024, drain_batch: int = 64) -> None:
+        if max_pending < 1 or drain_batch < 1:
+            raise ValueError("max_pending and drain_batch must be >= 1")
+        self.max_pending = max_pending
+        self.drain_batch = drain_batch
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[str, Deque[_Write]] = {}
+
+    def pending(self, session_id: str) -> int:
+        return len(self._queues.get(session_id, ()))
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Set the loop that thread-safe writes are marshalled onto."""
+        self._loop = loop
+
+    async def submit(self, session_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` as the session's next write; call on the loop."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        queue = self._queues.get(session_id)
+        if not queue:
+            return fn(*args)
+        future: "asyncio.Future[Any]" = self._loop.create_future()
+        self._push(session_id, queue, (fn, args, future))
+        return await future
+
+    def submit_threadsafe(self, session_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run `fn(*args)` on the loop as the session's next write and wait.
+
+        Runs directly when no loop is serving (e.g. before startup).
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return fn(*args)
+        future: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+        loop.call_soon_threadsafe(self._enqueue, session_id, (fn, args, future))
+        return future.result()
+
+    def _enqueue(self, session_id: str, write: _Write) -> None:
+        queue = self._queues.get(session_id)
+        if queue is None:
+            queue = self._queues[session_id] = deque()
+        try:
+            self._push(session_id, queue, write)
+        except QueueFull as exc:
+            write[2].set_exception(exc)
+
+    def _push(self, session_id: str, queue: Deque[_Write], write: _Write) -> None:
+        if len(queue) >= self.max_pending:
+            raise QueueFull(f"session {session_id!r} has {len(queue)} pending writes")
+        queue.append(write)
+        if len(queue) == 1:
+            assert self._loop is not None
+            self._loop.call_soon(self._drain, session_id)
+
+    def _drain(self, session_id: str) -> None:
+        queue = self._queues.get(session_id)
+        if queue is None:
+            return
+        for _ in range(self.drain_batch):
+            if not queue:
+                break
+            fn, args, future = queue[0]
+            if not future.cancelled():
+                try:
+                    result = fn(*args)
+                except Exception as exc:  # delivered to the submitter
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+            queue.popleft()
+        if queue:
+            assert self._loop is not None
+            self._loop.call_soon(self._drain, session_id)
+        else:
+            del self._queues[session_id]
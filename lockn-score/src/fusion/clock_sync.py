@@ -0,0 +1,243 @@
+"""Map each sensor's clock onto one shared timeline.
+
+`BounceDetector` stamps bounces on the audio sample clock (seconds of
+audio since the stream started), vision frames carry camera/capture-host
+time and the Score API stamps with `time.time()`. Comparing them directly
+mixes an unknown offset with crystal drift, so `RallyTracker`'s audio/
+vision confirmation window has to absorb the error.
+
+A `LinearClockFit` learns `reference = offset + rate * source` from pairs
+observed where both clocks can be read at once, e.g. a microphone
+callback (`detector.stream_time` vs the host clock) or a frame grab.
+The fit is an exponentially weighted least-squares line, so it follows
+slow drift changes (temperature) with O(1) work per observation, and
+pairs whose residual is far outside the running error (scheduling hiccups,
+late callbacks) are rejected.
+
+`ClockAligner` keeps one fit per named source. Its default reference is
+`time.time()` because the Score API stamps missing timestamps and runs its
+timeout scheduler on that clock; pass another `reference_clock` (e.g.
+`time.monotonic`) for in-process pipelines that do not use the API.
+Align timestamps before they reach `FusionEngine`, so journals and replays
+see the aligned values::
+
+    aligner = ClockAligner()
+    for chunk, captured in mic_chunks(config):       # perf_counter stamps
+        events = detector.process_chunk(chunk)
+        aligner.observe(SOURCE_AUDIO, detector.stream_time,
+                        captured - time.perf_counter() + time.time())
+        for event in events:
+            engine.process_audio(aligner.align(SOURCE_AUDIO, event.timestamp),
+                                 event.score)
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+SOURCE_VISION = "vision"
+SOURCE_AUDIO = "audio"
+
+
+class LinearClockFit:
+    """Online weighted linear fit of a reference clock against a source clock.
+
+    Observations are down-weighted by `0.5 ** (age / half_life_s)` in source
+    time. After `min_samples` pairs, a pair whose residual exceeds
+    `max(gate_s, gate_sigmas * rms)` is counted in `rejected` and ignored.
+    """
+
+    __slots__ = (
+        "half_life_s",
+        "gate_s",
+        "gate_sigmas",
+        "min_samples",
+        "samples",
+        "rejected",
+        "_x0",
+        "_y0",
+        "_last_x",
+        "_sw",
+        "_sx",
+        "_sy",
+        "_sxx",
+        "_sxy",
+        "_err2",
+        "_rate",
+        "_offset",
+    )
+
+    def __init__(
+        self,
+        half_life_s: float = 120.0,
+        gate_s: float = 0.002,
+        gate_sigmas: float = 4.0,
+        min_samples: int = 8,
+    ) -> None:
+        if half_life_s <= 0:
+            raise ValueError("half_life_s must be > 0")
+        self.half_life_s = half_life_s
+        self.gate_s = gate_s
+        self.gate_sigmas = gate_sigmas
+        self.min_samples = min_samples
+        self.reset()
+
+    def reset(self) -> None:
+        self.samples = 0
+        self.rejected = 0
+        self._x0: Optional[float] = None
+        self._y0 = 0.0
+        self._last_x = 0.0
+        self._sw = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._err2 = 0.0
+        self._rate = 1.0
+        self._offset = 0.0  # in centered coordinates
+
+    @property
+    def ready(self) -> bool:
+        return self._x0 is not None
+
+    @property
+    def rate(self) -> float:
+        """Reference seconds per source second."""
+        return self._rate
+
+    @property
+    def drift_ppm(self) -> float:
+        return (self._rate - 1.0) * 1e6
+
+    @property
+    def rms_error(self) -> float:
+        """Weighted RMS residual of accepted pairs, in seconds."""
+        return math.sqrt(self._err2 / self._sw) if self._sw > 0 else 0.0
+
+    def observe(self, source_ts: float, reference_ts: float) -> bool:
+        """Fold in one `(source, reference)` pair; returns False if rejected."""
+        if self._x0 is None:
+            self._x0 = source_ts
+            self._y0 = reference_ts
+            self._last_x = 0.0
+        x = source_ts - self._x0
+        y = reference_ts - self._y0
+
+        if self.samples >= self.min_samples:
+            residual = y - (self._offset + self._rate * x)
+            limit = max(self.gate_s, self.gate_sigmas * self.rms_error)
+            if abs(residual) > limit:
+                self.rejected += 1
+                return False
+
+        dx = x - self._last_x
+        if dx > 0:
+            decay = 0.5 ** (dx / self.half_life_s)
+            self._sw *= decay
+            self._sx *= decay
+            self._sy *= decay
+            self._sxx *= decay
+            self._sxy *= decay
+            self._err2 *= decay
+            self._last_x = x
+        residual = y - (self._offset + self._rate * x)
+        self._sw += 1.0
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._sxy += x * y
+        self._err2 += residual * residual
+        self.samples += 1
+
+        denom = self._sw * self._sxx - self._sx * self._sx
+        # Needs some spread in source time before the slope means anything.
+        if denom > 1e-12 * self._sw * self._sw:
+            self._rate = (self._sw * self._sxy - self._sx * self._sy) / denom
+        self._offset = (self._sy - self._rate * self._sx) / self._sw
+        return True
+
+    def snapshot(self) -> tuple:
+        """Fit state as plain values, for `restore`."""
+        return (
+            self.samples,
+            self.rejected,
+            *(None if v is None else float(v) for v in (self._x0, self._y0, self._last_x)),
+            *(float(v) for v in (self._sw, self._sx, self._sy, self._sxx, self._sxy, self._err2)),
+            float(self._rate),
+            float(self._offset),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        (
+            self.samples,
+            self.rejected,
+            self._x0,
+            self._y0,
+            self._last_x,
+            self._sw,
+            self._sx,
+            self._sy,
+            self._sxx,
+            self._sxy,
+            self._err2,
+            self._rate,
+            self._offset,
+        ) = snapshot
+
+    def to_reference(self, source_ts: float) -> float:
+        """Map a source timestamp onto the reference clock."""
+        if self._x0 is None:
+            return source_ts
+        return self._y0 + self._offset + self._rate * (source_ts - self._x0)
+
+    def to_source(self, reference_ts: float) -> float:
+        if self._x0 is None:
+            return reference_ts
+        return self._x0 + (reference_ts - self._y0 - self._offset) / self._rate
+
+
+class ClockAligner:
+    """Per-source clock fits onto one reference timeline.
+
+    Timestamps from a source without observations pass through unchanged,
+    so sources already on the reference clock need no setup.
+    """
+
+    def __init__(
+        self,
+        reference_clock: Callable[[], float] = time.time,
+        half_life_s: float = 120.0,
+        gate_s: float = 0.002,
+    ) -> None:
+        self.reference_clock = reference_clock
+        self.half_life_s = half_life_s
+        self.gate_s = gate_s
+        self.fits: Dict[str, LinearClockFit] = {}
+
+    def fit(self, source: str) -> LinearClockFit:
+        fit = self.fits.get(source)
+        if fit is None:
+            fit = self.fits[source] = LinearClockFit(self.half_life_s, self.gate_s)
+        return fit
+
+    def observe(self, source: str, source_ts: float, reference_ts: Optional[float] = None) -> bool:
+        """Record that `source` read `source_ts` at `reference_ts` (default: now)."""
+        if reference_ts is None:
+            reference_ts = self.reference_clock()
+        return self.fit(source).observe(source_ts, reference_ts)
+
+    def align(self, source: str, source_ts: float) -> float:
+        fit = self.fits.get(source)
+        return fit.to_reference(source_ts) if fit is not None else source_ts
+
+    def snapshot(self) -> Dict[str, tuple]:
+        """Every source's fit as plain values, for `restore`."""
+        return {source: fit.snapshot() for source, fit in self.fits.items()}
+
+    def restore(self, snapshot: Dict[str, tuple]) -> None:
+        for source, fit in snapshot.items():
+            self.fit(source).restore(fit)
+
+    def state(self, source: str) -> Tuple[float, float, float]:
+        """`(rate, drift_ppm, rms_error_s)` of a source's fit."""
+        fit = self.fit(source)
+        return fit.rate, fit.drift_ppm, fit.rms_error
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 @dataclass(frozen=True)
@@ -27,9 +27,41 @@ class FusionConfig:
     allow_vision_only: bool = True
     vision_only_audio_silence_ms: int = 1000  # if no audio, allow vision-only bounces
 
+    # Vision-only bounce detection: "heuristic" counts any in-table
+    # detection once the bounce interval passes; "kalman" counts
+    # vertical-velocity reversals of a Kalman-tracked trajectory.
+    vision_bounce_mode: str = "heuristic"
+    kalman_process_noise: float = 2000.0  # white-jerk spectral density
+    kalman_measurement_noise: float = 1e-5  # position variance (normalized^2)
+    kalman_min_speed: float = 0.5  # normalized units/s needed to arm/fire
+
+    # Bounce fusion: "threshold" gates audio and vision confidences
+    # independently; "probabilistic" counts a bounce when the joint
+    # log-likelihood ratio of the audio/vision evidence inside
+    # audio_window_ms reaches fusion_log_odds_threshold (see probabilistic).
+    fusion_mode: str = "threshold"
+    fusion_log_odds_threshold: float = 1.0
+
     # Rally lifecycle
     rally_timeout_ms: int = 2500  # end rally if no bounces for this long
 
+    # Event-time reordering (0 disables). Events are held this long so that
+    # audio/vision arriving out of order are applied in timestamp order.
+    reorder_lateness_ms: int = 0
+    reorder_max_pending: int = 512
+
+    # Per-session history ring buffers (see history): the most recent
+    # ingested events and rally state changes. 0 events disables history.
+    history_events: int = 8192
+    history_changes: int = 512
+
     # Table bounding box (normalized coordinates [0,1])
     # (x_min, y_min, x_max, y_max)
     table_bbox: Tuple[float, float, float, float] = (0.1, 0.2, 0.9, 0.8)
+
+    # Table region for angled cameras; overrides table_bbox when set.
+    # Polygon vertices ((x, y), ...) in normalized image coordinates.
+    table_polygon: Optional[Tuple[Tuple[float, float], ...]] = None
+    # Row-major 3x3 homography mapping normalized image coordinates to table
+    # coordinates, where the table is the unit square. Overrides both above.
+    table_homography: Optional[Tuple[float, ...]] = None
@@ -3,31 +3,94 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
-from typing import Optional
+from time import perf_counter_ns
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
 
+from .clock_sync import ClockAligner
 from .config import FusionConfig
-from .rally_tracker import BallDetection, BounceEvent, RallyStatus, RallyTracker
+from .history import KIND_AUDIO, KIND_VISION, EventHistory
+from .metrics import (
+    STAGE_AUDIO,
+    STAGE_AUDIO_BATCH,
+    STAGE_TICK,
+    STAGE_VISION,
+    STAGE_VISION_BATCH,
+    EngineMetrics,
+)
+from .rally_tracker import RallyState, RallyStatus, RallyTracker, StateTransition
+from .reorder import BufferedEvent, ReorderBuffer
 
 
-@dataclass
+@dataclass(slots=True)
 class FusionOutput:
     status: RallyStatus
     last_event: Optional[str] = None
 
 
+@dataclass
+class FusionBatchOutput:
+    status: RallyStatus
+    transitions: List[StateTransition] = field(default_factory=list)
+
+
 class FusionEngine:
     """Fusion engine entry point.
 
-    Feed audio and vision events via `process_audio` / `process_vision`.
+    Feed audio and vision events via `process_audio` / `process_vision`,
+    or many at once via `process_audio_batch` / `process_vision_batch`.
+
+    Outputs are reused while the tracker status is unchanged, so an event
+    that changes nothing allocates nothing; treat them as read-only.
+
+    With `FusionConfig.reorder_lateness_ms` set, events pass through a
+    `ReorderBuffer` and reach the tracker in timestamp order, delayed by
+    that lateness; ticks are evaluated at `now - lateness` so timeouts do
+    not fire ahead of still-buffered events. Call `flush` at end of stream.
+
+    Attach an `EngineMetrics` as `metrics` to record per-call latency and
+    counters; while it is None instrumentation costs one attribute check.
+    Capture ages are left to callers, which know which timestamps came from
+    the client rather than being filled in with server time.
+
+    Unless `FusionConfig.history_events` is 0, `history` keeps the most
+    recent ingested events (with resolved timestamps, as they arrived) and
+    the tracker's state changes in fixed-size ring buffers.
+
+    `clock` holds the session's sensor clock fits once `observe_clock` has
+    been called (see `clock_sync`). The engine does not apply it: callers
+    align timestamps with it before passing events in. It lives on the
+    engine so it shares the session's lifetime and snapshots.
     """
 
     def __init__(self, config: Optional[FusionConfig] = None) -> None:
         self.config = config or FusionConfig()
         self.tracker = RallyTracker(self.config)
+        self.reorder: Optional[ReorderBuffer] = None
+        if self.config.reorder_lateness_ms > 0:
+            self.reorder = ReorderBuffer(
+                self.config.reorder_lateness_ms / 1000, self.config.reorder_max_pending
+            )
+        self._vision_output: Optional[FusionOutput] = None
+        self._audio_output: Optional[FusionOutput] = None
+        self._tick_output: Optional[FusionOutput] = None
+        self.metrics: Optional[EngineMetrics] = None
+        self.clock: Optional[ClockAligner] = None
+        self.history: Optional[EventHistory] = None
+        if self.config.history_events > 0:
+            self.history = EventHistory(self.config.history_events, self.config.history_changes)
+            self.tracker.history = self.history
 
     def reset(self) -> None:
+        history = self.history
+        if history is not None:
+            tracker = self.tracker
+            history.record_change(
+                history.latest or 0.0, tracker.state, RallyState.IDLE, 0
+            )
         self.tracker.reset()
+        if self.reorder is not None:
+            self.reorder.clear()
 
     def process_vision(
         self,
@@ -36,18 +99,206 @@ class FusionEngine:
         y: float,
         confidence: float,
     ) -> FusionOutput:
+        metrics = self.metrics
+        start = perf_counter_ns() if metrics is not None else 0
         ts = timestamp if timestamp is not None else time.time()
-        status = self.tracker.update_vision(BallDetection(ts, x, y, confidence))
-        return FusionOutput(status=status, last_event="vision")
+        if self.history is not None:
+            self.history.record_vision(ts, x, y, confidence)
+        if self.reorder is None:
+            status = self.tracker.apply_vision(ts, x, y, confidence)
+        else:
+            self.reorder.push(ts, KIND_VISION, x, y, confidence)
+            status = self._release(None)
+        output = self._vision_output
+        if output is None or output.status is not status:
+            output = self._vision_output = FusionOutput(status, "vision")
+        if metrics is not None:
+            metrics.record(STAGE_VISION, perf_counter_ns() - start, status)
+        return output
 
     def process_audio(
         self, timestamp: Optional[float], confidence: float
     ) -> FusionOutput:
+        metrics = self.metrics
+        start = perf_counter_ns() if metrics is not None else 0
         ts = timestamp if timestamp is not None else time.time()
-        status = self.tracker.update_audio(BounceEvent(ts, confidence))
-        return FusionOutput(status=status, last_event="audio")
+        if self.history is not None:
+            self.history.record_audio(ts, confidence)
+        if self.reorder is None:
+            status = self.tracker.apply_audio(ts, confidence)
+        else:
+            self.reorder.push(ts, KIND_AUDIO, confidence=confidence)
+            status = self._release(None)
+        output = self._audio_output
+        if output is None or output.status is not status:
+            output = self._audio_output = FusionOutput(status, "audio")
+        if metrics is not None:
+            metrics.record(STAGE_AUDIO, perf_counter_ns() - start, status)
+        return output
 
     def tick(self, timestamp: Optional[float] = None) -> FusionOutput:
+        metrics = self.metrics
+        start = perf_counter_ns() if metrics is not None else 0
         ts = timestamp if timestamp is not None else time.time()
+        if self.history is not None:
+            self.history.record_tick(ts)
+        if self.reorder is not None:
+            self.reorder.advance(ts)
+            self._release(None)
+            ts -= self.reorder.lateness_s
         status = self.tracker.tick(ts)
-        return FusionOutput(status=status, last_event="tick")
+        output = self._tick_output
+        if output is None or output.status is not status:
+            output = self._tick_output = FusionOutput(status, "tick")
+        if metrics is not None:
+            metrics.record(STAGE_TICK, perf_counter_ns() - start, status)
+        return output
+
+    def observe_clock(
+        self, source: str, source_ts: float, reference_ts: Optional[float] = None
+    ) -> bool:
+        """Feed a clock sync pair to `clock`, creating it on first use."""
+        clock = self.clock
+        if clock is None:
+            clock = self.clock = ClockAligner()
+        return clock.observe(source, source_ts, reference_ts)
+
+    def next_deadline(self) -> Optional[float]:
+        """Clock time at which `tick` could next change the state, if any.
+
+        With a reorder buffer this is when buffered events become releasable
+        or the (lateness-shifted) rally timeout could fire.
+        """
+        deadline = self.tracker.next_deadline()
+        if self.reorder is None:
+            return deadline
+        lateness = self.reorder.lateness_s
+        if deadline is not None:
+            deadline += lateness
+        earliest = self.reorder.earliest
+        if earliest is not None and (deadline is None or earliest + lateness < deadline):
+            deadline = earliest + lateness
+        return deadline
+
+    def event_time(self) -> Optional[float]:
+        """Newest event timestamp ingested (on the events' own clock), if any."""
+        tracker = self.tracker
+        stamps = [tracker.last_ball_ts, tracker.last_audio_ts, tracker.last_bounce_ts]
+        if self.reorder is not None:
+            stamps.append(self.reorder.latest)
+        present = [ts for ts in stamps if ts is not None]
+        return max(present) if present else None
+
+    def flush(self) -> FusionBatchOutput:
+        """Apply every event still held by the reorder buffer."""
+        transitions: List[StateTransition] = []
+        if self.reorder is not None:
+            self._apply_buffered(self.reorder.drain(), transitions)
+        return FusionBatchOutput(status=self.tracker.get_status(), transitions=transitions)
+
+    def process_vision_batch(
+        self,
+        detections: Iterable[Tuple[Optional[float], float, float, float]],
+    ) -> FusionBatchOutput:
+        """Apply ordered `(timestamp, x, y, confidence)` detections in one call."""
+        if self.history is not None:
+            now = time.time()
+            detections = [
+                (ts if ts is not None else now, x, y, conf) for ts, x, y, conf in detections
+            ]
+            self.history.record_vision_batch(detections)
+        metrics = self.metrics
+        if metrics is None:
+            return self._vision_batch(detections)
+        start = perf_counter_ns()
+        detections = list(detections)
+        output = self._vision_batch(detections)
+        metrics.record(
+            STAGE_VISION_BATCH, perf_counter_ns() - start, output.status, len(detections)
+        )
+        return output
+
+    def process_audio_batch(
+        self, bounces: Iterable[Tuple[Optional[float], float]]
+    ) -> FusionBatchOutput:
+        """Apply ordered `(timestamp, confidence)` audio bounces in one call."""
+        if self.history is not None:
+            now = time.time()
+            bounces = [(ts if ts is not None else now, conf) for ts, conf in bounces]
+            self.history.record_audio_batch(bounces)
+        metrics = self.metrics
+        if metrics is None:
+            return self._audio_batch(bounces)
+        start = perf_counter_ns()
+        bounces = list(bounces)
+        output = self._audio_batch(bounces)
+        metrics.record(
+            STAGE_AUDIO_BATCH, perf_counter_ns() - start, output.status, len(bounces)
+        )
+        return output
+
+    def _vision_batch(
+        self, detections: Iterable[Tuple[Optional[float], float, float, float]]
+    ) -> FusionBatchOutput:
+        tracker = self.tracker
+        transitions: List[StateTransition] = []
+        if self.reorder is not None:
+            push = self.reorder.push
+            for timestamp, x, y, confidence in detections:
+                ts = timestamp if timestamp is not None else time.time()
+                push(ts, KIND_VISION, x, y, confidence)
+            self._release(transitions)
+            return FusionBatchOutput(status=tracker.get_status(), transitions=transitions)
+        for timestamp, x, y, confidence in detections:
+            ts = timestamp if timestamp is not None else time.time()
+            prev_state = tracker.state
+            tracker.apply_vision(ts, x, y, confidence)
+            if tracker.state is not prev_state:
+                transitions.append(
+                    StateTransition(ts, prev_state, tracker.state, tracker.rally_count)
+                )
+        return FusionBatchOutput(status=tracker.get_status(), transitions=transitions)
+
+    def _audio_batch(
+        self, bounces: Iterable[Tuple[Optional[float], float]]
+    ) -> FusionBatchOutput:
+        tracker = self.tracker
+        transitions: List[StateTransition] = []
+        if self.reorder is not None:
+            push = self.reorder.push
+            for timestamp, confidence in bounces:
+                ts = timestamp if timestamp is not None else time.time()
+                push(ts, KIND_AUDIO, confidence=confidence)
+            self._release(transitions)
+            return FusionBatchOutput(status=tracker.get_status(), transitions=transitions)
+        for timestamp, confidence in bounces:
+            ts = timestamp if timestamp is not None else time.time()
+            prev_state = tracker.state
+            tracker.apply_audio(ts, confidence)
+            if tracker.state is not prev_state:
+                transitions.append(
+                    StateTransition(ts, prev_state, tracker.state, tracker.rally_count)
+                )
+        return FusionBatchOutput(status=tracker.get_status(), transitions=transitions)
+
+    def _release(self, transitions: Optional[List[StateTransition]]) -> RallyStatus:
+        assert self.reorder is not None
+        self._apply_buffered(self.reorder.pop_ready(), transitions)
+        return self.tracker.get_status()
+
+    def _apply_buffered(
+        self,
+        events: Iterable[BufferedEvent],
+        transitions: Optional[List[StateTransition]],
+    ) -> None:
+        tracker = self.tracker
+        for ts, kind, _, x, y, confidence in events:
+            prev_state = tracker.state
+            if kind == KIND_VISION:
+                tracker.apply_vision(ts, x, y, confidence)
+            else:
+                tracker.apply_audio(ts, confidence)
+            if transitions is not None and tracker.state is not prev_state:
+                transitions.append(
+                    StateTransition(ts, prev_state, tracker.state, tracker.rally_count)
+                )
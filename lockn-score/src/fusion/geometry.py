@@ -0,0 +1,205 @@
+"""Table-region geometry for deciding whether a detection is over the table.
+
+Regions are built once from `FusionConfig` with everything needed for the
+point test precomputed, so `contains` costs a handful of float operations
+per detection and `contains_many` evaluates NumPy arrays of points at once.
+
+All coordinates are normalized image coordinates in [0, 1].
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .config import FusionConfig
+
+Point = Tuple[float, float]
+
+
+class TableRegion(ABC):
+    """Base class for precomputed point-in-region tests."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def contains(self, x: float, y: float) -> bool:
+        """Whether the point `(x, y)` is inside the region."""
+
+    @abstractmethod
+    def contains_many(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Boolean mask of the points `(x[i], y[i])` inside the region."""
+
+
+class BBoxRegion(TableRegion):
+    """Axis-aligned box, bounds inclusive."""
+
+    __slots__ = ("x_min", "y_min", "x_max", "y_max")
+
+    def __init__(self, bbox: Tuple[float, float, float, float]) -> None:
+        self.x_min, self.y_min, self.x_max, self.y_max = (float(v) for v in bbox)
+
+    def contains(self, x: float, y: float) -> bool:
+        return self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max
+
+    def contains_many(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return (x >= self.x_min) & (x <= self.x_max) & (y >= self.y_min) & (y <= self.y_max)
+
+
+class ConvexPolygonRegion(TableRegion):
+    """Convex polygon as the intersection of precomputed half-planes.
+
+    Each edge is stored as `a*x + b*y + c >= 0` for points on the inner
+    side, so the test is one multiply-add per edge. Edges are inclusive.
+    """
+
+    __slots__ = ("edges", "_a", "_b", "_c")
+
+    def __init__(self, vertices: Sequence[Point]) -> None:
+        pts = _validate_polygon(vertices)
+        if _signed_area(pts) < 0:
+            pts = pts[::-1]
+        edges = []
+        for (x1, y1), (x2, y2) in zip(pts, pts[1:] + pts[:1]):
+            # Counter-clockwise winding puts the interior on the left.
+            a = y1 - y2
+            b = x2 - x1
+            edges.append((a, b, -(a * x1 + b * y1)))
+        self.edges: Tuple[Tuple[float, float, float], ...] = tuple(edges)
+        self._a = np.array([e[0] for e in edges])
+        self._b = np.array([e[1] for e in edges])
+        self._c = np.array([e[2] for e in edges])
+
+    def contains(self, x: float, y: float) -> bool:
+        for a, b, c in self.edges:
+            if a * x + b * y + c < 0:
+                return False
+        return True
+
+    def contains_many(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)[..., None]
+        y = np.asarray(y, dtype=np.float64)[..., None]
+        return np.all(self._a * x + self._b * y + self._c >= 0, axis=-1)
+
+
+class PolygonRegion(TableRegion):
+    """Arbitrary simple polygon using the even-odd crossing rule.
+
+    Per-edge slopes are precomputed so each crossing check is a compare
+    and one multiply-add. Points exactly on an edge may fall either side.
+    """
+
+    __slots__ = ("edges", "_x1", "_y1", "_y2", "_slope")
+
+    def __init__(self, vertices: Sequence[Point]) -> None:
+        pts = _validate_polygon(vertices)
+        edges = []
+        for (x1, y1), (x2, y2) in zip(pts, pts[1:] + pts[:1]):
+            if y1 == y2:
+                continue  # horizontal edges never cross a horizontal ray
+            edges.append((x1, y1, y2, (x2 - x1) / (y2 - y1)))
+        self.edges: Tuple[Tuple[float, float, float, float], ...] = tuple(edges)
+        self._x1 = np.array([e[0] for e in edges])
+        self._y1 = np.array([e[1] for e in edges])
+        self._y2 = np.array([e[2] for e in edges])
+        self._slope = np.array([e[3] for e in edges])
+
+    def contains(self, x: float, y: float) -> bool:
+        inside = False
+        for x1, y1, y2, slope in self.edges:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * slope:
+                inside = not inside
+        return inside
+
+    def contains_many(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)[..., None]
+        y = np.asarray(y, dtype=np.float64)[..., None]
+        spans = (self._y1 > y) != (self._y2 > y)
+        left = x < self._x1 + (y - self._y1) * self._slope
+        return (np.count_nonzero(spans & left, axis=-1) % 2).astype(bool)
+
+
+class HomographyRegion(TableRegion):
+    """Table rectangle seen through a perspective camera.
+
+    `homography` is a row-major 3x3 matrix mapping image coordinates to
+    table coordinates, in which the playing surface is the unit square.
+    """
+
+    __slots__ = ("h", "_matrix")
+
+    def __init__(self, homography: Sequence[float]) -> None:
+        matrix = np.asarray(homography, dtype=np.float64).reshape(-1)
+        if matrix.shape != (9,):
+            raise ValueError("table_homography must have 9 values (row-major 3x3)")
+        self._matrix = matrix.reshape(3, 3)
+        self.h: Tuple[float, ...] = tuple(float(v) for v in matrix)
+
+    def to_table(self, x: float, y: float) -> Point:
+        """Map an image point to table coordinates."""
+        h00, h01, h02, h10, h11, h12, h20, h21, h22 = self.h
+        w = h20 * x + h21 * y + h22
+        return (h00 * x + h01 * y + h02) / w, (h10 * x + h11 * y + h12) / w
+
+    def contains(self, x: float, y: float) -> bool:
+        h00, h01, h02, h10, h11, h12, h20, h21, h22 = self.h
+        w = h20 * x + h21 * y + h22
+        if w <= 0:
+            return False  # beyond the camera horizon
+        u = h00 * x + h01 * y + h02
+        v = h10 * x + h11 * y + h12
+        return 0 <= u <= w and 0 <= v <= w
+
+    def contains_many(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        m = self._matrix
+        w = m[2, 0] * x + m[2, 1] * y + m[2, 2]
+        u = m[0, 0] * x + m[0, 1] * y + m[0, 2]
+        v = m[1, 0] * x + m[1, 1] * y + m[1, 2]
+        return (w > 0) & (u >= 0) & (u <= w) & (v >= 0) & (v <= w)
+
+
+def build_region(config: FusionConfig) -> TableRegion:
+    """Pick the most specific region configured.
+
+    Precedence: `table_homography`, then `table_polygon`, then `table_bbox`.
+    """
+    if config.table_homography is not None:
+        return HomographyRegion(config.table_homography)
+    if config.table_polygon is not None:
+        pts = _validate_polygon(config.table_polygon)
+        if _is_convex(pts):
+            return ConvexPolygonRegion(pts)
+        return PolygonRegion(pts)
+    return BBoxRegion(config.table_bbox)
+
+
+def _validate_polygon(vertices: Sequence[Point]) -> list:
+    pts = [(float(x), float(y)) for x, y in vertices]
+    if len(pts) < 3:
+        raise ValueError("table_polygon needs at least 3 vertices")
+    if _signed_area(pts) == 0:
+        raise ValueError("table_polygon has zero area")
+    return pts
+
+
+def _signed_area(pts: list) -> float:
+    return 0.5 * sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(pts, pts[1:] + pts[:1]))
+
+
+def _is_convex(pts: list) -> bool:
+    sign = 0.0
+    n = len(pts)
+    for i in range(n):
+        (x0, y0), (x1, y1), (x2, y2) = pts[i], pts[(i + 1) % n], pts[(i + 2) % n]
+        cross = (x1 - x0) * (y2 - y1) - (y1 - y0) * (x2 - x1)
+        if cross == 0:
+            continue
+        if sign == 0:
+            sign = cross
+        elif (cross > 0) != (sign > 0):
+            return False
+    return True
@@ -0,0 +1,220 @@
+"""Bounded per-session history of ingested events and state changes.
+
+`EventHistory` keeps the most recent events a `FusionEngine` ingested and
+the rally state changes they caused, so a disputed point can be inspected
+(or replayed) after the fact. Both live in preallocated ring buffers:
+memory is fixed at construction and the oldest records are overwritten,
+however long the session runs.
+
+A `RingBuffer` is one `bytearray` of fixed-size little-endian records.
+Appends are a single `struct.pack_into`; reads view the same bytes as a
+NumPy structured array. Event records use `EVENT_LAYOUT` (kind,
+timestamp, x, y, confidence), which is also the wire frame (`wire.FRAME`),
+so exported events are binary frames that the WebSocket endpoint or
+`journal.apply_records` can replay. The event kinds are defined here for
+the engine, `replay` and the wire format alike. Change
+records hold the timestamp, the state before and after, and the rally
+count; a counted bounce is a change whose state stays the same but whose
+count grows.
+
+Like `EngineMetrics`, recording takes no locks: a session is fed by one
+writer, and readers must copy (`query`, `last`) on that writer too; the
+Score API does so through its per-session writer queue.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .rally_tracker import RallyState
+
+KIND_VISION = 0
+KIND_AUDIO = 1
+KIND_TICK = 2
+
+KIND_NAMES = ("vision", "audio", "tick")
+
+EVENT_LAYOUT = struct.Struct("<Bdfff")
+EVENT_RECORD = np.dtype(
+    [("kind", "u1"), ("timestamp", "<f8"), ("x", "<f4"), ("y", "<f4"), ("confidence", "<f4")]
+)
+_pack_event = EVENT_LAYOUT.pack_into
+_EVENT_SIZE = EVENT_LAYOUT.size
+
+CHANGE_LAYOUT = struct.Struct("<dBBi")
+CHANGE_RECORD = np.dtype(
+    [("timestamp", "<f8"), ("from_state", "u1"), ("to_state", "u1"), ("rally_count", "<i4")]
+)
+
+STATES = list(RallyState)
+STATE_INDEX = {state: index for index, state in enumerate(STATES)}
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of packed records, oldest overwritten first."""
+
+    __slots__ = ("layout", "dtype", "capacity", "total", "data", "records")
+
+    def __init__(self, layout: struct.Struct, dtype: np.dtype, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if layout.size != dtype.itemsize:
+            raise ValueError("record layout and dtype sizes differ")
+        self.layout = layout
+        self.dtype = dtype
+        self.capacity = capacity
+        self.total = 0  # records ever appended
+        self.data = bytearray(layout.size * capacity)
+        self.records = np.frombuffer(self.data, dtype=dtype)
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def __getstate__(self) -> tuple:
+        return self.layout.format, self.dtype, self.capacity, self.total, bytes(self.data)
+
+    def __setstate__(self, state: tuple) -> None:
+        layout, self.dtype, self.capacity, self.total, data = state
+        self.layout = struct.Struct(layout)
+        self.data = bytearray(data)
+        self.records = np.frombuffer(self.data, dtype=self.dtype)
+
+    def append(self, *values: object) -> None:
+        self.layout.pack_into(self.data, (self.total % self.capacity) * self.layout.size, *values)
+        self.total += 1
+
+    def extend(self, records: np.ndarray) -> None:
+        """Append a structured array of records with this buffer's dtype."""
+        n = len(records)
+        if n > self.capacity:
+            self.total += n - self.capacity
+            records = records[n - self.capacity:]
+            n = self.capacity
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self.records[start:start + first] = records[:first]
+        self.records[:n - first] = records[first:]
+        self.total += n
+
+    def ordered(self) -> np.ndarray:
+        """Copy of the held records, oldest first."""
+        if self.total <= self.capacity:
+            return self.records[:self.total].copy()
+        start = self.total % self.capacity
+        return np.concatenate((self.records[start:], self.records[:start]))
+
+    def clear(self) -> None:
+        self.total = 0
+
+
+class EventHistory:
+    """Ring buffers of recent events and of the state changes they caused."""
+
+    __slots__ = ("events", "changes")
+
+    def __init__(self, events: int = 8192, changes: int = 512) -> None:
+        self.events = RingBuffer(EVENT_LAYOUT, EVENT_RECORD, events)
+        self.changes = RingBuffer(CHANGE_LAYOUT, CHANGE_RECORD, changes)
+
+    # Single events skip `RingBuffer.append` (and its argument packing):
+    # they are on every engine call's path.
+    def record_vision(self, timestamp: float, x: float, y: float, confidence: float) -> None:
+        events = self.events
+        total = events.total
+        _pack_event(
+            events.data, total % events.capacity * _EVENT_SIZE, KIND_VISION, timestamp, x, y, confidence
+        )
+        events.total = total + 1
+
+    def record_audio(self, timestamp: float, confidence: float) -> None:
+        events = self.events
+        total = events.total
+        _pack_event(
+            events.data, total % events.capacity * _EVENT_SIZE, KIND_AUDIO, timestamp, 0.0, 0.0, confidence
+        )
+        events.total = total + 1
+
+    def record_tick(self, timestamp: float) -> None:
+        events = self.events
+        total = events.total
+        _pack_event(
+            events.data, total % events.capacity * _EVENT_SIZE, KIND_TICK, timestamp, 0.0, 0.0, 0.0
+        )
+        events.total = total + 1
+
+    def record_vision_batch(self, detections: Iterable[Tuple[float, float, float, float]]) -> None:
+        """Record resolved `(timestamp, x, y, confidence)` detections."""
+        rows = np.array(list(detections), dtype=np.float64).reshape(-1, 4)
+        records = np.zeros(len(rows), dtype=EVENT_RECORD)
+        records["kind"] = KIND_VISION
+        records["timestamp"] = rows[:, 0]
+        records["x"] = rows[:, 1]
+        records["y"] = rows[:, 2]
+        records["confidence"] = rows[:, 3]
+        self.events.extend(records)
+
+    def record_audio_batch(self, bounces: Iterable[Tuple[float, float]]) -> None:
+        """Record resolved `(timestamp, confidence)` bounces."""
+        rows = np.array(list(bounces), dtype=np.float64).reshape(-1, 2)
+        records = np.zeros(len(rows), dtype=EVENT_RECORD)
+        records["kind"] = KIND_AUDIO
+        records["timestamp"] = rows[:, 0]
+        records["confidence"] = rows[:, 1]
+        self.events.extend(records)
+
+    def record_change(
+        self, timestamp: float, from_state: RallyState, to_state: RallyState, rally_count: int
+    ) -> None:
+        self.changes.append(timestamp, STATE_INDEX[from_state], STATE_INDEX[to_state], rally_count)
+
+    @property
+    def latest(self) -> Optional[float]:
+        """Timestamp of the newest event, if any."""
+        events = self.events
+        if not events.total:
+            return None
+        return float(events.records["timestamp"][(events.total - 1) % events.capacity])
+
+    def query(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Held `(events, changes)` with `start <= timestamp <= end`, oldest first."""
+        return (
+            _between(self.events.ordered(), start, end),
+            _between(self.changes.ordered(), start, end),
+        )
+
+    def last(self, seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """`query` for the `seconds` up to the newest event."""
+        latest = self.latest
+        if latest is None:
+            return self.query()
+        return self.query(latest - seconds, None)
+
+    def snapshot(self) -> Tuple[bytes, bytes]:
+        """Held event and change records, oldest first, for `restore`."""
+        return self.events.ordered().tobytes(), self.changes.ordered().tobytes()
+
+    def restore(self, snapshot: Tuple[bytes, bytes]) -> None:
+        """Replace the held records; beyond capacity the oldest are dropped."""
+        events, changes = snapshot
+        self.clear()
+        self.events.extend(np.frombuffer(events, dtype=EVENT_RECORD))
+        self.changes.extend(np.frombuffer(changes, dtype=CHANGE_RECORD))
+
+    def clear(self) -> None:
+        self.events.clear()
+        self.changes.clear()
+
+
+def _between(records: np.ndarray, start: Optional[float], end: Optional[float]) -> np.ndarray:
+    timestamps = records["timestamp"]
+    mask = np.ones(len(records), dtype=bool)
+    if start is not None:
+        mask &= timestamps >= start
+    if end is not None:
+        mask &= timestamps <= end
+    return records[mask]
@@ -0,0 +1,198 @@
+"""Trajectory-based bounce detection from ball detections.
+
+A constant-acceleration Kalman filter per image axis smooths the ball
+position and estimates its velocity. A bounce is the moment the vertical
+velocity flips from falling (image y increasing) to rising. Because the
+filter works from real timestamps it predicts through missed frames, so
+bounces are still found when the detector runs at a low frame rate.
+
+The filters are 3-state scalar implementations (position, velocity,
+acceleration) written out in plain Python: one update is a few dozen
+float operations, cheaper than dispatching small NumPy arrays.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .config import FusionConfig
+
+Matrix3 = List[List[float]]
+
+
+class ConstantAccelerationFilter:
+    """1-D Kalman filter with state (position, velocity, acceleration).
+
+    Process noise follows the white-jerk model with spectral density
+    `process_noise`; `measurement_noise` is the position variance.
+    """
+
+    __slots__ = ("q", "r", "x", "P", "ts")
+
+    def __init__(self, process_noise: float, measurement_noise: float) -> None:
+        self.q = process_noise
+        self.r = measurement_noise
+        self.x: List[float] = [0.0, 0.0, 0.0]
+        self.P: Matrix3 = [[0.0] * 3 for _ in range(3)]
+        self.ts: Optional[float] = None
+
+    def initialize(self, ts: float, position: float) -> None:
+        self.x = [position, 0.0, 0.0]
+        # Unknown velocity/acceleration: large prior variance.
+        self.P = [[self.r, 0.0, 0.0], [0.0, 100.0, 0.0], [0.0, 0.0, 10000.0]]
+        self.ts = ts
+
+    def predict_state(self, ts: float) -> List[float]:
+        """State extrapolated to `ts` without changing the filter."""
+        p, v, a = self.x
+        dt = ts - self.ts if self.ts is not None else 0.0
+        return [p + v * dt + 0.5 * a * dt * dt, v + a * dt, a]
+
+    def update(self, ts: float, position: float) -> float:
+        """Predict to `ts`, fold in the measurement; returns the innovation^2 / S."""
+        dt = ts - self.ts if self.ts is not None else 0.0
+        if dt < 0:
+            dt = 0.0
+        self.x = self.predict_state(ts) if dt else self.x
+        self.P = _predict_covariance(self.P, dt, self.q) if dt else self.P
+        self.ts = ts
+
+        P = self.P
+        s = P[0][0] + self.r
+        k0, k1, k2 = P[0][0] / s, P[1][0] / s, P[2][0] / s
+        residual = position - self.x[0]
+        self.x = [self.x[0] + k0 * residual, self.x[1] + k1 * residual, self.x[2] + k2 * residual]
+        row0 = P[0][:]
+        self.P = [
+            [P[i][j] - k * row0[j] for j in range(3)]
+            for i, k in enumerate((k0, k1, k2))
+        ]
+        return residual * residual / s
+
+
+def _predict_covariance(P: Matrix3, dt: float, q: float) -> Matrix3:
+    half_dt2 = 0.5 * dt * dt
+    F = [[1.0, dt, half_dt2], [0.0, 1.0, dt], [0.0, 0.0, 1.0]]
+    FP = [[sum(F[i][k] * P[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+    dt2 = dt * dt
+    dt3 = dt2 * dt
+    Q = [
+        [dt3 * dt2 / 20, dt2 * dt2 / 8, dt3 / 6],
+        [dt2 * dt2 / 8, dt3 / 3, dt2 / 2],
+        [dt3 / 6, dt2 / 2, dt],
+    ]
+    return [
+        [sum(FP[i][k] * F[j][k] for k in range(3)) + q * Q[i][j] for j in range(3)]
+        for i in range(3)
+    ]
+
+
+class KalmanBounceDetector:
+    """Detects bounces from vertical-velocity reversals of a tracked ball.
+
+    The detector arms once the ball falls faster than `min_speed`
+    (normalized units per second) and fires when it then rises faster than
+    `min_speed`. The reported bounce time is interpolated to the
+    zero crossing of vertical velocity. A detection further than the
+    innovation gate from the prediction re-seeds the filters; a gap longer
+    than `max_gap_s` starts a new track.
+    """
+
+    __slots__ = ("fx", "fy", "min_speed", "gate", "max_gap_s", "_armed", "_fall")
+
+    def __init__(
+        self,
+        process_noise: float = 2000.0,
+        measurement_noise: float = 1e-5,
+        min_speed: float = 0.5,
+        gate: float = 50.0,
+        max_gap_s: float = 0.5,
+    ) -> None:
+        self.fx = ConstantAccelerationFilter(process_noise, measurement_noise)
+        self.fy = ConstantAccelerationFilter(process_noise, measurement_noise)
+        self.min_speed = min_speed
+        self.gate = gate
+        self.max_gap_s = max_gap_s
+        self._armed = False
+        self._fall: Tuple[float, float] = (0.0, 0.0)  # (ts, vy) of latest falling estimate
+
+    @classmethod
+    def from_config(cls, config: FusionConfig) -> "KalmanBounceDetector":
+        return cls(
+            process_noise=config.kalman_process_noise,
+            measurement_noise=config.kalman_measurement_noise,
+            min_speed=config.kalman_min_speed,
+        )
+
+    def reset(self) -> None:
+        self.fx.ts = None
+        self.fy.ts = None
+        self._armed = False
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return self.fx.x[1], self.fy.x[1]
+
+    def predict(self, ts: float) -> Optional[Tuple[float, float]]:
+        """Predicted ball position at `ts`, e.g. for a missed frame."""
+        if self.fy.ts is None:
+            return None
+        return self.fx.predict_state(ts)[0], self.fy.predict_state(ts)[0]
+
+    def update(self, ts: float, x: float, y: float) -> Optional[float]:
+        """Fold in a detection; returns the bounce timestamp if one occurred."""
+        fy = self.fy
+        if fy.ts is None or ts - fy.ts > self.max_gap_s:
+            self._restart(ts, x, y)
+            return None
+        self.fx.update(ts, x)
+        if fy.update(ts, y) > self.gate:
+            # An abrupt reversal can exceed the gate; re-seed the filters but
+            # stay armed so the rising motion that follows still fires.
+            self.fx.initialize(ts, x)
+            fy.initialize(ts, y)
+            return None
+
+        vy = fy.x[1]
+        if vy > self.min_speed:
+            self._armed = True
+            self._fall = (ts, vy)
+        elif self._armed and vy < -self.min_speed:
+            self._armed = False
+            fall_ts, fall_vy = self._fall
+            return fall_ts + (ts - fall_ts) * fall_vy / (fall_vy - vy)
+        return None
+
+    def snapshot(self) -> tuple:
+        """Filter and arming state as plain values, for `restore`."""
+        return (
+            _filter_state(self.fx),
+            _filter_state(self.fy),
+            self._armed,
+            (float(self._fall[0]), float(self._fall[1])),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        fx, fy, self._armed, fall = snapshot
+        _restore_filter(self.fx, fx)
+        _restore_filter(self.fy, fy)
+        self._fall = tuple(fall)
+
+    def _restart(self, ts: float, x: float, y: float) -> None:
+        self.fx.initialize(ts, x)
+        self.fy.initialize(ts, y)
+        self._armed = False
+
+
+def _filter_state(f: ConstantAccelerationFilter) -> tuple:
+    return (
+        [float(v) for v in f.x],
+        [[float(v) for v in row] for row in f.P],
+        None if f.ts is None else float(f.ts),
+    )
+
+
+def _restore_filter(f: ConstantAccelerationFilter, state: tuple) -> None:
+    x, P, f.ts = state
+    f.x = list(x)
+    f.P = [list(row) for row in P]
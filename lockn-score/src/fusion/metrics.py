@@ -0,0 +1,147 @@
+"""Optional latency/counter instrumentation for `FusionEngine`.
+
+`FusionEngine.metrics` is None by default and the hot path only pays an
+attribute check. When an `EngineMetrics` is attached, each call records
+its duration into a per-stage `LatencyHistogram`, counts events and state
+transitions. Callers record the capture-to-ingest age of client-stamped
+events with `record_capture` (meaningful when timestamps come from
+`time.time()`); events stamped with server time are left out. `reorder`
+points at the engine's `ReorderBuffer`, if any, so its `ReorderStats` can
+be exported alongside.
+
+Recording takes no locks: one session is normally fed by one writer, and
+concurrent writers to the same session can at worst lose a count.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .rally_tracker import RallyState, RallyStatus
+
+if TYPE_CHECKING:
+    from .reorder import ReorderBuffer
+
+STAGE_VISION = "vision"
+STAGE_AUDIO = "audio"
+STAGE_TICK = "tick"
+STAGE_VISION_BATCH = "vision_batch"
+STAGE_AUDIO_BATCH = "audio_batch"
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of non-negative integer nanoseconds.
+
+    Values are grouped by power of two, each split into `2**sub_bits`
+    linear sub-buckets, so any recorded value is reproduced within a
+    relative error of `2**-sub_bits` over the full range. Recording is a
+    `bit_length` and a list increment.
+    """
+
+    __slots__ = ("sub_bits", "counts", "count", "total", "max", "_linear_bits", "_last")
+
+    def __init__(self, sub_bits: int = 4, max_bits: int = 42) -> None:
+        self.sub_bits = sub_bits
+        self.counts: List[int] = [0] * ((max_bits - sub_bits + 1) << sub_bits)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._linear_bits = sub_bits + 1  # values below 2**this get exact buckets
+        self._last = len(self.counts) - 1
+
+    def record(self, value: int) -> None:
+        """Record a non-negative value; larger than the range saturates."""
+        shift = value.bit_length() - self._linear_bits
+        if shift <= 0:
+            index = value
+        else:
+            index = (shift << self.sub_bits) + (value >> shift)
+            if index > self._last:
+                index = self._last
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def bucket_bounds(self, index: int) -> Tuple[int, int]:
+        """Inclusive lower and exclusive upper value of bucket `index`."""
+        sub = 1 << self.sub_bits
+        if index < 2 * sub:
+            return index, index + 1
+        shift = (index >> self.sub_bits) - 1
+        top = index - (shift << self.sub_bits)
+        return top << shift, (top + 1) << shift
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile `q` (bucket midpoint), 0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min((low + high - 1) / 2, float(self.max))
+        return float(self.max)
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+class EngineMetrics:
+    """Per-session latency histograms and counters."""
+
+    __slots__ = ("latency", "events", "transitions", "capture_age", "reorder", "_last_state")
+
+    def __init__(self) -> None:
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.events: Dict[str, int] = {}
+        self.transitions: Dict[str, int] = {}
+        self.capture_age = LatencyHistogram()
+        self.reorder: Optional["ReorderBuffer"] = None
+        self._last_state = RallyState.IDLE
+
+    def record(
+        self, stage: str, elapsed_ns: int, status: RallyStatus, events: int = 1
+    ) -> None:
+        """Record one engine call that applied `events` events."""
+        histogram = self.latency.get(stage)
+        if histogram is None:
+            histogram = self.latency[stage] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+        self.events[stage] = self.events.get(stage, 0) + events
+        state = status.state
+        if state is not self._last_state:
+            self._last_state = state
+            self.transitions[state.value] = self.transitions.get(state.value, 0) + 1
+
+    def record_latency(self, stage: str, elapsed_ns: int) -> None:
+        """Record a duration measured outside the engine, e.g. an API handler."""
+        histogram = self.latency.get(stage)
+        if histogram is None:
+            histogram = self.latency[stage] = LatencyHistogram()
+        histogram.record(elapsed_ns)
+
+    def record_capture(self, timestamp: float) -> None:
+        """Record how long ago a client-stamped event was captured."""
+        age = int((time.time() - timestamp) * 1e9)
+        self.capture_age.record(age if age > 0 else 0)
+
+    def record_captures(self, timestamps: Iterable[float]) -> None:
+        """Record the capture ages of several client-stamped events."""
+        now = time.time()
+        record = self.capture_age.record
+        for timestamp in timestamps:
+            age = int((now - timestamp) * 1e9)
+            record(age if age > 0 else 0)
+
+    def stages(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        return iter(sorted(self.latency.items()))
@@ -0,0 +1,231 @@
+"""Joint audio/vision bounce scoring for `fusion_mode="probabilistic"`.
+
+The threshold tracker gates each modality on its own: audio below
+`audio_confidence_threshold` is dropped even when the ball is clearly on
+the table, and a confident vision detection cannot rescue a weak bounce
+sound. Here a candidate bounce is instead scored by the log-likelihood
+ratio of its evidence under "bounce" vs "no bounce"::
+
+    LLR = L_audio(confidence | silent | none) + L_vision(confidence | none)
+          + L_dt(|t_audio - t_vision|)
+
+and counted when the LLR reaches `FusionConfig.fusion_log_odds_threshold`.
+Every term is precomputed into one flat `LikelihoodTable`, so scoring a
+candidate is three bin computations and a list index.
+
+Audio evidence is "silent" (uninformative) when no audio has arrived for
+`vision_only_audio_silence_ms`, i.e. the microphone is absent; "none"
+when audio is live but nothing was heard within `audio_window_ms`.
+
+Candidates come from audio events (paired with the latest vision
+detection in the window) and from vision bounces (paired with the latest
+audio). An audio candidate that fails is kept pending for one window, so
+a vision detection arriving just after the sound can still confirm it.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+from .config import FusionConfig
+
+CONFIDENCE_BINS = 10
+DT_BINS = 8
+
+# Audio index 0: stream silent, 1: no audio in window, 2..: confidence bins.
+AUDIO_SILENT = 0
+AUDIO_NONE = 1
+AUDIO_STATES = CONFIDENCE_BINS + 2
+# Vision index 0: no detection in window, 1..: confidence bins.
+VISION_NONE = 0
+VISION_STATES = CONFIDENCE_BINS + 1
+
+# Beta(a, b) shapes of a detector's confidence given bounce / no bounce.
+BOUNCE_SHAPE = (3.0, 1.0)
+NOISE_SHAPE = (1.0, 2.0)
+# P(modality reports nothing within the window | bounce / no bounce).
+MISS_PROBABILITY = (0.05, 0.7)
+
+
+def _beta_log_pdf(c: float, a: float, b: float) -> float:
+    log_norm = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+    return log_norm + (a - 1) * math.log(c) + (b - 1) * math.log(1 - c)
+
+
+def confidence_llr(confidence: float) -> float:
+    """Log-likelihood ratio of a detector confidence, bounce vs noise."""
+    return _beta_log_pdf(confidence, *BOUNCE_SHAPE) - _beta_log_pdf(confidence, *NOISE_SHAPE)
+
+
+def dt_llr(fraction: float) -> float:
+    """LLR of an audio/vision offset, as a fraction of the window.
+
+    Offsets of real bounces are half-normal with sigma = window / 2;
+    unrelated events are uniform over the window.
+    """
+    return math.log(4 / math.sqrt(2 * math.pi)) - 2 * fraction * fraction
+
+
+class LikelihoodTable:
+    """Precomputed joint LLR indexed by (audio bin, vision bin, dt bin)."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Optional[List[float]] = None) -> None:
+        if values is None:
+            values = self._build()
+        if len(values) != AUDIO_STATES * VISION_STATES * DT_BINS:
+            raise ValueError("likelihood table has the wrong size")
+        self.values = values
+
+    @staticmethod
+    def _build() -> List[float]:
+        centers = [(i + 0.5) / CONFIDENCE_BINS for i in range(CONFIDENCE_BINS)]
+        missing = math.log(MISS_PROBABILITY[0] / MISS_PROBABILITY[1])
+        audio = [0.0, missing] + [confidence_llr(c) for c in centers]
+        vision = [missing] + [confidence_llr(c) for c in centers]
+        dt = [dt_llr((i + 0.5) / DT_BINS) for i in range(DT_BINS)]
+        values: List[float] = []
+        for a, audio_llr in enumerate(audio):
+            for v, vision_llr in enumerate(vision):
+                paired = a >= 2 and v != VISION_NONE
+                for d in range(DT_BINS):
+                    values.append(audio_llr + vision_llr + (dt[d] if paired else 0.0))
+        return values
+
+    def score(self, audio: int, vision: int, dt: int) -> float:
+        return self.values[(audio * VISION_STATES + vision) * DT_BINS + dt]
+
+
+def confidence_bin(confidence: float) -> int:
+    index = int(confidence * CONFIDENCE_BINS)
+    if index < 0:
+        return 0
+    return index if index < CONFIDENCE_BINS else CONFIDENCE_BINS - 1
+
+
+_STATE_FIELDS = (
+    "last_audio_ts",
+    "last_audio_conf",
+    "last_vision_ts",
+    "last_vision_conf",
+    "pending_ts",
+    "pending_conf",
+)
+
+
+def _plain(value: Optional[float]) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class ProbabilisticFusion:
+    """Sliding-window evidence for `RallyTracker` in probabilistic mode.
+
+    Holds the latest audio and vision observations (any confidence) and
+    at most one pending audio candidate; the tracker keeps ownership of
+    rally state and the bounce debounce.
+    """
+
+    __slots__ = (
+        "table",
+        "threshold",
+        "window_s",
+        "silence_s",
+        "_dt_scale",
+        "last_audio_ts",
+        "last_audio_conf",
+        "last_vision_ts",
+        "last_vision_conf",
+        "pending_ts",
+        "pending_conf",
+    )
+
+    def __init__(self, config: FusionConfig, table: Optional[LikelihoodTable] = None) -> None:
+        self.table = table or LikelihoodTable()
+        self.threshold = config.fusion_log_odds_threshold
+        self.window_s = config.audio_window_ms / 1000
+        self.silence_s = config.vision_only_audio_silence_ms / 1000
+        self._dt_scale = DT_BINS / self.window_s if self.window_s > 0 else 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_audio_ts: Optional[float] = None
+        self.last_audio_conf = 0.0
+        self.last_vision_ts: Optional[float] = None
+        self.last_vision_conf = 0.0
+        self.pending_ts: Optional[float] = None
+        self.pending_conf = 0.0
+
+    def snapshot(self) -> tuple:
+        """Latest observations and pending candidate, for `restore`."""
+        return tuple(_plain(getattr(self, name)) for name in _STATE_FIELDS)
+
+    def restore(self, snapshot: tuple) -> None:
+        for name, value in zip(_STATE_FIELDS, snapshot):
+            setattr(self, name, value)
+
+    def score(
+        self,
+        audio_ts: Optional[float],
+        audio_conf: float,
+        vision_ts: Optional[float],
+        vision_conf: float,
+        now: float,
+    ) -> float:
+        """LLR of the evidence pair around `now`; None timestamps mean absent."""
+        window = self.window_s
+        if audio_ts is None or abs(now - audio_ts) > window:
+            silent = audio_ts is None or now - audio_ts > self.silence_s
+            audio = AUDIO_SILENT if silent else AUDIO_NONE
+        else:
+            audio = confidence_bin(audio_conf) + 2
+        if vision_ts is None or abs(now - vision_ts) > window:
+            vision = VISION_NONE
+        else:
+            vision = confidence_bin(vision_conf) + 1
+        dt = 0
+        if audio >= 2 and vision != VISION_NONE:
+            dt = int(abs(audio_ts - vision_ts) * self._dt_scale)  # type: ignore[operator]
+            if dt >= DT_BINS:
+                dt = DT_BINS - 1
+        return self.table.score(audio, vision, dt)
+
+    def record_audio(self, ts: float, confidence: float) -> None:
+        """Keep audio as evidence for vision bounces without making it a candidate."""
+        self.last_audio_ts = ts
+        self.last_audio_conf = confidence
+
+    def observe_audio(self, ts: float, confidence: float) -> bool:
+        """Score an audio candidate; returns True to count it at `ts`.
+
+        A rejected candidate stays pending for vision arriving within the window.
+        """
+        score = self.score(ts, confidence, self.last_vision_ts, self.last_vision_conf, ts)
+        self.last_audio_ts = ts
+        self.last_audio_conf = confidence
+        if score >= self.threshold:
+            self.pending_ts = None
+            return True
+        self.pending_ts = ts
+        self.pending_conf = confidence
+        return False
+
+    def observe_vision(self, ts: float, confidence: float) -> Optional[float]:
+        """Record a detection; returns a pending audio timestamp it confirms."""
+        self.last_vision_ts = ts
+        self.last_vision_conf = confidence
+        pending = self.pending_ts
+        if pending is None:
+            return None
+        if abs(ts - pending) > self.window_s:
+            self.pending_ts = None
+            return None
+        if self.score(pending, self.pending_conf, ts, confidence, pending) >= self.threshold:
+            self.pending_ts = None
+            return pending
+        return None
+
+    def vision_bounce(self, ts: float, confidence: float) -> bool:
+        """Whether a vision bounce candidate at `ts` passes with the latest audio."""
+        return self.score(self.last_audio_ts, self.last_audio_conf, ts, confidence, ts) >= self.threshold
@@ -4,9 +4,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .config import FusionConfig
+from .geometry import build_region
+from .kalman import KalmanBounceDetector
+from .probabilistic import ProbabilisticFusion
+
+if TYPE_CHECKING:
+    from .history import EventHistory
 
 
 class RallyState(str, Enum):
@@ -15,7 +21,7 @@ class RallyState(str, Enum):
     ENDED = "ENDED"
 
 
-@dataclass
+@dataclass(slots=True)
 class BallDetection:
     """Vision detection for the ball."""
 
@@ -25,7 +31,7 @@ class BallDetection:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class BounceEvent:
     """Audio bounce event."""
 
@@ -33,24 +39,60 @@ class BounceEvent:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class RallyStatus:
+    """Snapshot of tracker state; shared between callers, treat as read-only."""
+
     state: RallyState
     rally_count: int
     last_bounce_ts: Optional[float]
     last_ball_ts: Optional[float]
 
 
+@dataclass(frozen=True, slots=True)
+class StateTransition:
+    """Rally state change observed while applying an event."""
+
+    timestamp: float  # seconds, timestamp of the event that caused it
+    from_state: RallyState
+    to_state: RallyState
+    rally_count: int
+
+
 class RallyTracker:
-    """State machine for rally tracking using fused audio/vision input."""
+    """State machine for rally tracking using fused audio/vision input.
+
+    `get_status` returns a cached `RallyStatus` that is only rebuilt after
+    an event changes one of its fields, so callers may compare statuses by
+    identity. Mutate tracker state only through its methods; direct
+    attribute writes bypass the cache.
+
+    With `history` set, every state change and counted bounce is recorded
+    into it.
+    """
 
     def __init__(self, config: FusionConfig) -> None:
         self.config = config
+        self.region = build_region(config)
+        # Bound once so the per-detection table test is a single call.
+        self._in_table = self.region.contains
+        self.kalman: Optional[KalmanBounceDetector] = None
+        if config.vision_bounce_mode == "kalman":
+            self.kalman = KalmanBounceDetector.from_config(config)
+        elif config.vision_bounce_mode != "heuristic":
+            raise ValueError(f"unknown vision_bounce_mode {config.vision_bounce_mode!r}")
+        self.fusion: Optional[ProbabilisticFusion] = None
+        if config.fusion_mode == "probabilistic":
+            self.fusion = ProbabilisticFusion(config)
+        elif config.fusion_mode != "threshold":
+            raise ValueError(f"unknown fusion_mode {config.fusion_mode!r}")
         self.state = RallyState.IDLE
         self.rally_count = 0
         self.last_bounce_ts: Optional[float] = None
         self.last_ball_ts: Optional[float] = None
         self.last_audio_ts: Optional[float] = None
+        self._status: Optional[RallyStatus] = None
+        self.history: Optional["EventHistory"] = None
 
     def reset(self) -> None:
         self.state = RallyState.IDLE
@@ -58,52 +100,129 @@ class RallyTracker:
         self.last_bounce_ts = None
         self.last_ball_ts = None
         self.last_audio_ts = None
+        self._status = None
+        if self.kalman is not None:
+            self.kalman.reset()
+        if self.fusion is not None:
+            self.fusion.reset()
+
+    def snapshot(self) -> tuple:
+        """Rally state, counters and filter state as plain values, for `restore`.
+
+        Timestamps are stored as floats (they may arrive as NumPy scalars),
+        so pickling the tuple does not depend on any class.
+        """
+        return (
+            self.state.value,
+            self.rally_count,
+            _plain(self.last_bounce_ts),
+            _plain(self.last_ball_ts),
+            _plain(self.last_audio_ts),
+            None if self.kalman is None else self.kalman.snapshot(),
+            None if self.fusion is None else self.fusion.snapshot(),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """Load a `snapshot` tuple; parts the config does not enable are skipped."""
+        (
+            value,
+            self.rally_count,
+            self.last_bounce_ts,
+            self.last_ball_ts,
+            self.last_audio_ts,
+            kalman,
+            fusion,
+        ) = snapshot
+        self.state = RallyState(value)
+        self._status = None
+        if self.kalman is not None and kalman is not None:
+            self.kalman.restore(kalman)
+        if self.fusion is not None and fusion is not None:
+            self.fusion.restore(fusion)
 
     def get_status(self) -> RallyStatus:
-        return RallyStatus(
-            state=self.state,
-            rally_count=self.rally_count,
-            last_bounce_ts=self.last_bounce_ts,
-            last_ball_ts=self.last_ball_ts,
-        )
+        status = self._status
+        if status is None:
+            status = self._status = RallyStatus(
+                state=self.state,
+                rally_count=self.rally_count,
+                last_bounce_ts=self.last_bounce_ts,
+                last_ball_ts=self.last_ball_ts,
+            )
+        return status
 
     def update_vision(self, detection: BallDetection) -> RallyStatus:
         """Update state machine from a vision detection."""
-        if detection.confidence < self.config.vision_confidence_threshold:
+        return self.apply_vision(
+            detection.timestamp, detection.x, detection.y, detection.confidence
+        )
+
+    def update_audio(self, bounce: BounceEvent) -> RallyStatus:
+        """Update state machine from an audio bounce event."""
+        return self.apply_audio(bounce.timestamp, bounce.confidence)
+
+    def apply_vision(
+        self, timestamp: float, x: float, y: float, confidence: float
+    ) -> RallyStatus:
+        """`update_vision` without allocating a `BallDetection`."""
+        fusion = self.fusion
+        if fusion is not None:
+            # Any detection is evidence; it may confirm a pending audio bounce.
+            confirmed = fusion.observe_vision(timestamp, confidence)
+            if (
+                confirmed is not None
+                and self.state == RallyState.IN_PLAY
+                and self._bounce_interval_ok(confirmed)
+            ):
+                self._count_bounce(confirmed)
+        if confidence < self.config.vision_confidence_threshold:
             return self.get_status()
 
-        in_table = self._in_table(detection.x, detection.y)
-        self.last_ball_ts = detection.timestamp
+        in_table = self._in_table(x, y)
+        if self.last_ball_ts != timestamp:
+            self.last_ball_ts = timestamp
+            self._status = None
+        bounce_ts = timestamp
+        if self.kalman is not None:
+            bounce_ts = self.kalman.update(timestamp, x, y)
 
         if self.state == RallyState.IDLE:
             if in_table:
-                self.state = RallyState.IN_PLAY
+                self._set_state(RallyState.IN_PLAY, timestamp)
             return self.get_status()
 
         if self.state == RallyState.IN_PLAY:
             if not in_table:
                 # Ball left table area
-                self.state = RallyState.ENDED
+                self._set_state(RallyState.ENDED, timestamp)
                 return self.get_status()
 
-            # Vision-only bounce heuristic
+            # Vision-only bounce: every detection (heuristic) or a
+            # trajectory reversal (kalman, bounce_ts is None otherwise).
             if (
-                self.config.allow_vision_only
-                and self._audio_silent(detection.timestamp)
-                and self._bounce_interval_ok(detection.timestamp)
+                bounce_ts is not None
+                and self.config.allow_vision_only
+                and self._bounce_interval_ok(bounce_ts)
+                and (
+                    fusion.vision_bounce(bounce_ts, confidence)
+                    if fusion is not None
+                    else self._audio_silent(timestamp)
+                )
             ):
-                self._count_bounce(detection.timestamp)
+                self._count_bounce(bounce_ts)
 
         return self.get_status()
 
-    def update_audio(self, bounce: BounceEvent) -> RallyStatus:
-        """Update state machine from an audio bounce event."""
-        if bounce.confidence < self.config.audio_confidence_threshold:
+    def apply_audio(self, timestamp: float, confidence: float) -> RallyStatus:
+        """`update_audio` without allocating a `BounceEvent`."""
+        if self.fusion is not None:
+            return self._apply_audio_fused(timestamp, confidence)
+        if confidence < self.config.audio_confidence_threshold:
             return self.get_status()
 
-        self.last_audio_ts = bounce.timestamp
+        self.last_audio_ts = timestamp
 
-        if not self._bounce_interval_ok(bounce.timestamp):
+        if not self._bounce_interval_ok(timestamp):
             return self.get_status()
 
         if self.state == RallyState.IDLE:
@@ -111,29 +230,62 @@ class RallyTracker:
             return self.get_status()
 
         if self.state == RallyState.IN_PLAY:
-            if self._audio_confirmed_by_vision(bounce.timestamp):
-                self._count_bounce(bounce.timestamp)
+            if self._audio_confirmed_by_vision(timestamp):
+                self._count_bounce(timestamp)
 
         return self.get_status()
 
+    def _apply_audio_fused(self, timestamp: float, confidence: float) -> RallyStatus:
+        assert self.fusion is not None
+        self.last_audio_ts = timestamp
+        if self.state != RallyState.IN_PLAY or not self._bounce_interval_ok(timestamp):
+            self.fusion.record_audio(timestamp, confidence)
+            return self.get_status()
+        if self.fusion.observe_audio(timestamp, confidence):
+            self._count_bounce(timestamp)
+        return self.get_status()
+
     def tick(self, now_ts: float) -> RallyStatus:
         """Periodic update for timeouts."""
         if self.state == RallyState.IN_PLAY:
             if self.last_ball_ts is not None:
                 if (now_ts - self.last_ball_ts) * 1000 > self.config.vision_timeout_ms:
-                    self.state = RallyState.ENDED
-            if self.last_bounce_ts is not None:
+                    self._set_state(RallyState.ENDED, now_ts)
+            # Both timeouts may have expired; end the rally once.
+            if self.state == RallyState.IN_PLAY and self.last_bounce_ts is not None:
                 if (now_ts - self.last_bounce_ts) * 1000 > self.config.rally_timeout_ms:
-                    self.state = RallyState.ENDED
+                    self._set_state(RallyState.ENDED, now_ts)
         return self.get_status()
 
+    def next_deadline(self) -> Optional[float]:
+        """Earliest `tick` time at which a timeout could end the rally.
+
+        None unless the rally is in play. Events arriving before then push
+        the deadline back, so callers re-check after ticking.
+        """
+        if self.state != RallyState.IN_PLAY:
+            return None
+        deadline: Optional[float] = None
+        if self.last_ball_ts is not None:
+            deadline = self.last_ball_ts + self.config.vision_timeout_ms / 1000
+        if self.last_bounce_ts is not None:
+            rally_deadline = self.last_bounce_ts + self.config.rally_timeout_ms / 1000
+            if deadline is None or rally_deadline < deadline:
+                deadline = rally_deadline
+        return deadline
+
+    def _set_state(self, state: RallyState, ts: float) -> None:
+        if self.history is not None:
+            self.history.record_change(ts, self.state, state, self.rally_count)
+        self.state = state
+        self._status = None
+
     def _count_bounce(self, ts: float) -> None:
         self.rally_count += 1
         self.last_bounce_ts = ts
-
-    def _in_table(self, x: float, y: float) -> bool:
-        x_min, y_min, x_max, y_max = self.config.table_bbox
-        return x_min <= x <= x_max and y_min <= y <= y_max
+        self._status = None
+        if self.history is not None:
+            self.history.record_change(ts, self.state, self.state, self.rally_count)
 
     def _audio_confirmed_by_vision(self, bounce_ts: float) -> bool:
         """Confirm audio bounce with recent vision signal."""
@@ -151,3 +303,7 @@ class RallyTracker:
         if self.last_bounce_ts is None:
             return True
         return (ts - self.last_bounce_ts) * 1000 >= self.config.min_bounce_interval_ms
+
+
+def _plain(ts: Optional[float]) -> Optional[float]:
+    return None if ts is None else float(ts)
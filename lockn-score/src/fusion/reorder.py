@@ -0,0 +1,141 @@
+"""Event-time reordering for vision/audio inputs with different latencies.
+
+Audio and vision reach the fusion layer through pipelines with different
+delays, but `RallyTracker` expects events in timestamp order. The
+`ReorderBuffer` holds events for a bounded lateness and releases them in
+timestamp order once the watermark (newest timestamp seen minus the
+allowed lateness) has passed them.
+
+Events older than the last released one can no longer be applied in
+order and are dropped; when more than `max_pending` events are held the
+oldest are released early. Both are counted in `ReorderStats`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+# (timestamp, kind, sequence, x, y, confidence). Ties on timestamp release
+# vision before audio, matching `replay`, then in arrival order.
+BufferedEvent = Tuple[float, int, int, float, float, float]
+
+
+@dataclass(slots=True)
+class ReorderStats:
+    received: int = 0
+    released: int = 0
+    dropped_late: int = 0
+    forced_releases: int = 0  # released before the watermark due to capacity
+    max_lateness_ms: float = 0.0  # largest arrival delay behind the newest event
+
+
+class ReorderBuffer:
+    """Bounded watermark-based reorder buffer."""
+
+    def __init__(self, lateness_s: float, max_pending: int = 512) -> None:
+        if lateness_s < 0:
+            raise ValueError("lateness_s must be >= 0")
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.lateness_s = lateness_s
+        self.max_pending = max_pending
+        self.stats = ReorderStats()
+        self._heap: List[BufferedEvent] = []
+        self._seq = 0
+        self._max_ts = -math.inf
+        self._watermark = -math.inf
+        self._last_released = -math.inf
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def watermark(self) -> float:
+        return self._watermark
+
+    @property
+    def latest(self) -> Optional[float]:
+        """Largest timestamp pushed since the last clear, if any."""
+        return self._max_ts if self._max_ts != -math.inf else None
+
+    @property
+    def earliest(self) -> Optional[float]:
+        """Timestamp of the oldest buffered event, if any."""
+        return self._heap[0][0] if self._heap else None
+
+    def push(
+        self, timestamp: float, kind: int, x: float = 0.0, y: float = 0.0, confidence: float = 0.0
+    ) -> bool:
+        """Buffer an event; returns False if it arrived too late and was dropped."""
+        stats = self.stats
+        stats.received += 1
+        if timestamp < self._last_released:
+            stats.dropped_late += 1
+            return False
+        if timestamp > self._max_ts:
+            self._max_ts = timestamp
+            self._advance(timestamp - self.lateness_s)
+        else:
+            lateness_ms = (self._max_ts - timestamp) * 1000
+            if lateness_ms > stats.max_lateness_ms:
+                stats.max_lateness_ms = lateness_ms
+        heapq.heappush(self._heap, (timestamp, kind, self._seq, x, y, confidence))
+        self._seq += 1
+        return True
+
+    def advance(self, now_ts: float) -> None:
+        """Move the watermark from a clock reading (e.g. a tick)."""
+        self._advance(now_ts - self.lateness_s)
+
+    def _advance(self, watermark: float) -> None:
+        if watermark > self._watermark:
+            self._watermark = watermark
+
+    def pop_ready(self) -> Iterator[BufferedEvent]:
+        """Yield events at or before the watermark, oldest first."""
+        heap = self._heap
+        stats = self.stats
+        while heap and (heap[0][0] <= self._watermark or len(heap) > self.max_pending):
+            if heap[0][0] > self._watermark:
+                stats.forced_releases += 1
+            event = heapq.heappop(heap)
+            self._last_released = event[0]
+            stats.released += 1
+            yield event
+
+    def drain(self) -> Iterator[BufferedEvent]:
+        """Yield every buffered event in order, e.g. at end of stream."""
+        heap = self._heap
+        while heap:
+            event = heapq.heappop(heap)
+            self._last_released = event[0]
+            self.stats.released += 1
+            yield event
+
+    def snapshot(self) -> tuple:
+        """Buffered events, watermark and stats as plain values, for `restore`."""
+        stats = self.stats
+        return (
+            [(float(ts), int(kind), seq, float(x), float(y), float(c)) for ts, kind, seq, x, y, c in self._heap],
+            self._seq,
+            float(self._max_ts),
+            float(self._watermark),
+            float(self._last_released),
+            (stats.received, stats.released, stats.dropped_late, stats.forced_releases, stats.max_lateness_ms),
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        heap, self._seq, self._max_ts, self._watermark, self._last_released, stats = snapshot
+        self._heap = list(heap)  # a heap-ordered list stays a heap
+        self.stats = ReorderStats(*stats)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._seq = 0
+        self._max_ts = -math.inf
+        self._watermark = -math.inf
+        self._last_released = -math.inf
+        self.stats = ReorderStats()
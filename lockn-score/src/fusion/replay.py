@@ -0,0 +1,253 @@
+"""Offline replay of recorded vision/audio streams through the rally state machine.
+
+`replay` produces exactly the transitions and final status that feeding
+the same events one by one into a fresh `RallyTracker` would, but it
+works on NumPy arrays:
+
+- events below the confidence thresholds are dropped up front (they are
+  no-ops for the online tracker),
+- the table-region test is evaluated for all detections at once,
+- streams are merged by timestamp with a single stable sort, and
+- the state machine runs as a tight loop over plain floats, stopping
+  early once the rally has ended.
+
+Events sharing a timestamp are applied vision first, then audio, then
+ticks, each in input order.
+
+`fusion_mode="probabilistic"` scores sub-threshold events too, so it is
+replayed by feeding a `RallyTracker` in the same merged order instead.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import FusionConfig
+from .geometry import build_region
+from .history import KIND_AUDIO, KIND_TICK, KIND_VISION
+from .kalman import KalmanBounceDetector
+from .rally_tracker import RallyState, RallyStatus, RallyTracker, StateTransition
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+
+@dataclass
+class ReplayResult:
+    status: RallyStatus
+    transitions: List[StateTransition] = field(default_factory=list)
+    bounce_timestamps: List[float] = field(default_factory=list)
+
+
+def in_table_mask(config: FusionConfig, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Vectorized equivalent of `RallyTracker._in_table`."""
+    return build_region(config).contains_many(x, y)
+
+
+def replay(
+    config: FusionConfig,
+    vision_ts: Optional[np.ndarray] = None,
+    vision_x: Optional[np.ndarray] = None,
+    vision_y: Optional[np.ndarray] = None,
+    vision_conf: Optional[np.ndarray] = None,
+    audio_ts: Optional[np.ndarray] = None,
+    audio_conf: Optional[np.ndarray] = None,
+    tick_ts: Optional[np.ndarray] = None,
+) -> ReplayResult:
+    """Replay recorded streams and return the resulting rally history.
+
+    All timestamps are in seconds. Vision arrays must share one length, as
+    must the audio arrays. Any stream may be omitted.
+    """
+    v_ts = _as_array(vision_ts)
+    a_ts = _as_array(audio_ts)
+    t_ts = _as_array(tick_ts)
+    if len(v_ts):
+        v_x = _as_array(vision_x)
+        v_y = _as_array(vision_y)
+        v_conf = _as_array(vision_conf)
+        if not (len(v_x) == len(v_y) == len(v_conf) == len(v_ts)):
+            raise ValueError("vision arrays must have equal lengths")
+        if config.fusion_mode == "threshold":
+            keep = v_conf >= config.vision_confidence_threshold
+            v_ts = v_ts[keep]
+            v_conf = v_conf[keep]
+            v_x = v_x[keep]
+            v_y = v_y[keep]
+        v_in = in_table_mask(config, v_x, v_y)
+    else:
+        v_x = v_y = v_conf = _EMPTY
+        v_in = np.empty(0, dtype=bool)
+    if len(a_ts):
+        a_conf = _as_array(audio_conf)
+        if len(a_conf) != len(a_ts):
+            raise ValueError("audio arrays must have equal lengths")
+        if config.fusion_mode == "threshold":
+            keep = a_conf >= config.audio_confidence_threshold
+            a_ts = a_ts[keep]
+            a_conf = a_conf[keep]
+    else:
+        a_conf = _EMPTY
+
+    ts = np.concatenate((v_ts, a_ts, t_ts))
+    kinds = np.concatenate(
+        (
+            np.full(len(v_ts), KIND_VISION, dtype=np.int8),
+            np.full(len(a_ts), KIND_AUDIO, dtype=np.int8),
+            np.full(len(t_ts), KIND_TICK, dtype=np.int8),
+        )
+    )
+    inside = np.concatenate((v_in, np.zeros(len(a_ts) + len(t_ts), dtype=bool)))
+    order = np.lexsort((kinds, ts))
+    if config.fusion_mode != "threshold":
+        confs = np.concatenate((v_conf, a_conf, np.zeros(len(t_ts))))
+        pad = np.zeros(len(a_ts) + len(t_ts))
+        return _run_tracker(
+            config,
+            kinds[order].tolist(),
+            ts[order].tolist(),
+            np.concatenate((v_x, pad))[order].tolist(),
+            np.concatenate((v_y, pad))[order].tolist(),
+            confs[order].tolist(),
+        )
+    last_vision_ts = float(v_ts.max()) if len(v_ts) else None
+    positions: Iterable[Tuple[float, float]] = itertools.repeat((0.0, 0.0))
+    if config.vision_bounce_mode == "kalman":
+        pad = np.zeros(len(a_ts) + len(t_ts))
+        xs = np.concatenate((v_x, pad))[order].tolist()
+        ys = np.concatenate((v_y, pad))[order].tolist()
+        positions = zip(xs, ys)
+    return _run(
+        config,
+        kinds[order].tolist(),
+        ts[order].tolist(),
+        inside[order].tolist(),
+        positions,
+        last_vision_ts,
+    )
+
+
+def _as_array(values: Optional[np.ndarray]) -> np.ndarray:
+    if values is None:
+        return _EMPTY
+    return np.asarray(values, dtype=np.float64).ravel()
+
+
+def _run_tracker(
+    config: FusionConfig,
+    kinds: List[int],
+    stamps: List[float],
+    xs: List[float],
+    ys: List[float],
+    confs: List[float],
+) -> ReplayResult:
+    tracker = RallyTracker(config)
+    transitions: List[StateTransition] = []
+    bounces: List[float] = []
+    for kind, ts, x, y, conf in zip(kinds, stamps, xs, ys, confs):
+        prev_state, prev_count = tracker.state, tracker.rally_count
+        if kind == KIND_VISION:
+            tracker.apply_vision(ts, x, y, conf)
+        elif kind == KIND_AUDIO:
+            tracker.apply_audio(ts, conf)
+        else:
+            tracker.tick(ts)
+        if tracker.rally_count != prev_count:
+            bounces.append(tracker.last_bounce_ts)  # type: ignore[arg-type]
+        if tracker.state is not prev_state:
+            transitions.append(StateTransition(ts, prev_state, tracker.state, tracker.rally_count))
+    return ReplayResult(status=tracker.get_status(), transitions=transitions, bounce_timestamps=bounces)
+
+
+def _run(
+    config: FusionConfig,
+    kinds: List[int],
+    stamps: List[float],
+    inside: List[bool],
+    positions: Iterable[Tuple[float, float]],
+    last_vision_ts: Optional[float],
+) -> ReplayResult:
+    vision_timeout_ms = config.vision_timeout_ms
+    audio_window_ms = config.audio_window_ms
+    min_bounce_interval_ms = config.min_bounce_interval_ms
+    allow_vision_only = config.allow_vision_only
+    silence_ms = config.vision_only_audio_silence_ms
+    rally_timeout_ms = config.rally_timeout_ms
+    kalman = (
+        KalmanBounceDetector.from_config(config)
+        if config.vision_bounce_mode == "kalman"
+        else None
+    )
+
+    idle, in_play, ended = RallyState.IDLE, RallyState.IN_PLAY, RallyState.ENDED
+    state = idle
+    rally_count = 0
+    last_bounce: Optional[float] = None
+    last_ball: Optional[float] = None
+    last_audio: Optional[float] = None
+    transitions: List[StateTransition] = []
+    bounces: List[float] = []
+
+    for kind, ts, in_table, (x, y) in zip(kinds, stamps, inside, positions):
+        if kind == KIND_VISION:
+            last_ball = ts
+            bounce_ts: Optional[float] = ts
+            if kalman is not None:
+                bounce_ts = kalman.update(ts, x, y)
+            if state is idle:
+                if in_table:
+                    state = in_play
+                    transitions.append(StateTransition(ts, idle, in_play, rally_count))
+            elif not in_table:
+                state = ended
+                transitions.append(StateTransition(ts, in_play, ended, rally_count))
+                break
+            elif (
+                bounce_ts is not None
+                and allow_vision_only
+                and (last_audio is None or (ts - last_audio) * 1000 > silence_ms)
+                and (
+                    last_bounce is None
+                    or (bounce_ts - last_bounce) * 1000 >= min_bounce_interval_ms
+                )
+            ):
+                rally_count += 1
+                last_bounce = bounce_ts
+                bounces.append(bounce_ts)
+        elif kind == KIND_AUDIO:
+            last_audio = ts
+            if last_bounce is not None and not (
+                (ts - last_bounce) * 1000 >= min_bounce_interval_ms
+            ):
+                continue
+            if (
+                state is in_play
+                and last_ball is not None
+                and abs(ts - last_ball) * 1000 <= audio_window_ms
+            ):
+                rally_count += 1
+                last_bounce = ts
+                bounces.append(ts)
+        elif state is in_play:
+            if (last_ball is not None and (ts - last_ball) * 1000 > vision_timeout_ms) or (
+                last_bounce is not None and (ts - last_bounce) * 1000 > rally_timeout_ms
+            ):
+                state = ended
+                transitions.append(StateTransition(ts, in_play, ended, rally_count))
+                break
+
+    if state is ended:
+        # ENDED is terminal: later events only move the last ball timestamp,
+        # which ends up at the latest detection in time order.
+        last_ball = last_vision_ts
+
+    status = RallyStatus(
+        state=state,
+        rally_count=rally_count,
+        last_bounce_ts=last_bounce,
+        last_ball_ts=last_ball,
+    )
+    return ReplayResult(status=status, transitions=transitions, bounce_timestamps=bounces)
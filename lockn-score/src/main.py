@@ -0,0 +1,5 @@
+"""ASGI entry point for the LockN Score service (`uvicorn src.main:app`)."""
+
+from src.api.score_api import app
+
+__all__ = ["app"]
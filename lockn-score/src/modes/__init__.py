@@ -0,0 +1 @@
+"""Scoring modes package."""
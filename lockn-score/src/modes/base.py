@@ -0,0 +1,121 @@
+"""Shared machinery for scoring modes.
+
+A mode keeps its match state in a small slotted dataclass of scalars, so
+every event updates it in O(1). Undo is an event log: before an event is
+applied the previous state is copied (constant size) onto a bounded log,
+and `undo` pops the newest entry instead of recomputing from scratch.
+
+`observe` bridges the fusion layer: it diffs successive `RallyStatus`
+values from a session's `RallyTracker` and turns new bounces into `hit`
+events and a rally ending into a `miss`.
+"""
+
+from __future__ import annotations
+
+import copy
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, ClassVar, Deque, Dict, Generic, List, Tuple, TypeVar
+
+from src.fusion.rally_tracker import RallyState, RallyStatus
+
+DEFAULT_UNDO_LIMIT = 256
+
+
+class ModeError(ValueError):
+    """An event is not valid for the mode or its current state."""
+
+
+@dataclass(slots=True)
+class ModeEvent:
+    """One applied event and the state it replaced."""
+
+    seq: int
+    event_type: str
+    params: Dict[str, Any]
+    previous: Any
+
+
+StateT = TypeVar("StateT")
+
+
+class Mode(ABC, Generic[StateT]):
+    """Base class for solo/rally/game scoring.
+
+    Subclasses set `name`, build their initial state in `__init__` and
+    implement `on_<event>` handlers that mutate `self.state` in place, plus
+    `settings_dict` and `state_dict` for the JSON view. Handlers raise
+    `ModeError` for events that do not apply.
+    """
+
+    name: ClassVar[str] = ""
+    events: ClassVar[Tuple[str, ...]] = ("hit", "miss")
+
+    def __init__(self, state: StateT, undo_limit: int = DEFAULT_UNDO_LIMIT) -> None:
+        self.state = state
+        self.log: Deque[ModeEvent] = deque(maxlen=undo_limit)
+        self.event_count = 0
+        self._seen_count = 0
+        self._seen_state = RallyState.IDLE
+
+    @property
+    def game_over(self) -> bool:
+        return bool(getattr(self.state, "game_over", False))
+
+    def apply(self, event_type: str, **params: Any) -> None:
+        """Apply one event, recording it for undo."""
+        if event_type not in self.events:
+            raise ModeError(f"{event_type} is not supported in {self.name} mode")
+        if self.game_over:
+            raise ModeError(f"{self.name} session is over")
+        previous = copy.copy(self.state)
+        getattr(self, f"on_{event_type.replace('-', '_')}")(**params)
+        self.event_count += 1
+        self.log.append(ModeEvent(self.event_count, event_type, params, previous))
+
+    def undo(self) -> ModeEvent:
+        """Revert the most recent event and return it."""
+        if not self.log:
+            raise ModeError("nothing to undo")
+        event = self.log.pop()
+        self.state = event.previous
+        return event
+
+    def observe(self, status: RallyStatus) -> List[str]:
+        """Apply events implied by a new tracker status; returns their types.
+
+        Each newly counted bounce is a `hit` and a rally ending is a `miss`.
+        A drop in the count (tracker reset) starts a fresh rally.
+        """
+        applied: List[str] = []
+        count = status.rally_count
+        if count < self._seen_count:
+            self._seen_count = 0
+        try:
+            for _ in range(count - self._seen_count):
+                self.apply("hit")
+                applied.append("hit")
+            if status.state is RallyState.ENDED and self._seen_state is not RallyState.ENDED:
+                self.apply("miss")
+                applied.append("miss")
+        except ModeError:
+            pass  # the session finished; later tracker output is ignored
+        self._seen_count = count
+        self._seen_state = status.state
+        return applied
+
+    @abstractmethod
+    def settings_dict(self) -> Dict[str, Any]:
+        """JSON view of the settings the mode was created with."""
+
+    @abstractmethod
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON view of the match state."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON view of the session for API responses."""
+        data = self.state_dict()
+        data["settings"] = self.settings_dict()
+        data["canUndo"] = bool(self.log)
+        return data
@@ -0,0 +1,170 @@
+"""Full game: points, serve rotation and best-of-N sets."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .base import DEFAULT_UNDO_LIMIT, Mode, ModeError
+
+
+class GameSettings(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    points_to_win: int = Field(default=11, ge=1)
+    serve_interval: int = Field(default=5, ge=1)
+    best_of_sets: int = Field(default=1, ge=1)
+
+
+@dataclass(slots=True)
+class GameState:
+    player1: int = 0
+    player2: int = 0
+    player1_sets: int = 0
+    player2_sets: int = 0
+    current_set: int = 1
+    first_server: int = 1  # server at the start of the current set
+    server: int = 1
+    rally_count: int = 0  # hits in the rally being played
+    last_rally_count: int = 0
+    longest_rally: int = 0
+    streak: int = 0  # consecutive points won by streak_player
+    streak_player: Optional[int] = None
+    last_point_by: Optional[int] = None
+    winner: Optional[int] = None
+    active: bool = True
+    game_over: bool = False
+
+
+class GameMode(Mode[GameState]):
+    """Two-player scoring.
+
+    A set goes to the first player on `points_to_win` with a two-point lead.
+    Service changes every `serve_interval` points, and every point once
+    both players reach `points_to_win - 1`. The first server alternates
+    between sets and the match goes to whoever wins a majority of
+    `best_of_sets`.
+
+    A `miss` awards the point to the opponent of whoever was due to hit:
+    the server plays the first ball of a rally and hits then alternate.
+    """
+
+    name = "game"
+    events = ("hit", "miss", "point", "rally_end")
+
+    def __init__(
+        self,
+        points_to_win: int = 11,
+        serve_interval: int = 5,
+        best_of_sets: int = 1,
+        undo_limit: int = DEFAULT_UNDO_LIMIT,
+    ) -> None:
+        super().__init__(GameState(), undo_limit)
+        self.points_to_win = points_to_win
+        self.serve_interval = serve_interval
+        self.best_of_sets = best_of_sets
+        self.sets_to_win = best_of_sets // 2 + 1
+
+    def on_hit(self) -> None:
+        self.state.rally_count += 1
+
+    def on_miss(self) -> None:
+        state = self.state
+        receiver = 3 - state.server
+        missed_by = state.server if state.rally_count % 2 == 0 else receiver
+        self._award(3 - missed_by)
+
+    def on_point(self, player: int) -> None:
+        if player not in (1, 2):
+            raise ModeError("player must be 1 or 2")
+        self._award(player)
+
+    def on_rally_end(self, rally_length: int) -> None:
+        if rally_length < 0:
+            raise ModeError("rally_length must be >= 0")
+        self._record_rally(rally_length)
+
+    def _record_rally(self, length: int) -> None:
+        state = self.state
+        state.last_rally_count = length
+        if length > state.longest_rally:
+            state.longest_rally = length
+        state.rally_count = 0
+
+    def _award(self, player: int) -> None:
+        state = self.state
+        if state.rally_count:
+            self._record_rally(state.rally_count)
+        if player == 1:
+            state.player1 += 1
+        else:
+            state.player2 += 1
+        if state.streak_player == player:
+            state.streak += 1
+        else:
+            state.streak_player = player
+            state.streak = 1
+        state.last_point_by = player
+
+        won, lost = (state.player1, state.player2) if player == 1 else (state.player2, state.player1)
+        if won >= self.points_to_win and won - lost >= 2:
+            self._win_set(player)
+        else:
+            state.server = self._server_for(state.player1 + state.player2)
+
+    def _win_set(self, player: int) -> None:
+        state = self.state
+        if player == 1:
+            state.player1_sets += 1
+            sets = state.player1_sets
+        else:
+            state.player2_sets += 1
+            sets = state.player2_sets
+        if sets >= self.sets_to_win:
+            state.winner = player
+            state.active = False
+            state.game_over = True
+            return
+        state.current_set += 1
+        state.player1 = 0
+        state.player2 = 0
+        state.first_server = 3 - state.first_server
+        state.server = state.first_server
+
+    def _server_for(self, points_played: int) -> int:
+        deuce_at = 2 * (self.points_to_win - 1)
+        if points_played < deuce_at:
+            turns = points_played // self.serve_interval
+        else:
+            turns = deuce_at // self.serve_interval + (points_played - deuce_at)
+        first = self.state.first_server
+        return first if turns % 2 == 0 else 3 - first
+
+    def settings_dict(self) -> Dict[str, Any]:
+        return {
+            "pointsToWin": self.points_to_win,
+            "serveInterval": self.serve_interval,
+            "bestOfSets": self.best_of_sets,
+        }
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "player1": state.player1,
+            "player2": state.player2,
+            "player1Sets": state.player1_sets,
+            "player2Sets": state.player2_sets,
+            "currentSet": state.current_set,
+            "server": state.server,
+            "rallyCount": state.rally_count,
+            "lastRallyCount": state.last_rally_count,
+            "longestRally": state.longest_rally,
+            "streak": state.streak,
+            "streakPlayer": state.streak_player,
+            "lastPointBy": state.last_point_by,
+            "winner": state.winner,
+            "active": state.active,
+            "game_over": state.game_over,
+        }
@@ -0,0 +1,72 @@
+"""Rally challenge: two players cooperate to reach a target rally length."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .base import DEFAULT_UNDO_LIMIT, Mode
+
+
+class RallySettings(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    target_rally_count: int = Field(default=100, ge=1)
+
+
+@dataclass(slots=True)
+class RallyModeState:
+    rally_count: int = 0
+    longest_rally: int = 0
+    last_rally_count: int = 0
+    rallies: int = 0
+    last_missed_by: Optional[int] = None
+    active: bool = True
+    game_over: bool = False
+
+
+class RallyMode(Mode[RallyModeState]):
+    """Counts hits per rally; the session ends once a rally hits the target.
+
+    Players alternate hits starting with player 1, so a miss is charged to
+    whoever was due to play the next ball.
+    """
+
+    name = "rally"
+
+    def __init__(self, target_rally_count: int = 100, undo_limit: int = DEFAULT_UNDO_LIMIT) -> None:
+        super().__init__(RallyModeState(), undo_limit)
+        self.target_rally_count = target_rally_count
+
+    def on_hit(self) -> None:
+        state = self.state
+        state.rally_count += 1
+        if state.rally_count > state.longest_rally:
+            state.longest_rally = state.rally_count
+        if state.rally_count >= self.target_rally_count:
+            state.active = False
+            state.game_over = True
+
+    def on_miss(self) -> None:
+        state = self.state
+        state.last_missed_by = state.rally_count % 2 + 1
+        state.last_rally_count = state.rally_count
+        state.rallies += 1
+        state.rally_count = 0
+
+    def settings_dict(self) -> Dict[str, Any]:
+        return {"targetRallyCount": self.target_rally_count}
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "rallyCount": state.rally_count,
+            "longestRally": state.longest_rally,
+            "lastRallyCount": state.last_rally_count,
+            "rallies": state.rallies,
+            "lastMissedBy": state.last_missed_by,
+            "active": state.active,
+            "game_over": state.game_over,
+        }
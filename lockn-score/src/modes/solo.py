@@ -0,0 +1,70 @@
+"""Solo practice: keep the ball going as long as possible."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .base import DEFAULT_UNDO_LIMIT, Mode
+
+
+class SoloSettings(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    target_rally_count: int = Field(default=100, ge=1)
+
+
+@dataclass(slots=True)
+class SoloState:
+    streak: int = 0
+    best_streak: int = 0
+    hits: int = 0
+    misses: int = 0
+    active: bool = True
+    game_over: bool = False
+    target_reached: bool = False
+
+
+class SoloMode(Mode[SoloState]):
+    """Counts consecutive hits; a miss or reaching the target ends it."""
+
+    name = "solo"
+
+    def __init__(self, target_rally_count: int = 100, undo_limit: int = DEFAULT_UNDO_LIMIT) -> None:
+        super().__init__(SoloState(), undo_limit)
+        self.target_rally_count = target_rally_count
+
+    def on_hit(self) -> None:
+        state = self.state
+        state.hits += 1
+        state.streak += 1
+        if state.streak > state.best_streak:
+            state.best_streak = state.streak
+        if state.streak >= self.target_rally_count:
+            state.target_reached = True
+            self._finish()
+
+    def on_miss(self) -> None:
+        self.state.misses += 1
+        self._finish()
+
+    def _finish(self) -> None:
+        self.state.active = False
+        self.state.game_over = True
+
+    def settings_dict(self) -> Dict[str, Any]:
+        return {"targetRallyCount": self.target_rally_count}
+
+    def state_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "streak": state.streak,
+            "bestStreak": state.best_streak,
+            "hits": state.hits,
+            "misses": state.misses,
+            "targetReached": state.target_reached,
+            "active": state.active,
+            "game_over": state.game_over,
+        }
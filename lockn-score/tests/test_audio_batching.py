@@ -0,0 +1,81 @@
+"""Tests for cross-stream batched inference."""
+
+from __future__ import annotations
+
+import threading
+from typing import List
+
+import numpy as np
+import pytest
+
+from audio.batching import BatchInferenceServer
+
+
+class RowSumModel:
+    """Stand-in for a PANNs model: each window's scores are its row sum."""
+
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+        self.fail = False
+
+    def inference(self, windows: np.ndarray):
+        self.batch_sizes.append(len(windows))
+        if self.fail:
+            raise ValueError("model error")
+        # Same order as AudioTagging.inference: (clipwise_output, embedding).
+        return windows.sum(axis=1, keepdims=True), np.zeros((len(windows), 4))
+
+
+class TestBatchInferenceServer:
+    """Test batching, fan-out and failure handling."""
+
+    def test_concurrent_streams_share_batches(self) -> None:
+        """Test that windows from concurrent streams run together and return their own rows."""
+        model = RowSumModel()
+        server = BatchInferenceServer(model, max_batch=4, max_wait_seconds=0.5)
+        results = {}
+        barrier = threading.Barrier(4)
+
+        def stream(i: int) -> None:
+            barrier.wait()
+            results[i] = float(server.infer(np.full(8, i, dtype=np.float32))[0])
+
+        threads = [threading.Thread(target=stream, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.close()
+
+        assert results == {i: 8.0 * i for i in range(4)}
+        assert model.batch_sizes == [4]
+        assert server.mean_batch == 4.0
+
+    def test_lone_stream_waits_at_most_deadline(self) -> None:
+        """Test that a window without partners runs as a batch of one."""
+        model = RowSumModel()
+        server = BatchInferenceServer(model, max_batch=8, max_wait_seconds=0.001)
+        assert float(server.infer(np.ones(8, dtype=np.float32))[0]) == 8.0
+        server.close()
+        assert model.batch_sizes == [1]
+
+    def test_model_errors_reach_callers(self) -> None:
+        """Test that a failed batch raises in every caller and the server keeps running."""
+        model = RowSumModel()
+        server = BatchInferenceServer(model, max_wait_seconds=0.001)
+        model.fail = True
+        with pytest.raises(ValueError):
+            server.infer(np.ones(8, dtype=np.float32))
+        model.fail = False
+        assert float(server.infer(np.ones(8, dtype=np.float32))[0]) == 8.0
+        server.close()
+
+    def test_close_fails_pending(self) -> None:
+        """Test that windows queued behind close are failed rather than left hanging."""
+        server = BatchInferenceServer(RowSumModel())
+        server.start()
+        server._requests.put(None)
+        future = server.submit(np.ones(8, dtype=np.float32))
+        server._thread.join()
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
@@ -0,0 +1,116 @@
+"""Tests for the incremental log-mel front end."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from audio.config import DEFAULT_CONFIG
+from audio.features import LogMelStream, mel_filterbank, strip_front_end
+from audio.ring import SampleRing
+
+
+def reference_log_mel(window: np.ndarray) -> np.ndarray:
+    """Full centred STFT + log-mel of one window, computed in float64."""
+    cfg = DEFAULT_CONFIG
+    n_fft, hop = cfg.mel_n_fft, cfg.mel_hop
+    padded = np.pad(window.astype(np.float64), n_fft // 2, mode="reflect")
+    hann = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+    frames = np.stack([padded[i : i + n_fft] * hann for i in range(0, len(padded) - n_fft + 1, hop)])
+    power = np.abs(np.fft.rfft(frames, axis=-1)) ** 2
+    basis = mel_filterbank(cfg.sample_rate, n_fft, cfg.mel_bins, cfg.mel_fmin, cfg.mel_fmax).astype(np.float64)
+    return 10.0 * np.log10(np.maximum(power @ basis.T, 1e-10))
+
+
+def stream_windows(hop: int, hops: int, seed: int = 0):
+    cfg = DEFAULT_CONFIG
+    window = int(cfg.sample_rate * cfg.window_seconds)
+    audio = np.random.default_rng(seed).standard_normal(window + hop * hops).astype(np.float32)
+    ring = SampleRing(window + hop)
+    written = 0
+    while True:
+        written += ring.write(audio[written:])
+        if ring.size < window:
+            return
+        yield ring.view(window)
+        ring.consume(hop)
+
+
+class TestLogMelStream:
+    """Test that incremental frames match a full recompute."""
+
+    @pytest.mark.parametrize("hop", [1600, 1000])
+    def test_matches_full_recompute(self, hop: int) -> None:
+        """Test each window's matrix against the reference, with and without frame reuse."""
+        stream = LogMelStream(DEFAULT_CONFIG, hop_samples=hop)
+        count = 0
+        for window in stream_windows(hop, 12):
+            mel = stream.update(window)
+            assert mel.shape == (1, 101, DEFAULT_CONFIG.mel_bins)
+            np.testing.assert_allclose(mel[0], reference_log_mel(window), atol=2e-3)
+            count += 1
+        assert count == 13
+
+    def test_reuses_interior_frames(self) -> None:
+        """Test that a 50 ms hop transforms only new and edge frames."""
+        stream = LogMelStream(DEFAULT_CONFIG)
+        windows = stream_windows(1600, 3)
+        stream.update(next(windows))
+        assert stream.frames_computed == 101
+        stream.update(next(windows))
+        assert stream.frames_computed == 101 + 5 + 4
+
+    def test_reset_recomputes(self) -> None:
+        """Test that a reset stream does not reuse frames of the old window."""
+        stream = LogMelStream(DEFAULT_CONFIG)
+        first, second = stream_windows(1600, 1, seed=1)
+        stream.update(first)
+        stream.reset()
+        other = np.random.default_rng(2).standard_normal(len(second)).astype(np.float32)
+        np.testing.assert_allclose(stream.update(other)[0], reference_log_mel(other), atol=2e-3)
+
+
+class TestFilterbank:
+    """Test the mel filterbank against librosa."""
+
+    def test_matches_librosa(self) -> None:
+        """Test equality with librosa.filters.mel, which PANNs uses."""
+        librosa = pytest.importorskip("librosa")
+        cfg = DEFAULT_CONFIG
+        expected = librosa.filters.mel(
+            sr=cfg.sample_rate, n_fft=cfg.mel_n_fft, n_mels=cfg.mel_bins, fmin=cfg.mel_fmin, fmax=cfg.mel_fmax
+        )
+        np.testing.assert_allclose(
+            mel_filterbank(cfg.sample_rate, cfg.mel_n_fft, cfg.mel_bins, cfg.mel_fmin, cfg.mel_fmax),
+            expected,
+            rtol=1e-5,
+            atol=1e-8,
+        )
+
+
+class TestStripFrontEnd:
+    """Test swapping a model's front end for identities."""
+
+    def test_strips_logmel_models_only(self) -> None:
+        """Test that Cnn-style models are stripped and Wavegram-style ones kept."""
+        torch = pytest.importorskip("torch")
+
+        class Cnn(torch.nn.Module):
+            def __init__(self) -> None:
+                super().__init__()
+                self.spectrogram_extractor = torch.nn.Linear(1, 1)
+                self.logmel_extractor = torch.nn.Linear(1, 1)
+
+        class Wavegram(Cnn):
+            def __init__(self) -> None:
+                super().__init__()
+                self.pre_conv0 = torch.nn.Linear(1, 1)
+
+        class Tagger:
+            def __init__(self, model) -> None:
+                self.model = model
+
+        cnn = Tagger(Cnn())
+        assert strip_front_end(cnn) and strip_front_end(cnn)
+        assert isinstance(cnn.model.logmel_extractor, torch.nn.Identity)
+        assert not strip_front_end(Tagger(Wavegram()))
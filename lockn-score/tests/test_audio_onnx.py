@@ -0,0 +1,129 @@
+"""Tests for backend selection and the ONNX Runtime backend."""
+
+from __future__ import annotations
+
+import copy
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from audio.config import DEFAULT_CONFIG
+from audio import detector
+from audio.detector import BounceDetector, load_model
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class TestBackendSelection:
+    """Test choosing the inference runtime from AudioConfig."""
+
+    def test_onnx_requires_path(self) -> None:
+        """Test that the onnx backend without a model path is rejected."""
+        with pytest.raises(ValueError):
+            load_model(replace(DEFAULT_CONFIG, backend="onnx"))
+
+    def test_unknown_backend(self) -> None:
+        """Test that a misspelt backend is rejected rather than falling back."""
+        with pytest.raises(ValueError):
+            load_model(replace(DEFAULT_CONFIG, backend="tensorrt"))
+
+    def test_import_does_not_load_torch(self) -> None:
+        """Test that importing the detector and ONNX backend leaves torch unimported."""
+        code = "import sys, audio.detector, audio.onnx_backend; print('torch' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
+
+
+@pytest.fixture(scope="module")
+def cnn6():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    models = pytest.importorskip("panns_inference.models")
+    cfg = DEFAULT_CONFIG
+    torch.manual_seed(0)
+    model = models.Cnn6(
+        sample_rate=cfg.sample_rate,
+        window_size=cfg.mel_n_fft,
+        hop_size=cfg.mel_hop,
+        mel_bins=cfg.mel_bins,
+        fmin=cfg.mel_fmin,
+        fmax=cfg.mel_fmax,
+        classes_num=8,
+    )
+    return model.eval()
+
+
+@pytest.fixture(scope="module")
+def windows() -> np.ndarray:
+    window = int(DEFAULT_CONFIG.sample_rate * DEFAULT_CONFIG.window_seconds)
+    return 0.1 * np.random.default_rng(0).standard_normal((3, window)).astype(np.float32)
+
+
+class TestOnnxParity:
+    """Test the exported model against the torch model it came from."""
+
+    def torch_scores(self, model, windows: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.no_grad():
+            return model(torch.from_numpy(windows))["clipwise_output"].numpy()
+
+    @pytest.mark.parametrize("quantize, atol", [(False, 1e-4), (True, 5e-2)])
+    def test_waveform_export(self, cnn6, windows, tmp_path, quantize: bool, atol: float) -> None:
+        """Test clipwise scores of a waveform-input export against torch."""
+        from audio.onnx_backend import OnnxTagging, export
+
+        path = export(copy.deepcopy(cnn6), list("abcdefgh"), str(tmp_path / "m.onnx"), logmel=False, quantize=quantize)
+        tagger = OnnxTagging(path)
+        clipwise, embedding = tagger.inference(windows)
+        assert tagger.labels == list("abcdefgh") and not tagger.takes_logmel
+        assert embedding.shape[0] == 3
+        np.testing.assert_allclose(clipwise, self.torch_scores(cnn6, windows), atol=atol)
+
+    def test_logmel_export_with_stream_features(self, cnn6, windows, tmp_path) -> None:
+        """Test that LogMelStream + a log-mel export reproduce the full torch model."""
+        from audio.features import LogMelStream
+        from audio.onnx_backend import OnnxTagging, export
+
+        path = export(copy.deepcopy(cnn6), list("abcdefgh"), str(tmp_path / "m.onnx"), quantize=False)
+        tagger = OnnxTagging(path)
+        assert tagger.takes_logmel
+        mels = np.stack([LogMelStream(DEFAULT_CONFIG).update(w).copy() for w in windows])
+        clipwise, _ = tagger.inference(mels)
+        np.testing.assert_allclose(clipwise, self.torch_scores(cnn6, windows), atol=1e-3)
+
+
+class FakeTagging:
+    """Stand-in with OnnxTagging's interface: bounce score 0.9 while a click is in the window."""
+
+    labels = ["Speech", "Basketball bounce", "Music"]
+    takes_logmel = False
+
+    def inference(self, audio: np.ndarray):
+        clipwise = np.zeros((len(audio), 3), dtype=np.float32)
+        clipwise[:, 1] = np.where(np.abs(audio).max(axis=1) > 0.5, 0.9, 0.01)
+        # An embedding that never looks like a bounce, so scoring it finds nothing.
+        return clipwise, np.zeros((len(audio), 512), dtype=np.float32)
+
+
+class TestDetectorBackend:
+    """Test BounceDetector end to end on an ONNX-style model."""
+
+    def test_detects_bounce_class(self, monkeypatch) -> None:
+        """Test that the detector scores clipwise output, not the embedding."""
+        monkeypatch.setattr(detector, "load_model", lambda config, device=None: FakeTagging())
+        cfg = replace(DEFAULT_CONFIG, backend="onnx", onnx_path="fake.onnx", onset_gate=False)
+        bounce = BounceDetector(cfg)
+        rate = cfg.sample_rate
+        audio = np.zeros(3 * rate, dtype=np.float32)
+        audio[2 * rate : 2 * rate + 100] = 0.9
+        block = int(cfg.block_seconds * rate)
+        events = [e for i in range(0, len(audio), block) for e in bounce.process_chunk(audio[i : i + block])]
+        assert events
+        assert 1.0 < events[0].timestamp <= 2.0
+        assert events[0].score == pytest.approx(0.9)
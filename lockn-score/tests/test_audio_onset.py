@@ -0,0 +1,64 @@
+"""Tests for the onset-energy pre-gate."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import List
+
+import numpy as np
+
+from audio.config import DEFAULT_CONFIG
+from audio.onset import OnsetGate
+
+HOP = int(DEFAULT_CONFIG.sample_rate * DEFAULT_CONFIG.hop_seconds)
+
+
+def room_noise(seconds: float, clicks: List[float], seed: int = 0) -> np.ndarray:
+    """Low-level noise with a short decaying burst at each click time."""
+    rate = DEFAULT_CONFIG.sample_rate
+    rng = np.random.default_rng(seed)
+    audio = 0.002 * rng.standard_normal(int(seconds * rate))
+    burst = 0.3 * rng.standard_normal(160) * np.exp(-np.arange(160) / 40)
+    for t in clicks:
+        start = int(t * rate)
+        audio[start : start + 160] += burst
+    return audio.astype(np.float32)
+
+
+def admitted_hops(gate: OnsetGate, audio: np.ndarray) -> List[int]:
+    return [i for i in range(len(audio) // HOP) if gate.admit(audio[i * HOP : (i + 1) * HOP])]
+
+
+class TestOnsetGate:
+    """Test which hops the gate lets through to the model."""
+
+    def test_quiet_audio_is_gated(self) -> None:
+        """Test that steady noise never opens the gate."""
+        gate = OnsetGate()
+        assert admitted_hops(gate, room_noise(5.0, [])) == []
+        assert gate.gated == 100
+        assert gate.gated_fraction == 1.0
+
+    def test_click_holds_gate_for_a_window(self) -> None:
+        """Test that a transient admits every window that contains it."""
+        gate = OnsetGate()
+        hops = admitted_hops(gate, room_noise(5.0, [2.01]))
+        assert hops == list(range(40, 40 + gate.hold_hops))
+        assert gate.admitted == 20
+
+    def test_background_follows_level(self) -> None:
+        """Test that a louder room raises the background instead of triggering forever."""
+        gate = OnsetGate()
+        quiet, loud = room_noise(3.0, []), 10 * room_noise(6.0, [], seed=1)
+        admitted_hops(gate, quiet)
+        hops = admitted_hops(gate, loud)
+        assert hops and hops[-1] < 40
+
+    def test_sensitivity(self) -> None:
+        """Test that a faint tap passes only at a lower onset ratio."""
+        audio = room_noise(3.0, [1.01])
+        audio[int(1.01 * DEFAULT_CONFIG.sample_rate) :][:160] *= 0.03
+        strict = OnsetGate()
+        sensitive = OnsetGate(replace(DEFAULT_CONFIG, onset_ratio=2.0))
+        assert admitted_hops(strict, audio) == []
+        assert admitted_hops(sensitive, audio)[0] == 20
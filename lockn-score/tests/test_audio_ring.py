@@ -0,0 +1,50 @@
+"""Tests for the mirrored audio sample ring."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from audio.ring import SampleRing
+
+
+class TestSampleRing:
+    """Test writes, wrap-around and window views."""
+
+    def test_windows_match_stream_across_wrap(self) -> None:
+        """Test that every hop's window equals the same slice of the stream."""
+        window, hop = 10, 3
+        ring = SampleRing(window + hop)
+        stream = np.arange(200, dtype=np.float32)
+        seen = 0
+        for start in range(0, len(stream), 7):
+            chunk = stream[start : start + 7]
+            written = 0
+            while True:
+                written += ring.write(chunk[written:])
+                if ring.size < window:
+                    break
+                assert np.array_equal(ring.view(window), stream[seen : seen + window])
+                ring.consume(hop)
+                seen += hop
+            assert written == len(chunk)
+        assert seen > 150
+
+    def test_write_stops_when_full(self) -> None:
+        """Test that a write never overruns pending samples."""
+        ring = SampleRing(4)
+        assert ring.write(np.ones(6, dtype=np.float32)) == 4
+        assert ring.write(np.ones(1, dtype=np.float32)) == 0
+        ring.consume(2)
+        assert ring.free == 2
+
+    def test_view_is_zero_copy_and_read_only(self) -> None:
+        """Test that windows share the ring's memory and cannot be written."""
+        ring = SampleRing(8)
+        ring.write(np.arange(6, dtype=np.float32))
+        window = ring.view(4)
+        assert np.shares_memory(window, ring._data)
+        with pytest.raises(ValueError):
+            window[0] = 1.0
+        with pytest.raises(ValueError):
+            ring.view(7)
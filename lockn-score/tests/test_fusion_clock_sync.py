@@ -0,0 +1,108 @@
+"""Tests for clock alignment between sensor sources."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api
+from src.fusion.clock_sync import SOURCE_AUDIO, ClockAligner, LinearClockFit
+
+
+def _feed(fit: LinearClockFit, rng: random.Random, start: float, count: int,
+          offset: float, rate: float, jitter: float = 0.0005) -> None:
+    for i in range(count):
+        source = start + i * 0.1
+        fit.observe(source, offset + rate * source + rng.uniform(0.0, jitter))
+
+
+class TestLinearClockFit:
+    """Test the online drift/offset fit."""
+
+    def test_passthrough_until_observed(self) -> None:
+        """Test that an empty fit maps timestamps unchanged."""
+        fit = LinearClockFit()
+        assert not fit.ready
+        assert fit.to_reference(12.5) == 12.5
+
+    def test_recovers_offset_and_drift(self) -> None:
+        """Test that a jittered 80 ppm clock is aligned within a millisecond."""
+        rng = random.Random(0)
+        fit = LinearClockFit()
+        offset, rate = 1_700_000_000.0, 1 + 80e-6
+        _feed(fit, rng, 0.0, 600, offset, rate)
+        assert fit.drift_ppm == pytest.approx(80, abs=5)
+        for source in (0.0, 30.0, 60.0, 90.0):
+            assert fit.to_reference(source) == pytest.approx(offset + rate * source, abs=0.001)
+        assert fit.to_source(fit.to_reference(42.0)) == pytest.approx(42.0)
+
+    def test_follows_drift_change(self) -> None:
+        """Test that old observations are forgotten after the half-life."""
+        rng = random.Random(1)
+        fit = LinearClockFit(half_life_s=10.0, gate_s=0.05)
+        _feed(fit, rng, 0.0, 600, 100.0, 1 + 50e-6)
+        base = 100.0 + (1 + 50e-6) * 60.0
+        for i in range(1200):
+            source = 60.0 + i * 0.1
+            fit.observe(source, base + (1 - 50e-6) * (source - 60.0) + rng.uniform(0.0, 0.0005))
+        assert fit.drift_ppm == pytest.approx(-50, abs=10)
+
+    def test_rejects_late_pairs(self) -> None:
+        """Test that a pair far off the line is rejected and ignored."""
+        rng = random.Random(2)
+        fit = LinearClockFit()
+        _feed(fit, rng, 0.0, 50, 10.0, 1.0)
+        before = fit.to_reference(5.0)
+        assert not fit.observe(5.1, 10.0 + 5.1 + 0.25)
+        assert fit.rejected == 1
+        assert fit.to_reference(5.0) == before
+
+
+class TestClockAligner:
+    """Test per-source alignment and the Score API endpoint."""
+
+    def test_unknown_source_passes_through(self) -> None:
+        """Test that sources without pairs are assumed to be on the reference."""
+        aligner = ClockAligner(reference_clock=lambda: 100.0)
+        aligner.observe(SOURCE_AUDIO, 0.0)
+        assert aligner.align(SOURCE_AUDIO, 0.5) == pytest.approx(100.5)
+        assert aligner.align("vision", 0.5) == 0.5
+
+    def test_api_aligns_audio_before_engine(self) -> None:
+        """Test that posted sync pairs map audio timestamps onto server time."""
+        score_api.registry.clear()
+        client = TestClient(score_api.app)
+        for i in range(20):
+            response = client.post(
+                "/score/c-1/clock",
+                json={"source": "audio", "source_timestamp": i * 0.5, "reference_timestamp": 1000.0 + i * 0.5},
+            )
+            assert response.json()["accepted"]
+        assert response.json()["samples"] == 20
+
+        client.post("/score/c-1/vision", json={"timestamp": 1003.0, "x": 0.5, "y": 0.5, "confidence": 0.9})
+        state = client.post("/score/c-1/audio", json={"timestamp": 3.01, "confidence": 0.9}).json()
+        assert state["last_bounce_ts"] == pytest.approx(1003.01)
+
+        client.delete("/score/c-1")
+        assert "c-1" not in score_api.registry
+        score_api.registry.clear()
+
+    def test_clock_only_sessions_are_bounded(self, monkeypatch) -> None:
+        """Test that ids that only post clock pairs are sessions, evicted like any other."""
+        score_api.registry.clear()
+        monkeypatch.setattr(score_api.registry, "max_sessions", 2)
+        client = TestClient(score_api.app)
+        for i in range(5):
+            client.post(f"/score/clk-{i}/clock", json={"source": "audio", "source_timestamp": 0.0})
+        assert score_api.registry.session_ids() == ["clk-3", "clk-4"]
+        assert score_api.registry.peek("clk-4").clock is not None
+        score_api.registry.clear()
+
+    def test_rejects_unknown_source(self) -> None:
+        """Test that only vision and audio clocks can be synchronised."""
+        client = TestClient(score_api.app)
+        response = client.post("/score/c-2/clock", json={"source": "radar", "source_timestamp": 0.0})
+        assert response.status_code == 422
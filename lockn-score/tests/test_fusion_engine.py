@@ -0,0 +1,37 @@
+"""Tests for FusionEngine / RallyTracker status caching."""
+
+from __future__ import annotations
+
+from src.fusion.engine import FusionEngine
+from src.fusion.rally_tracker import RallyState
+
+
+class TestStatusCache:
+    """Test that outputs are only rebuilt when the status changes."""
+
+    def test_unchanged_status_is_reused(self) -> None:
+        """Test that no-op events return the same objects."""
+        engine = FusionEngine()
+        first = engine.process_vision(0.0, 0.5, 0.5, 0.1)  # below threshold
+        second = engine.process_vision(0.1, 0.5, 0.5, 0.1)
+        assert second is first
+        assert engine.tick(0.2).status is first.status
+
+    def test_changed_status_is_rebuilt(self) -> None:
+        """Test that a state change yields a fresh status."""
+        engine = FusionEngine()
+        idle = engine.tracker.get_status()
+        output = engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        assert output.status is not idle
+        assert idle.state == RallyState.IDLE
+        assert output.status.state == RallyState.IN_PLAY
+        assert output.status.last_ball_ts == 0.0
+
+    def test_reset_invalidates_status(self) -> None:
+        """Test that reset does not leave a stale cached status."""
+        engine = FusionEngine()
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        engine.reset()
+        status = engine.tracker.get_status()
+        assert status.state == RallyState.IDLE
+        assert status.last_ball_ts is None
@@ -0,0 +1,124 @@
+"""Tests for precomputed table-region geometry."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.geometry import (
+    BBoxRegion,
+    ConvexPolygonRegion,
+    HomographyRegion,
+    PolygonRegion,
+    TableRegion,
+    build_region,
+)
+from src.fusion.rally_tracker import RallyState
+
+# Trapezoid: the far edge of the table appears narrower to an angled camera.
+TRAPEZOID = ((0.3, 0.2), (0.7, 0.2), (0.9, 0.8), (0.1, 0.8))
+# L-shaped (concave) region.
+L_SHAPE = ((0.1, 0.1), (0.9, 0.1), (0.9, 0.4), (0.4, 0.4), (0.4, 0.9), (0.1, 0.9))
+
+
+def _homography_from_quad(quad):
+    """Solve the homography mapping `quad` onto the unit square."""
+    target = ((0, 0), (1, 0), (1, 1), (0, 1))
+    rows, rhs = [], []
+    for (x, y), (u, v) in zip(quad, target):
+        rows.append([x, y, 1, 0, 0, 0, -u * x, -u * y])
+        rows.append([0, 0, 0, x, y, 1, -v * x, -v * y])
+        rhs += [u, v]
+    h = np.linalg.solve(np.array(rows, float), np.array(rhs, float))
+    return tuple(h) + (1.0,)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(7)
+    return rng.uniform(0, 1, 5000), rng.uniform(0, 1, 5000)
+
+
+class TestRegions:
+    """Test scalar and batch point-in-region tests."""
+
+    def test_bbox_is_default(self) -> None:
+        """Test that the default config keeps the bbox behaviour."""
+        region = build_region(FusionConfig())
+        assert isinstance(region, BBoxRegion)
+        assert region.contains(0.1, 0.2) and region.contains(0.9, 0.8)
+        assert not region.contains(0.05, 0.5)
+
+    def test_convex_polygon(self) -> None:
+        """Test a trapezoid table region."""
+        region = build_region(FusionConfig(table_polygon=TRAPEZOID))
+        assert isinstance(region, ConvexPolygonRegion)
+        assert region.contains(0.5, 0.5)
+        assert region.contains(0.15, 0.75)
+        assert not region.contains(0.15, 0.25)  # inside the bbox, outside the table
+
+    def test_winding_order_does_not_matter(self, points) -> None:
+        """Test that clockwise and counter-clockwise vertices agree."""
+        ccw = ConvexPolygonRegion(TRAPEZOID)
+        cw = ConvexPolygonRegion(TRAPEZOID[::-1])
+        assert np.array_equal(ccw.contains_many(*points), cw.contains_many(*points))
+
+    def test_concave_polygon(self) -> None:
+        """Test the crossing-rule fallback for concave regions."""
+        region = build_region(FusionConfig(table_polygon=L_SHAPE))
+        assert isinstance(region, PolygonRegion)
+        assert region.contains(0.2, 0.8)
+        assert region.contains(0.8, 0.2)
+        assert not region.contains(0.7, 0.7)
+
+    def test_homography_matches_projected_quad(self, points) -> None:
+        """Test that a homography region equals the polygon it maps from."""
+        region = HomographyRegion(_homography_from_quad(TRAPEZOID))
+        u, v = region.to_table(0.3, 0.2)
+        assert u == pytest.approx(0.0, abs=1e-9) and v == pytest.approx(0.0, abs=1e-9)
+        expected = ConvexPolygonRegion(TRAPEZOID).contains_many(*points)
+        assert np.array_equal(region.contains_many(*points), expected)
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            FusionConfig(),
+            FusionConfig(table_polygon=TRAPEZOID),
+            FusionConfig(table_polygon=L_SHAPE),
+            FusionConfig(table_homography=_homography_from_quad(TRAPEZOID)),
+        ],
+    )
+    def test_batch_matches_scalar(self, config, points) -> None:
+        """Test that contains_many agrees with contains point by point."""
+        region = build_region(config)
+        scalar = [region.contains(x, y) for x, y in zip(*points)]
+        assert region.contains_many(*points).tolist() == scalar
+
+    def test_rejects_degenerate_polygons(self) -> None:
+        """Test polygon validation."""
+        with pytest.raises(ValueError):
+            build_region(FusionConfig(table_polygon=((0.1, 0.1), (0.2, 0.2))))
+        with pytest.raises(ValueError):
+            build_region(FusionConfig(table_polygon=((0, 0), (0.5, 0.5), (1, 1))))
+
+    def test_region_requires_batch_test(self) -> None:
+        """Test that a region without contains_many cannot be created."""
+
+        class PointOnly(TableRegion):
+            __slots__ = ()
+
+            def contains(self, x: float, y: float) -> bool:
+                return True
+
+        with pytest.raises(TypeError, match="contains_many"):
+            PointOnly()
+
+
+def test_tracker_uses_configured_region() -> None:
+    """Test that the tracker ends a rally when the ball leaves the polygon."""
+    engine = FusionEngine(FusionConfig(table_polygon=TRAPEZOID))
+    assert engine.process_vision(0.0, 0.5, 0.5, 0.9).status.state == RallyState.IN_PLAY
+    status = engine.process_vision(0.1, 0.15, 0.25, 0.9).status
+    assert status.state == RallyState.ENDED
@@ -0,0 +1,190 @@
+"""Tests for the per-session event/state-change history."""
+
+from __future__ import annotations
+
+import pickle
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import journal, score_api, wire
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.history import (
+    CHANGE_LAYOUT,
+    CHANGE_RECORD,
+    EVENT_LAYOUT,
+    EVENT_RECORD,
+    KIND_AUDIO,
+    KIND_VISION,
+    STATES,
+    EventHistory,
+    RingBuffer,
+)
+from src.fusion.rally_tracker import RallyState
+
+
+class TestRingBuffer:
+    """Test the fixed-size record buffer."""
+
+    def test_wraps_in_order(self) -> None:
+        """Test that old records are overwritten and reads stay chronological."""
+        ring = RingBuffer(CHANGE_LAYOUT, CHANGE_RECORD, 4)
+        for i in range(10):
+            ring.append(float(i), 0, 1, i)
+        assert len(ring) == 4 and ring.total == 10
+        assert ring.ordered()["timestamp"].tolist() == [6.0, 7.0, 8.0, 9.0]
+
+    def test_extend_wraps_and_truncates(self) -> None:
+        """Test that bulk appends split across the end and keep the newest."""
+        ring = RingBuffer(CHANGE_LAYOUT, CHANGE_RECORD, 4)
+        ring.append(0.0, 0, 0, 0)
+        ring.append(1.0, 0, 0, 0)
+        ring.append(2.0, 0, 0, 0)
+        records = np.zeros(3, dtype=CHANGE_RECORD)
+        records["timestamp"] = [3.0, 4.0, 5.0]
+        ring.extend(records)
+        assert ring.ordered()["timestamp"].tolist() == [2.0, 3.0, 4.0, 5.0]
+        many = np.zeros(9, dtype=CHANGE_RECORD)
+        many["timestamp"] = np.arange(10.0, 19.0)
+        ring.extend(many)
+        assert ring.ordered()["timestamp"].tolist() == [15.0, 16.0, 17.0, 18.0]
+
+    def test_memory_is_fixed(self) -> None:
+        """Test that the backing buffer never grows."""
+        history = EventHistory(events=16, changes=4)
+        size = len(history.events.data)
+        for i in range(1000):
+            history.record_vision(i * 0.01, 0.5, 0.5, 0.9)
+        assert len(history.events.data) == size and len(history.events) == 16
+
+    def test_event_layout_matches_wire_frames(self) -> None:
+        """Test that exported events decode as WebSocket frames."""
+        assert EVENT_LAYOUT.format == wire.FRAME.format
+        assert EVENT_RECORD.itemsize == wire.FRAME.size
+        history = EventHistory(events=4)
+        history.record_vision(1.0, 0.25, 0.5, 0.75)
+        history.record_audio(1.5, 0.5)
+        events, _ = history.query()
+        assert list(wire.iter_frames(events.tobytes())) == [
+            (KIND_VISION, 1.0, 0.25, 0.5, 0.75),
+            (KIND_AUDIO, 1.5, 0.0, 0.0, 0.5),
+        ]
+
+    def test_pickle_keeps_view(self) -> None:
+        """Test that an unpickled history keeps recording into its own buffer."""
+        history = EventHistory(events=4)
+        history.record_tick(1.0)
+        restored = pickle.loads(pickle.dumps(history))
+        restored.record_tick(2.0)
+        assert restored.query()[0]["timestamp"].tolist() == [1.0, 2.0]
+        assert history.latest == 1.0
+
+
+class TestEngineHistory:
+    """Test what the engine records."""
+
+    def test_records_events_and_changes(self) -> None:
+        """Test that events, state changes and bounces land in the history."""
+        engine = FusionEngine()
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        engine.process_vision(0.3, 0.5, 0.5, 0.9)
+        engine.process_audio_batch([(0.6, 0.9)])
+        engine.process_vision_batch([(0.65, 0.5, 0.5, 0.9), (0.7, 0.0, 0.0, 0.9)])
+        engine.tick(5.0)
+        events, changes = engine.history.query()
+        assert events["timestamp"].tolist() == [0.0, 0.3, 0.6, 0.65, 0.7, 5.0]
+        idle, in_play, ended = (STATES.index(s) for s in RallyState)
+        assert changes.tolist() == [
+            (0.0, idle, in_play, 0),
+            (0.3, in_play, in_play, 1),
+            (0.7, in_play, ended, 1),
+        ]
+
+    def test_both_timeouts_end_rally_once(self) -> None:
+        """Test that a tick past the vision and rally timeouts records a single ENDED change."""
+        engine = FusionEngine()
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        engine.process_vision(0.3, 0.5, 0.5, 0.9)
+        engine.tick(10.0)
+        _, changes = engine.history.query()
+        idle, in_play, ended = (STATES.index(s) for s in RallyState)
+        assert changes.tolist() == [
+            (0.0, idle, in_play, 0),
+            (0.3, in_play, in_play, 1),
+            (10.0, in_play, ended, 1),
+        ]
+
+    def test_time_range_and_last(self) -> None:
+        """Test range queries and the trailing window."""
+        engine = FusionEngine()
+        for i in range(10):
+            engine.process_vision(float(i), 0.5, 0.5, 0.1)
+        events, _ = engine.history.query(2.0, 4.0)
+        assert events["timestamp"].tolist() == [2.0, 3.0, 4.0]
+        events, _ = engine.history.last(2.0)
+        assert events["timestamp"].tolist() == [7.0, 8.0, 9.0]
+
+    def test_reset_recorded(self) -> None:
+        """Test that a reset shows up as a change back to IDLE."""
+        engine = FusionEngine()
+        engine.process_vision(1.0, 0.5, 0.5, 0.9)
+        engine.reset()
+        _, changes = engine.history.query()
+        assert changes[-1]["timestamp"] == 1.0 and changes[-1]["to_state"] == 0
+
+    def test_disabled(self) -> None:
+        """Test that history_events=0 turns history off."""
+        engine = FusionEngine(replace(FusionConfig(), history_events=0))
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        assert engine.history is None and engine.tracker.history is None
+
+    def test_export_replays_to_same_state(self) -> None:
+        """Test that exported frames rebuild the session's state."""
+        engine = FusionEngine()
+        for i in range(20):
+            engine.process_vision(i * 0.25, 0.5, 0.5, 0.9)
+            engine.process_audio(i * 0.25 + 0.01, 0.8)
+        copy = FusionEngine()
+        journal.apply_records(copy, engine.history.query()[0].tobytes())
+        assert copy.tracker.get_status() == engine.tracker.get_status()
+
+
+@pytest.fixture
+def score_client() -> TestClient:
+    score_api.registry.clear()
+    return TestClient(score_api.app)
+
+
+class TestHistoryApi:
+    """Test the history endpoints."""
+
+    def test_query_and_export(self, score_client) -> None:
+        """Test that a session's history is queryable and exportable."""
+        for ts in (0.0, 0.3, 0.6):
+            score_client.post("/score/t1/vision", json={"timestamp": ts, "x": 0.5, "y": 0.5, "confidence": 0.9})
+        data = score_client.get("/score/t1/history", params={"start": 0.2}).json()
+        assert [e["timestamp"] for e in data["events"]] == [0.3, 0.6]
+        assert data["events"][0]["type"] == "vision"
+        assert [(t["to_state"], t["rally_count"]) for t in data["transitions"]] == [
+            ("IN_PLAY", 1),
+            ("IN_PLAY", 2),
+        ]
+
+        response = score_client.get("/score/t1/history/export", params={"last_s": 0.3})
+        assert response.headers["content-type"] == wire.FRAMES_CONTENT_TYPE
+        assert [frame[1] for frame in wire.iter_frames(response.content)] == [0.3, 0.6]
+
+    def test_default_session(self, score_client) -> None:
+        """Test the unprefixed history route."""
+        score_client.post("/score/audio", json={"timestamp": 1.0, "confidence": 0.5})
+        events = score_client.get("/score/history").json()["events"]
+        assert events == [{"type": "audio", "timestamp": 1.0, "x": 0.0, "y": 0.0, "confidence": 0.5}]
+
+    def test_unknown_session_is_not_created(self, score_client) -> None:
+        """Test that reading an unknown session's history is a 404 and allocates nothing."""
+        assert score_client.get("/score/nope/history").status_code == 404
+        assert score_client.get("/score/nope/history/export").status_code == 404
+        assert score_api.registry.peek("nope") is None
@@ -0,0 +1,110 @@
+"""Tests for Kalman trajectory-based bounce detection."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.kalman import KalmanBounceDetector
+from src.fusion.replay import replay
+
+PERIOD = 0.5  # seconds between bounces
+BOUNCE_Y = 0.7  # image y of the table surface (y grows downward)
+
+
+def _trajectory(fps, duration=4.0, noise=0.003, drop=0.0, seed=0):
+    """Ball bouncing every PERIOD seconds while drifting across the table."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, duration, 1.0 / fps) + 0.013
+    phase = (t % PERIOD) / PERIOD
+    y = BOUNCE_Y - 1.2 * phase * (1 - phase)
+    x = 0.2 + 0.6 * np.abs((t / 2) % 2 - 1)
+    keep = rng.random(len(t)) >= drop
+    n = int(keep.sum())
+    return t[keep], x[keep] + rng.normal(0, noise, n), y[keep] + rng.normal(0, noise, n)
+
+
+def _expected(duration=4.0):
+    return np.arange(PERIOD, duration, PERIOD)
+
+
+@pytest.mark.parametrize("fps, drop", [(120, 0.0), (60, 0.0), (30, 0.0), (30, 0.3), (15, 0.0)])
+def test_detects_each_bounce(fps, drop) -> None:
+    """Test bounce count and timing across frame rates and dropped frames."""
+    detector = KalmanBounceDetector()
+    bounces = [
+        b for b in (detector.update(*sample) for sample in zip(*_trajectory(fps, drop=drop)))
+        if b is not None
+    ]
+    expected = _expected()
+    assert len(bounces) == len(expected)
+    assert np.max(np.abs(np.array(bounces) - expected)) < 0.05
+
+
+def test_predicts_through_missed_frames() -> None:
+    """Test that prediction tracks the ball between sparse detections."""
+    detector = KalmanBounceDetector()
+    t, x, y = _trajectory(120, duration=0.2, noise=0.0)
+    for sample in zip(t, x, y):
+        detector.update(*sample)
+    predicted = detector.predict(0.23)
+    phase = (0.23 % PERIOD) / PERIOD
+    assert predicted[1] == pytest.approx(BOUNCE_Y - 1.2 * phase * (1 - phase), abs=0.01)
+
+
+def test_restored_detector_continues_track() -> None:
+    """Test that a detector restored from a snapshot finds the same bounces."""
+    samples = list(zip(*_trajectory(60)))
+    detector = KalmanBounceDetector()
+    for sample in samples[:100]:
+        detector.update(*sample)
+    restored = KalmanBounceDetector()
+    restored.restore(detector.snapshot())
+    assert [restored.update(*sample) for sample in samples[100:]] == [
+        detector.update(*sample) for sample in samples[100:]
+    ]
+
+
+def test_new_track_after_gap() -> None:
+    """Test that a long gap does not carry velocity across tracks."""
+    detector = KalmanBounceDetector(max_gap_s=0.2)
+    for ts, y in ((0.0, 0.3), (0.05, 0.4), (0.1, 0.5)):
+        detector.update(ts, 0.5, y)
+    assert detector.velocity[1] > 0
+    detector.update(1.0, 0.5, 0.2)
+    assert detector.velocity == (0.0, 0.0)
+
+
+class TestKalmanTracker:
+    """Test the tracker's kalman vision bounce mode."""
+
+    def _config(self, mode: str) -> FusionConfig:
+        return FusionConfig(table_bbox=(0.0, 0.0, 1.0, 1.0), vision_bounce_mode=mode)
+
+    def test_counts_trajectory_bounces(self) -> None:
+        """Test that kalman mode counts real bounces, unlike the heuristic."""
+        t, x, y = _trajectory(30)
+        counts = {}
+        for mode in ("heuristic", "kalman"):
+            engine = FusionEngine(self._config(mode))
+            output = engine.process_vision_batch(zip(t, x, y, np.full(len(t), 0.9)))
+            counts[mode] = output.status.rally_count
+        assert counts["kalman"] == len(_expected())
+        assert counts["heuristic"] > counts["kalman"]
+
+    def test_replay_matches_online(self) -> None:
+        """Test that offline replay reproduces the online kalman tracker."""
+        config = self._config("kalman")
+        t, x, y = _trajectory(60, drop=0.2, seed=3)
+        conf = np.random.default_rng(4).uniform(0.2, 1.0, len(t))
+        engine = FusionEngine(config)
+        engine.process_vision_batch(zip(t, x, y, conf))
+        result = replay(config, t, x, y, conf)
+        assert result.status == engine.tracker.get_status()
+
+    def test_rejects_unknown_mode(self) -> None:
+        """Test config validation."""
+        with pytest.raises(ValueError):
+            FusionEngine(FusionConfig(vision_bounce_mode="magic"))
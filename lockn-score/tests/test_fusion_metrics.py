@@ -0,0 +1,153 @@
+"""Tests for fusion latency histograms and the /metrics endpoint."""
+
+from __future__ import annotations
+
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api, wire
+from src.api.journal import JournalStore
+from src.api.metrics import MetricsRegistry
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.metrics import EngineMetrics, LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Test bucket layout and quantile accuracy."""
+
+    def test_buckets_are_contiguous(self) -> None:
+        """Test that bucket bounds tile the value range without gaps."""
+        histogram = LatencyHistogram(sub_bits=3, max_bits=20)
+        previous_high = 0
+        for index in range(len(histogram.counts)):
+            low, high = histogram.bucket_bounds(index)
+            assert low == previous_high
+            previous_high = high
+
+    def test_values_land_in_their_bucket(self) -> None:
+        """Test that recording a value increments the bucket containing it."""
+        histogram = LatencyHistogram()
+        for value in (0, 1, 31, 32, 33, 1000, 123_456, 10**9):
+            before = list(histogram.counts)
+            histogram.record(value)
+            index = next(i for i, (a, b) in enumerate(zip(before, histogram.counts)) if a != b)
+            low, high = histogram.bucket_bounds(index)
+            assert low <= value < high
+
+    def test_quantiles_within_relative_error(self) -> None:
+        """Test that quantiles are within the sub-bucket resolution."""
+        rng = random.Random(0)
+        values = sorted(int(rng.lognormvariate(10, 1.5)) for _ in range(20_000))
+        histogram = LatencyHistogram(sub_bits=4)
+        for value in values:
+            histogram.record(value)
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            assert histogram.quantile(q) == pytest.approx(exact, rel=1 / 16)
+        assert histogram.count == len(values)
+        assert histogram.total == sum(values)
+
+    def test_saturates_past_range(self) -> None:
+        """Test that values beyond max_bits go to the last bucket."""
+        histogram = LatencyHistogram(max_bits=10)
+        histogram.record(10**12)
+        assert histogram.counts[-1] == 1
+
+
+class TestEngineMetrics:
+    """Test engine instrumentation."""
+
+    def test_disabled_by_default(self) -> None:
+        """Test that engines carry no metrics unless attached."""
+        assert FusionEngine().metrics is None
+
+    def test_records_stages_and_transitions(self) -> None:
+        """Test per-stage latency, event counts and state transitions."""
+        engine = FusionEngine()
+        engine.metrics = metrics = EngineMetrics()
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        engine.process_audio(0.01, 0.8)
+        engine.process_vision_batch([(0.3, 0.5, 0.5, 0.9), (0.6, 0.5, 0.5, 0.9)])
+        engine.tick(10.0)
+
+        assert metrics.events == {"vision": 1, "audio": 1, "vision_batch": 2, "tick": 1}
+        assert metrics.latency["vision"].count == 1
+        assert metrics.latency["vision_batch"].count == 1
+        assert metrics.transitions == {"IN_PLAY": 1, "ENDED": 1}
+        assert metrics.capture_age.count == 0  # recorded by callers
+
+
+class TestMetricsEndpoint:
+    """Test Prometheus exposition through the Score API."""
+
+    def test_disabled_returns_404(self, monkeypatch) -> None:
+        """Test that /metrics reports when instrumentation is off."""
+        monkeypatch.setattr(score_api, "metrics", None)
+        assert TestClient(score_api.app).get("/metrics").status_code == 404
+
+    def test_exposes_session_metrics(self, monkeypatch) -> None:
+        """Test that handler and engine stages are exported per session."""
+        monkeypatch.setattr(score_api, "metrics", MetricsRegistry())
+        score_api.registry.clear()
+        client = TestClient(score_api.app)
+        client.post("/score/t-1/vision", json={"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9})
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE lockn_score_stage_latency_seconds summary" in body
+        assert 'lockn_score_stage_latency_seconds_count{session="t-1",stage="vision"} 1' in body
+        assert 'lockn_score_stage_latency_seconds_count{session="t-1",stage="api_vision"} 1' in body
+        assert 'lockn_score_events_total{session="t-1",stage="vision"} 1' in body
+        assert 'lockn_score_transitions_total{session="t-1",to_state="IN_PLAY"} 1' in body
+        score_api.registry.clear()
+
+    @pytest.mark.parametrize("journaled", [False, True])
+    def test_capture_age_counts_client_stamps_only(self, journaled, tmp_path, monkeypatch) -> None:
+        """Test that events stamped with server time are not in the capture ages."""
+        monkeypatch.setattr(score_api, "metrics", MetricsRegistry())
+        if journaled:
+            monkeypatch.setattr(score_api, "journal", JournalStore(str(tmp_path)))
+        score_api.registry.clear()
+        client = TestClient(score_api.app)
+        now = time.time()
+        vision = {"x": 0.5, "y": 0.5, "confidence": 0.9}
+        client.post("/score/t-1/vision", json={"timestamp": now - 1.0, **vision})
+        client.post("/score/t-1/vision", json=vision)
+        client.post("/score/t-1/audio", json={"timestamp": None, "confidence": 0.8})
+        client.post(
+            "/score/t-1/vision/batch",
+            content=wire.encode_vision([(now - 1.0, 0.5, 0.5, 0.9), (None, 0.5, 0.5, 0.9)]),
+            headers={"content-type": wire.VISION_CONTENT_TYPE},
+        )
+
+        capture_age = score_api.registry.get("t-1").metrics.capture_age
+        assert capture_age.count == 2
+        assert capture_age.quantile(0.0) >= 1e9 * 0.9
+        score_api.registry.clear()
+        if journaled:
+            score_api.journal.close()
+
+    def test_exposes_reorder_stats(self, monkeypatch) -> None:
+        """Test that reorder drops, forced releases and lateness are exported."""
+        monkeypatch.setattr(score_api, "metrics", MetricsRegistry())
+        monkeypatch.setattr(score_api.registry, "config", FusionConfig(reorder_lateness_ms=100))
+        score_api.registry.clear()
+        client = TestClient(score_api.app)
+        vision = {"x": 0.5, "y": 0.5, "confidence": 0.9}
+        client.post("/score/t-1/vision", json={"timestamp": 1.0, **vision})
+        client.post("/score/t-1/vision", json={"timestamp": 0.95, **vision})
+        client.post("/score/t-1/vision", json={"timestamp": 2.0, **vision})  # releases 1.0
+        client.post("/score/t-1/vision", json={"timestamp": 0.5, **vision})  # behind it: dropped
+
+        body = client.get("/metrics").text
+        assert "# TYPE lockn_score_reorder_dropped_late_total counter" in body
+        assert 'lockn_score_reorder_dropped_late_total{session="t-1"} 1' in body
+        assert 'lockn_score_reorder_forced_releases_total{session="t-1"} 0' in body
+        assert 'lockn_score_reorder_max_lateness_seconds{session="t-1"} 0.05' in body
+        score_api.registry.clear()
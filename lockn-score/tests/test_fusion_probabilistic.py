@@ -0,0 +1,110 @@
+"""Tests for probabilistic audio/vision bounce fusion."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src.fusion.config import FusionConfig
+from src.fusion.probabilistic import (
+    AUDIO_NONE,
+    AUDIO_SILENT,
+    VISION_NONE,
+    LikelihoodTable,
+    confidence_llr,
+)
+from src.fusion.rally_tracker import RallyState, RallyTracker
+from src.fusion.replay import replay
+
+CONFIG = replace(FusionConfig(), fusion_mode="probabilistic")
+
+
+def _in_play(config: FusionConfig = CONFIG) -> RallyTracker:
+    tracker = RallyTracker(config)
+    tracker.apply_vision(0.0, 0.5, 0.5, 0.9)
+    assert tracker.state == RallyState.IN_PLAY
+    return tracker
+
+
+class TestLikelihoodTable:
+    """Test the precomputed evidence table."""
+
+    def test_confidence_llr_is_monotonic(self) -> None:
+        """Test that higher confidence is always stronger bounce evidence."""
+        values = [confidence_llr((i + 0.5) / 10) for i in range(10)]
+        assert values == sorted(values)
+
+    def test_missing_modality_penalized(self) -> None:
+        """Test that live-but-quiet audio counts against a bounce, absent audio does not."""
+        table = LikelihoodTable()
+        strong_vision = 10
+        threshold = CONFIG.fusion_log_odds_threshold
+        assert table.score(AUDIO_NONE, strong_vision, 0) < threshold < table.score(AUDIO_SILENT, strong_vision, 0)
+        assert table.score(11, VISION_NONE, 0) < table.score(11, strong_vision, 0)
+
+    def test_rejects_wrong_size(self) -> None:
+        """Test that a custom table must match the bin layout."""
+        with pytest.raises(ValueError):
+            LikelihoodTable([0.0])
+
+
+class TestProbabilisticTracker:
+    """Test bounce counting in probabilistic mode."""
+
+    def test_unknown_mode_rejected(self) -> None:
+        """Test that fusion_mode is validated."""
+        with pytest.raises(ValueError):
+            RallyTracker(replace(FusionConfig(), fusion_mode="bayes"))
+
+    def test_weak_audio_confirmed_by_vision(self) -> None:
+        """Test that sub-threshold audio counts when vision is confident."""
+        tracker = _in_play(replace(CONFIG, allow_vision_only=False))
+        tracker.apply_vision(0.3, 0.5, 0.5, 0.95)
+        tracker.apply_audio(0.31, 0.3)
+        assert tracker.rally_count == 1
+
+        threshold = RallyTracker(FusionConfig(allow_vision_only=False))
+        threshold.apply_vision(0.0, 0.5, 0.5, 0.9)
+        threshold.apply_vision(0.3, 0.5, 0.5, 0.95)
+        threshold.apply_audio(0.31, 0.3)
+        assert threshold.rally_count == 0
+
+    def test_audio_without_vision_rejected(self) -> None:
+        """Test that a loud sound with no ball nearby is not a bounce."""
+        tracker = _in_play()
+        tracker.apply_audio(2.0, 0.95)
+        assert tracker.rally_count == 0
+
+    def test_pending_audio_confirmed_by_later_vision(self) -> None:
+        """Test that vision arriving just after the sound confirms it."""
+        tracker = _in_play()
+        tracker.apply_audio(1.0, 0.8)
+        assert tracker.rally_count == 0
+        tracker.apply_vision(1.03, 0.5, 0.5, 0.9)
+        assert tracker.rally_count == 1
+        assert tracker.last_bounce_ts == 1.0
+
+    def test_replay_matches_online_tracker(self) -> None:
+        """Test that replay feeds the tracker in merged timestamp order."""
+        rng = random.Random(3)
+        v_ts = np.arange(0.0, 3.0, 1 / 60)
+        v_x = np.array([rng.uniform(0.2, 0.8) for _ in v_ts])
+        v_y = np.full(len(v_ts), 0.5)
+        v_conf = np.array([rng.uniform(0.1, 0.99) for _ in v_ts])
+        a_ts = np.sort(np.array([rng.uniform(0.0, 3.0) for _ in range(12)]))
+        a_conf = np.array([rng.uniform(0.1, 0.99) for _ in a_ts])
+        result = replay(CONFIG, v_ts, v_x, v_y, v_conf, a_ts, a_conf)
+
+        tracker = RallyTracker(CONFIG)
+        events = [(t, 0, x, y, c) for t, x, y, c in zip(v_ts, v_x, v_y, v_conf)]
+        events += [(t, 1, 0.0, 0.0, c) for t, c in zip(a_ts, a_conf)]
+        for ts, kind, x, y, c in sorted(events, key=lambda e: (e[0], e[1])):
+            if kind == 0:
+                tracker.apply_vision(float(ts), float(x), float(y), float(c))
+            else:
+                tracker.apply_audio(float(ts), float(c))
+        assert result.status == tracker.get_status()
+        assert len(result.bounce_timestamps) == tracker.rally_count
@@ -0,0 +1,109 @@
+"""Tests for event-time reordering in front of the fusion engine."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.fusion.config import FusionConfig
+from src.fusion.engine import FusionEngine
+from src.fusion.rally_tracker import RallyState
+from src.fusion.reorder import ReorderBuffer
+
+
+class TestReorderBuffer:
+    """Test watermark release, late drops and capacity."""
+
+    def test_releases_in_timestamp_order_after_lateness(self) -> None:
+        """Test that events wait for the watermark and come out sorted."""
+        buffer = ReorderBuffer(lateness_s=0.1)
+        buffer.push(0.30, 0)
+        buffer.push(0.25, 1)
+        assert list(buffer.pop_ready()) == []
+        buffer.push(0.40, 0)
+        assert [e[0] for e in buffer.pop_ready()] == [0.25, 0.30]
+        assert buffer.stats.max_lateness_ms == pytest.approx(50.0)
+        assert [e[0] for e in buffer.drain()] == [0.40]
+
+    def test_drops_events_behind_released_ones(self) -> None:
+        """Test that events older than the last release are dropped."""
+        buffer = ReorderBuffer(lateness_s=0.05)
+        buffer.push(0.0, 0)
+        buffer.push(1.0, 0)
+        list(buffer.pop_ready())
+        assert buffer.push(-0.1, 1) is False
+        assert buffer.stats.dropped_late == 1
+        assert buffer.stats.received == 3
+
+    def test_capacity_forces_early_release(self) -> None:
+        """Test that the buffer never holds more than max_pending events."""
+        buffer = ReorderBuffer(lateness_s=10.0, max_pending=2)
+        for ts in (0.3, 0.1, 0.2):
+            buffer.push(ts, 0)
+        assert [e[0] for e in buffer.pop_ready()] == [0.1]
+        assert buffer.stats.forced_releases == 1
+        assert len(buffer) == 2
+
+    def test_restored_buffer_continues(self) -> None:
+        """Test that a buffer restored from a snapshot releases and drops as the original."""
+        buffer = ReorderBuffer(lateness_s=0.1)
+        for ts in (0.0, 0.3, 0.25, 0.5):
+            buffer.push(ts, 0)
+        list(buffer.pop_ready())
+        restored = ReorderBuffer(lateness_s=0.1)
+        restored.restore(buffer.snapshot())
+        assert restored.stats == buffer.stats
+        for b in (buffer, restored):
+            assert b.push(0.1, 1) is False
+            b.push(0.7, 1)
+        assert list(restored.pop_ready()) == list(buffer.pop_ready())
+
+    def test_advance_moves_watermark(self) -> None:
+        """Test that a clock reading releases quiet streams."""
+        buffer = ReorderBuffer(lateness_s=0.1)
+        buffer.push(0.0, 0)
+        buffer.advance(0.2)
+        assert len(list(buffer.pop_ready())) == 1
+
+
+class TestEngineReordering:
+    """Test fusion with audio arriving ahead of its vision frame."""
+
+    def _feed(self, engine: FusionEngine) -> None:
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        # Audio bounce at 0.30 arrives before the 0.29 vision frame.
+        engine.process_audio(0.30, 0.9)
+        engine.process_vision(0.29, 0.5, 0.5, 0.9)
+        engine.process_vision(0.50, 0.5, 0.5, 0.9)
+
+    def test_out_of_order_audio_missed_without_buffer(self) -> None:
+        """Test the baseline: the audio bounce is not confirmed."""
+        engine = FusionEngine(FusionConfig(allow_vision_only=False))
+        self._feed(engine)
+        assert engine.tracker.rally_count == 0
+
+    def test_out_of_order_audio_confirmed_with_buffer(self) -> None:
+        """Test that reordering lets vision confirm the audio bounce."""
+        engine = FusionEngine(
+            FusionConfig(allow_vision_only=False, reorder_lateness_ms=100)
+        )
+        self._feed(engine)
+        assert engine.tracker.rally_count == 1
+        assert engine.tracker.last_bounce_ts == 0.30
+        assert engine.flush().status.last_ball_ts == 0.50
+
+    def test_tick_lags_by_lateness(self) -> None:
+        """Test that timeouts are evaluated behind buffered events."""
+        engine = FusionEngine(FusionConfig(reorder_lateness_ms=100, vision_timeout_ms=500))
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        assert engine.tick(0.55).status.state == RallyState.IN_PLAY
+        assert engine.tick(0.65).status.state == RallyState.ENDED
+
+    def test_batch_reports_transitions(self) -> None:
+        """Test that batches through the buffer still report transitions."""
+        engine = FusionEngine(FusionConfig(reorder_lateness_ms=50))
+        output = engine.process_vision_batch(
+            [(0.1, 0.5, 0.5, 0.9), (0.0, 0.5, 0.5, 0.9), (0.3, 0.0, 0.0, 0.9)]
+        )
+        assert [t.timestamp for t in output.transitions] == [0.0]
+        flushed = engine.flush()
+        assert [t.to_state for t in flushed.transitions] == [RallyState.ENDED]
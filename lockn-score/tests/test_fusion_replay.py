@@ -0,0 +1,98 @@
+"""Tests for the vectorized offline replay engine."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.fusion.config import FusionConfig
+from src.fusion.rally_tracker import BallDetection, BounceEvent, RallyTracker
+from src.fusion.replay import replay
+
+
+def _online(config, vision, audio, ticks):
+    """Feed events one by one into a RallyTracker in replay order."""
+    events = [(ts, 0, i) for i, ts in enumerate(vision[0])]
+    events += [(ts, 1, i) for i, ts in enumerate(audio[0])]
+    events += [(ts, 2, i) for i, ts in enumerate(ticks)]
+    events.sort()
+
+    tracker = RallyTracker(config)
+    transitions = []
+    for ts, kind, i in events:
+        before = tracker.state
+        if kind == 0:
+            tracker.update_vision(
+                BallDetection(ts, vision[1][i], vision[2][i], vision[3][i])
+            )
+        elif kind == 1:
+            tracker.update_audio(BounceEvent(ts, audio[1][i]))
+        else:
+            tracker.tick(ts)
+        if tracker.state is not before:
+            transitions.append((ts, before, tracker.state, tracker.rally_count))
+    return tracker.get_status(), transitions
+
+
+def _random_match(rng, n_vision, n_audio, n_ticks, duration):
+    vision = (
+        np.sort(rng.uniform(0, duration, n_vision)),
+        rng.uniform(0.05, 0.95, n_vision),
+        rng.uniform(0.15, 0.85, n_vision),
+        rng.uniform(0.0, 1.0, n_vision),
+    )
+    audio = (np.sort(rng.uniform(0, duration, n_audio)), rng.uniform(0.0, 1.0, n_audio))
+    ticks = np.sort(rng.uniform(0, duration, n_ticks))
+    return vision, audio, ticks
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_replay_matches_online_tracker(seed) -> None:
+    """Test that replay yields identical transitions and final status."""
+    rng = np.random.default_rng(seed)
+    vision, audio, ticks = _random_match(rng, 400, 60, 20, duration=8.0)
+    config = FusionConfig(
+        table_bbox=(0.06, 0.16, 0.94, 0.84),
+        vision_only_audio_silence_ms=int(rng.integers(50, 1500)),
+        min_bounce_interval_ms=int(rng.integers(20, 300)),
+        rally_timeout_ms=int(rng.integers(100, 3000)),
+    )
+
+    status, transitions = _online(config, vision, audio, ticks)
+    result = replay(config, *vision, *audio, tick_ts=ticks)
+
+    assert result.status == status
+    assert [
+        (t.timestamp, t.from_state, t.to_state, t.rally_count)
+        for t in result.transitions
+    ] == transitions
+    assert len(result.bounce_timestamps) == status.rally_count
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_replay_matches_online_tracker_long_rally(seed) -> None:
+    """Test equivalence when the ball never leaves the table region."""
+    rng = np.random.default_rng(100 + seed)
+    vision, audio, _ = _random_match(rng, 2000, 300, 0, duration=60.0)
+    config = FusionConfig(table_bbox=(0.0, 0.0, 1.0, 1.0), vision_timeout_ms=10_000)
+
+    status, transitions = _online(config, vision, audio, [])
+    result = replay(config, *vision, *audio)
+
+    assert result.status == status
+    assert len(result.transitions) == len(transitions) == 1
+    assert status.rally_count > 50
+
+
+def test_replay_empty_streams() -> None:
+    """Test that replaying nothing leaves the tracker idle."""
+    result = replay(FusionConfig())
+    assert result.status.state == "IDLE"
+    assert result.status.rally_count == 0
+    assert result.transitions == []
+
+
+def test_replay_rejects_mismatched_lengths() -> None:
+    """Test that vision arrays must align."""
+    with pytest.raises(ValueError):
+        replay(FusionConfig(), [0.0, 1.0], [0.5], [0.5], [0.9])
@@ -0,0 +1,151 @@
+"""Tests for scoring modes and their fusion bridge."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.api import mode_api, score_api
+from src.fusion.rally_tracker import RallyState, RallyStatus
+from src.modes.base import Mode, ModeError
+from src.modes.game import GameMode
+from src.modes.rally import RallyMode
+from src.modes.solo import SoloMode
+
+
+def _status(state: RallyState, count: int) -> RallyStatus:
+    return RallyStatus(state=state, rally_count=count, last_bounce_ts=None, last_ball_ts=None)
+
+
+class TestGameMode:
+    """Test game scoring rules."""
+
+    def test_win_by_two(self) -> None:
+        """Test that a set needs a two-point lead past points_to_win."""
+        game = GameMode(points_to_win=3)
+        for player in (1, 2, 1, 2, 1):
+            game.apply("point", player=player)
+        assert (game.state.player1, game.state.player2) == (3, 2)
+        assert not game.game_over
+        game.apply("point", player=1)
+        assert game.state.winner == 1
+
+    def test_serve_rotation_and_deuce(self) -> None:
+        """Test that service changes every interval, then every point at deuce."""
+        game = GameMode(points_to_win=3, serve_interval=2)
+        servers = []
+        for player in (1, 2, 1, 2, 1, 2):
+            game.apply("point", player=player)
+            servers.append(game.state.server)
+        # 1-2 points: server 1, 2-3: server 2, then deuce at 4 alternates.
+        assert servers == [1, 2, 2, 1, 2, 1]
+
+    def test_best_of_sets(self) -> None:
+        """Test that sets reset points and the match needs a majority."""
+        game = GameMode(points_to_win=2, best_of_sets=3)
+        for _ in range(2):
+            game.apply("point", player=1)
+        assert game.state.player1_sets == 1
+        assert (game.state.player1, game.state.player2, game.state.current_set) == (0, 0, 2)
+        assert game.state.server == 2
+        for _ in range(2):
+            game.apply("point", player=1)
+        assert game.state.winner == 1
+        with pytest.raises(ModeError):
+            game.apply("point", player=2)
+
+    def test_miss_charged_to_player_due(self) -> None:
+        """Test that a miss scores for the opponent of the player due to hit."""
+        game = GameMode()
+        game.apply("miss")  # server (1) faults
+        assert game.state.player2 == 1
+        game.apply("hit")
+        game.apply("miss")  # receiver (2) failed to return
+        assert game.state.player1 == 1
+        assert game.state.last_rally_count == 1
+
+    def test_undo_restores_across_set(self) -> None:
+        """Test that undo reverts a set-winning point exactly."""
+        game = GameMode(points_to_win=2, best_of_sets=3)
+        game.apply("point", player=2)
+        game.apply("point", player=2)
+        assert game.state.player2_sets == 1
+        event = game.undo()
+        assert event.event_type == "point"
+        assert (game.state.player2, game.state.player2_sets, game.state.current_set) == (1, 0, 1)
+        game.undo()
+        with pytest.raises(ModeError):
+            game.undo()
+
+
+class TestSoloAndRally:
+    """Test streak and rally counting."""
+
+    def test_solo_target_ends_session(self) -> None:
+        """Test that reaching the target finishes a solo session."""
+        solo = SoloMode(target_rally_count=2)
+        solo.apply("hit")
+        solo.apply("hit")
+        assert solo.state.target_reached and solo.game_over
+
+    def test_rally_miss_alternates_players(self) -> None:
+        """Test that misses are charged by hit parity and reset the count."""
+        rally = RallyMode()
+        rally.apply("miss")
+        assert rally.state.last_missed_by == 1
+        rally.apply("hit")
+        rally.apply("hit")
+        rally.apply("hit")
+        rally.apply("miss")
+        assert rally.state.last_missed_by == 2
+        assert (rally.state.rally_count, rally.state.longest_rally) == (0, 3)
+
+    def test_observe_maps_tracker_statuses(self) -> None:
+        """Test that bounces become hits and a rally end becomes a miss."""
+        rally = RallyMode()
+        assert rally.observe(_status(RallyState.IN_PLAY, 0)) == []
+        assert rally.observe(_status(RallyState.IN_PLAY, 2)) == ["hit", "hit"]
+        assert rally.observe(_status(RallyState.ENDED, 3)) == ["hit", "miss"]
+        assert rally.observe(_status(RallyState.ENDED, 3)) == []
+        assert rally.observe(_status(RallyState.IN_PLAY, 1)) == ["hit"]
+        assert rally.state.rally_count == 1
+
+    def test_mode_requires_json_views(self) -> None:
+        """Test that a mode without settings_dict/state_dict cannot be created."""
+
+        class Partial(Mode[None]):
+            name = "partial"
+
+            def settings_dict(self) -> dict:
+                return {}
+
+        with pytest.raises(TypeError, match="state_dict"):
+            Partial(None)
+
+
+class TestModeApi:
+    """Test undo and fusion-driven events through the API."""
+
+    def test_undo_endpoint(self, client) -> None:
+        """Test that undo reverts the last event."""
+        session_id = client.post("/api/session/game").json()["session_id"]
+        client.post(f"/api/session/{session_id}/point", params={"player": 1})
+        response = client.post(f"/api/session/{session_id}/undo")
+        assert response.status_code == 200
+        assert response.json()["undone"] == "point"
+        assert response.json()["state"]["player1"] == 0
+        assert client.post(f"/api/session/{session_id}/undo").status_code == 400
+
+    def test_fusion_events_drive_mode(self, client) -> None:
+        """Test that Score API events for the same id update the mode."""
+        score_api.registry.clear()
+        session_id = client.post("/api/session/rally").json()["session_id"]
+        for ts in (0.0, 0.3, 0.6):
+            client.post(
+                f"/score/{session_id}/vision",
+                json={"timestamp": ts, "x": 0.5, "y": 0.5, "confidence": 0.9},
+            )
+        assert mode_api.sessions.get(session_id).state.rally_count == 2
+        client.post(f"/score/{session_id}/tick", params={"timestamp": 5.0})
+        state = client.get(f"/api/session/{session_id}").json()["state"]
+        assert state["lastRallyCount"] == 2
+        assert state["lastMissedBy"] == 1
@@ -0,0 +1,133 @@
+"""API tests for batched vision/audio ingestion."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api, wire
+
+
+@pytest.fixture
+def score_client() -> TestClient:
+    """Create a test client with a fresh fusion engine."""
+    score_api.registry.clear()
+    return TestClient(score_api.app)
+
+
+class TestVisionBatch:
+    """Test batched vision ingestion."""
+
+    def test_batch_reports_transitions(self, score_client) -> None:
+        """Test that a batch returns final state and every state change."""
+        response = score_client.post(
+            "/score/vision/batch",
+            json={
+                "detections": [
+                    {"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9},
+                    {"timestamp": 0.2, "x": 0.5, "y": 0.5, "confidence": 0.9},
+                    {"timestamp": 0.4, "x": 0.5, "y": 0.5, "confidence": 0.9},
+                    {"timestamp": 0.5, "x": 0.0, "y": 0.0, "confidence": 0.9},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["state"] == "ENDED"
+        assert data["rally_count"] == 2
+        assert [(t["from_state"], t["to_state"]) for t in data["transitions"]] == [
+            ("IDLE", "IN_PLAY"),
+            ("IN_PLAY", "ENDED"),
+        ]
+        assert data["transitions"][1]["timestamp"] == 0.5
+
+    def test_batch_matches_single_posts(self, score_client) -> None:
+        """Test that a batch yields the same state as individual posts."""
+        detections = [
+            {"timestamp": ts / 10, "x": 0.5, "y": 0.5, "confidence": 0.8}
+            for ts in range(10)
+        ]
+        for detection in detections:
+            single = score_client.post("/score/vision", json=detection).json()
+
+        score_client.post("/score/reset")
+        batch = score_client.post(
+            "/score/vision/batch", json={"detections": detections}
+        ).json()
+        batch.pop("transitions")
+        assert batch == single
+
+    def test_empty_batch_returns_current_state(self, score_client) -> None:
+        """Test that an empty batch is a no-op."""
+        response = score_client.post("/score/vision/batch", json={"detections": []})
+        assert response.status_code == 200
+        assert response.json()["state"] == "IDLE"
+        assert response.json()["transitions"] == []
+
+
+class TestAudioBatch:
+    """Test batched audio ingestion."""
+
+    def test_audio_batch_counts_confirmed_bounces(self, score_client) -> None:
+        """Test that audio bounces confirmed by vision are counted."""
+        score_client.post(
+            "/score/vision/batch",
+            json={"detections": [{"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}]},
+        )
+        response = score_client.post(
+            "/score/audio/batch",
+            json={
+                "bounces": [
+                    {"timestamp": 0.05, "confidence": 0.9},
+                    {"timestamp": 0.1, "confidence": 0.9},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["state"] == "IN_PLAY"
+        assert data["rally_count"] == 1
+        assert data["transitions"] == []
+
+
+class TestBinaryIngest:
+    """Test the fixed-layout binary request bodies."""
+
+    DETECTIONS = [(0.0, 0.5, 0.5, 0.9), (0.2, 0.5, 0.5, 0.9), (0.4, 0.5, 0.5, 0.9), (0.5, 0.0, 0.0, 0.9)]
+
+    def test_binary_batch_matches_json(self, score_client) -> None:
+        """Test that a binary vision batch yields the same result as JSON."""
+        as_json = score_client.post(
+            "/score/t-json/vision/batch",
+            json={"detections": [dict(zip(("timestamp", "x", "y", "confidence"), d)) for d in self.DETECTIONS]},
+        ).json()
+        as_binary = score_client.post(
+            "/score/t-bin/vision/batch",
+            content=wire.encode_vision(self.DETECTIONS),
+            headers={"content-type": wire.VISION_CONTENT_TYPE},
+        ).json()
+        assert as_binary == as_json
+
+    def test_single_records_and_nan_timestamps(self, score_client) -> None:
+        """Test single-record posts and NaN meaning server time."""
+        response = score_client.post(
+            "/score/vision",
+            content=wire.encode_vision([(None, 0.5, 0.5, 0.9)]),
+            headers={"content-type": wire.VISION_CONTENT_TYPE},
+        )
+        assert response.status_code == 200
+        assert response.json()["state"] == "IN_PLAY"
+        assert response.json()["last_ball_ts"] > 1e9
+        response = score_client.post(
+            "/score/audio/batch",
+            content=wire.encode_audio([(None, 0.9)]),
+            headers={"content-type": wire.AUDIO_CONTENT_TYPE},
+        )
+        assert response.json()["rally_count"] == 1
+
+    def test_malformed_binary_rejected(self, score_client) -> None:
+        """Test that truncated bodies and multi-record single posts are 422."""
+        headers = {"content-type": wire.VISION_CONTENT_TYPE}
+        body = wire.encode_vision(self.DETECTIONS[:2])
+        assert score_client.post("/score/vision/batch", content=body[:-1], headers=headers).status_code == 422
+        assert score_client.post("/score/vision", content=body, headers=headers).status_code == 422
@@ -0,0 +1,205 @@
+"""Tests for multi-worker session ownership and the shared status table."""
+
+from __future__ import annotations
+
+import socket
+import threading
+from typing import Any, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api
+from src.api.cluster import StatusTable, WorkerCluster, owner_of
+from src.fusion.rally_tracker import RallyState, RallyStatus
+
+
+def _session_owned_by(worker: int, workers: int = 2, prefix: str = "s") -> str:
+    return next(f"{prefix}-{i}" for i in range(1000) if owner_of(f"{prefix}-{i}", workers) == worker)
+
+
+STATUS = RallyStatus(state=RallyState.IN_PLAY, rally_count=3, last_bounce_ts=1.5, last_ball_ts=None)
+
+
+@pytest.fixture
+def clusters(tmp_path):
+    started: List[WorkerCluster] = []
+
+    def start(handler) -> WorkerCluster:
+        cluster = WorkerCluster(str(tmp_path), workers=2, slots=16)
+        cluster.start(handler)
+        started.append(cluster)
+        return cluster
+
+    yield start
+    name = started[0].segment_name if started else None
+    for cluster in started:
+        cluster.close()
+    if name is not None:
+        table = StatusTable(name, 2, 16)
+        table.close()
+        table.unlink()
+
+
+class TestStatusTable:
+    """Test the shared-memory status records."""
+
+    def test_publish_read_remove(self, tmp_path) -> None:
+        """Test that another attachment sees published statuses."""
+        name = f"lockn-score-test-{tmp_path.name}"[:30]
+        writer = StatusTable(name, workers=2, slots=8, create=True)
+        reader = StatusTable(name, workers=2, slots=8)
+        try:
+            assert reader.read(1, "t") is None
+            writer.publish(1, "t", STATUS)
+            seq, status = reader.read(1, "t")
+            assert status == STATUS and seq % 2 == 0
+            writer.publish(1, "t", STATUS)
+            assert reader.read(1, "t")[0] > seq
+            assert reader.read(0, "t") is None
+            writer.remove(1, "t")
+            assert reader.read(1, "t") is None
+        finally:
+            reader.close()
+            writer.close()
+            writer.unlink()
+
+    def test_full_region_raises(self, tmp_path) -> None:
+        """Test that a worker cannot overflow its region."""
+        name = f"lockn-score-full-{tmp_path.name}"[:30]
+        table = StatusTable(name, workers=1, slots=2, create=True)
+        try:
+            table.publish(0, "a", STATUS)
+            table.publish(0, "b", STATUS)
+            with pytest.raises(RuntimeError):
+                table.publish(0, "c", STATUS)
+        finally:
+            table.close()
+            table.unlink()
+
+
+class TestWorkerCluster:
+    """Test worker claims and request forwarding."""
+
+    def test_claims_distinct_indices(self, clusters) -> None:
+        """Test that each worker locks its own index and extra workers fail."""
+        first = clusters(lambda op, sid, body: (200, None))
+        second = clusters(lambda op, sid, body: (200, None))
+        assert {first.index, second.index} == {0, 1}
+        with pytest.raises(RuntimeError):
+            clusters(lambda op, sid, body: (200, None))
+
+    def test_forward_reaches_owner(self, clusters) -> None:
+        """Test that forwarded requests run on the owning worker."""
+        seen: List[Tuple[str, str, Any]] = []
+        owner = clusters(lambda op, sid, body: (seen.append((op, sid, body)) or (200, {"echo": body})))
+        other = clusters(lambda op, sid, body: (500, None))
+        session = _session_owned_by(owner.index)
+        assert not other.is_local(session)
+        for i in range(3):
+            assert other.forward(session, "vision", {"i": i}) == (200, {"echo": {"i": i}})
+        assert [s[2]["i"] for s in seen] == [0, 1, 2]
+
+    def test_write_not_resent_after_lost_reply(self, clusters) -> None:
+        """Test that a request the owner received is not retried when its reply is lost."""
+        seen: List[Any] = []
+
+        def drop_after_apply(op: str, sid: str, body: Any):
+            seen.append(body)
+            raise RuntimeError("worker died after applying")
+
+        owner = clusters(drop_after_apply)
+        other = clusters(lambda op, sid, body: (500, None))
+        with pytest.raises(ConnectionError):
+            other.forward(_session_owned_by(owner.index), "reset")
+        assert len(seen) == 1
+
+    def test_close_closes_other_threads_connections(self, clusters, monkeypatch) -> None:
+        """Test that connections cached by forwarding threads are closed with the cluster."""
+        opened: List[socket.socket] = []
+
+        class TrackedSocket(socket.socket):
+            def __init__(self, *args: Any, **kwargs: Any) -> None:
+                super().__init__(*args, **kwargs)
+                if kwargs.get("fileno") is None:  # not one accepted by the owner
+                    opened.append(self)
+
+        owner = clusters(lambda op, sid, body: (200, None))
+        other = clusters(lambda op, sid, body: (500, None))
+        monkeypatch.setattr(socket, "socket", TrackedSocket)
+        session = _session_owned_by(owner.index)
+        threads = [threading.Thread(target=other.forward, args=(session, "vision")) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(opened) == 3
+
+        other.close()
+        assert all(sock.fileno() == -1 for sock in opened)
+
+
+class TestClusteredScoreApi:
+    """Test the Score API with a peer worker owning some sessions."""
+
+    def test_forwards_writes_and_reads_shared_state(self, clusters, monkeypatch) -> None:
+        """Test that remote sessions are forwarded and read from shared memory."""
+        forwarded: List[str] = []
+
+        def peer_handler(op: str, session_id: str, body: Any):
+            forwarded.append(op)
+            peer.publish(session_id, STATUS)
+            return 200, {"state": "IN_PLAY", "rally_count": 3, "last_bounce_ts": 1.5, "last_ball_ts": None}
+
+        peer = clusters(peer_handler)
+        local = clusters(score_api._serve_forward)
+        monkeypatch.setattr(score_api, "cluster", local)
+        score_api.registry.clear()
+        client = TestClient(score_api.app)
+
+        remote_id = _session_owned_by(peer.index, prefix="remote")
+        response = client.post(
+            f"/score/{remote_id}/vision", json={"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}
+        )
+        assert response.json()["rally_count"] == 3
+        assert forwarded == ["vision"]
+        assert remote_id not in score_api.registry
+        assert client.get(f"/score/{remote_id}/state").json()["rally_count"] == 3
+
+        local_id = _session_owned_by(local.index, prefix="local")
+        client.post(f"/score/{local_id}/vision", json={"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9})
+        _, status = peer.read(local_id)
+        assert status.state == RallyState.IN_PLAY
+
+        client.delete(f"/score/{local_id}")
+        assert peer.read(local_id) is None
+        score_api.registry.clear()
+
+    def test_unreachable_owner_is_503(self, clusters, monkeypatch) -> None:
+        """Test that a session whose owner is down answers 503 rather than 500."""
+        peer = clusters(lambda op, sid, body: (200, None))
+        local = clusters(score_api._serve_forward)
+        remote_id = _session_owned_by(peer.index, prefix="down")
+        peer.close()
+        monkeypatch.setattr(score_api, "cluster", local)
+        client = TestClient(score_api.app)
+        response = client.post(f"/score/{remote_id}/reset")
+        assert response.status_code == 503
+        assert "unreachable" in response.json()["detail"]
+
+    def test_owner_serves_forwarded_ops(self, clusters, monkeypatch) -> None:
+        """Test that forwarded ops run the same handlers as local requests."""
+        local = clusters(score_api._serve_forward)
+        monkeypatch.setattr(score_api, "cluster", local)
+        score_api.registry.clear()
+        session = _session_owned_by(local.index, prefix="own")
+
+        code, body = score_api._serve_forward(
+            "frames", session, {"text": '{"type": "vision", "timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}'}
+        )
+        assert code == 200 and body == {"ok": True}
+        code, body = score_api._serve_forward("tick", session, {"timestamp": 10.0})
+        assert code == 200 and body["state"] == "ENDED"
+        assert score_api._serve_forward("vision", session, {"x": 0.5})[0] == 422
+        assert score_api._serve_forward("bogus", session, None)[0] == 400
+        score_api.registry.clear()
@@ -0,0 +1,290 @@
+"""Tests for the session journal and snapshot recovery."""
+
+from __future__ import annotations
+
+import asyncio
+import pickletools
+import threading
+import time
+
+import httpx
+
+import pytest
+
+from src.api import journal as journal_module
+from src.api import score_api, wire
+from src.api.journal import SNAPSHOT_HEADER, JournaledEngine, JournalStore
+from src.api.sessions import SessionRegistry
+from src.fusion.config import FusionConfig
+from src.fusion.rally_tracker import RallyState
+
+
+def _rally(engine, start: float, bounces: int) -> None:
+    for i in range(bounces):
+        ts = start + i * 0.3
+        engine.process_vision(ts, 0.5, 0.5, 0.9)
+        engine.process_audio(ts + 0.01, 0.8)
+
+
+def _status(engine):
+    status = engine.tracker.get_status()
+    return (status.state, status.rally_count, status.last_bounce_ts, status.last_ball_ts)
+
+
+@pytest.fixture
+def store(tmp_path) -> JournalStore:
+    """Create a journal store without fsync for fast tests."""
+    return JournalStore(str(tmp_path), fsync=False, snapshot_every=50)
+
+
+class TestJournalStore:
+    """Test journaling, snapshots and recovery."""
+
+    def test_recovers_identical_state(self, store) -> None:
+        """Test that replaying the journal reproduces the live engine."""
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 5)
+        engine.tick(10.0)
+        engine.reset()
+        engine.process_vision_batch([(20.0, 0.5, 0.5, 0.9), (20.3, 0.5, 0.5, 0.9)])
+        engine.process_audio_batch([(20.31, 0.8)])
+        store.commit_all()
+
+        recovered, _, _ = store.recover("table-1")
+        assert _status(recovered) == _status(engine)
+
+    def test_server_timestamps_are_journaled(self, store) -> None:
+        """Test that events without a timestamp replay with the resolved one."""
+        engine = store.open_engine("table-1")
+        engine.process_vision(None, 0.5, 0.5, 0.9)
+        store.commit_all()
+        recovered, _, _ = store.recover("table-1")
+        assert recovered.tracker.last_ball_ts == engine.tracker.last_ball_ts
+
+    def test_group_commit_defers_writes(self, store, tmp_path) -> None:
+        """Test that records reach disk only when committed."""
+        engine = store.open_engine("table-1")
+        engine.process_vision(0.0, 0.5, 0.5, 0.9)
+        assert not store.log_path("table-1", 0).exists()
+        assert store.commit_all() == 1
+        assert store.log_path("table-1", 0).stat().st_size == wire.FRAME.size
+        assert store.commit_all() == 0
+
+    def test_snapshot_bounds_replay(self, store) -> None:
+        """Test that recovery replays only records after the last snapshot."""
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 60)  # 120 records, snapshots at 50 and 100
+        store.commit_all()
+
+        assert store.log_generations("table-1") == [2]
+        recovered, generation, replayed = store.recover("table-1")
+        assert generation == 2
+        assert replayed == 20
+        assert _status(recovered) == _status(engine)
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            FusionConfig(vision_bounce_mode="kalman"),
+            FusionConfig(fusion_mode="probabilistic"),
+            FusionConfig(reorder_lateness_ms=100),
+        ],
+        ids=["kalman", "probabilistic", "reorder"],
+    )
+    def test_snapshot_restores_engine_state(self, tmp_path, config) -> None:
+        """Test that a snapshot carries filter, fusion, reorder and history state."""
+        store = JournalStore(str(tmp_path), config, fsync=False, snapshot_every=50)
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 30)  # snapshot after the 50th record
+        store.commit_all()
+
+        recovered, generation, replayed = store.recover("table-1")
+        assert (generation, replayed) == (1, 10)
+        assert _status(recovered) == _status(engine)
+        if engine.reorder is not None:
+            assert len(recovered.reorder) == len(engine.reorder)
+            assert recovered.reorder.stats == engine.reorder.stats
+        events, changes = engine.history.query()
+        restored_events, restored_changes = recovered.history.query()
+        assert restored_events.tobytes() == events.tobytes()
+        assert restored_changes.tobytes() == changes.tobytes()
+
+    def test_snapshot_holds_no_classes(self, store) -> None:
+        """Test that a snapshot is plain data, independent of class names."""
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 25)
+        store.commit_all()
+        data = store.snapshot_path("table-1").read_bytes()[SNAPSHOT_HEADER.size:]
+        opcodes = {op.name for op, _, _ in pickletools.genops(data)}
+        assert not opcodes & {"GLOBAL", "STACK_GLOBAL", "REDUCE", "INST", "OBJ", "NEWOBJ"}
+
+    @pytest.mark.parametrize("snapshot_every", [50, 2], ids=["replayed", "snapshot"])
+    def test_clock_fits_are_recovered(self, tmp_path, snapshot_every) -> None:
+        """Test that a session's clock alignment survives recovery, from records or a snapshot."""
+        store = JournalStore(str(tmp_path), fsync=False, snapshot_every=snapshot_every)
+        engine = store.open_engine("table-1")
+        for i in range(12):
+            engine.observe_clock("audio", i * 0.5, 1000.0 + i * 0.5 * 1.0001)
+        engine.observe_clock("audio", 6.0, 2000.0)  # rejected outlier
+        store.commit_all()
+
+        recovered, _, _ = store.recover("table-1")
+        fit, restored = engine.clock.fit("audio"), recovered.clock.fit("audio")
+        assert (restored.samples, restored.rejected) == (fit.samples, fit.rejected) == (12, 1)
+        assert recovered.clock.align("audio", 7.0) == engine.clock.align("audio", 7.0)
+
+    def test_torn_record_is_truncated(self, store) -> None:
+        """Test that a partial trailing record from a crash is dropped."""
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 2)
+        store.commit_all()
+        path = store.log_path("table-1", 0)
+        with open(path, "ab") as f:
+            f.write(b"\x00" * 7)
+
+        recovered, _, replayed = store.recover("table-1")
+        assert replayed == 4
+        assert _status(recovered) == _status(engine)
+        assert path.stat().st_size == 4 * wire.FRAME.size
+
+    def test_session_ids_do_not_collide(self, store) -> None:
+        """Test that ids sharing a prefix or containing separators stay apart."""
+        a = store.open_engine("a")
+        ab = store.open_engine("a.b/c")
+        _rally(a, 0.0, 3)
+        ab.process_vision(0.0, 0.5, 0.5, 0.9)
+        store.commit_all()
+        store.drop("a.b/c")
+
+        recovered, _, _ = store.recover("a")
+        assert recovered.tracker.rally_count == 3
+        assert store.recover("a.b/c")[0].tracker.state == RallyState.IDLE
+
+    def test_recovery_is_fast(self, tmp_path) -> None:
+        """Test that a long session recovers without a full replay."""
+        store = JournalStore(str(tmp_path), fsync=False, snapshot_every=2_000)
+        engine = store.open_engine("table-1")
+        _rally(engine, 0.0, 50_000)
+        store.close()
+
+        start = time.perf_counter()
+        recovered, _, replayed = store.recover("table-1")
+        elapsed = time.perf_counter() - start
+        assert replayed < 2_000
+        assert _status(recovered) == _status(engine)
+        assert elapsed < 0.5
+
+
+class TestJournaledRegistry:
+    """Test the registry restoring evicted sessions from the journal."""
+
+    def test_evicted_session_is_restored(self, tmp_path) -> None:
+        """Test that a session dropped from memory comes back intact."""
+        store = JournalStore(str(tmp_path), fsync=False)
+        registry = SessionRegistry(
+            FusionConfig(), max_sessions=1, engine_factory=store.open_engine, on_remove=store.release
+        )
+        _rally(registry.get("t1"), 0.0, 4)
+        registry.get("t2")  # evicts t1
+        assert "t1" not in registry
+
+        engine = registry.get("t1")
+        assert isinstance(engine, JournaledEngine)
+        assert engine.tracker.rally_count == 4
+
+    def test_released_session_is_reopened_intact(self, tmp_path) -> None:
+        """Test that reopening finishes a close still queued for the commit thread."""
+        store = JournalStore(str(tmp_path), fsync=False, commit_interval_s=60)
+        store.start()
+        engine = store.open_engine("t1")
+        _rally(engine, 0.0, 3)
+        store.release("t1")
+        assert not store.log_path("t1", 0).exists()  # left to the commit thread
+
+        assert store.open_engine("t1").tracker.rally_count == 3
+        store.close()
+
+
+def _post(client: httpx.AsyncClient, session_id: str, ts: float):
+    return client.post(
+        f"/score/{session_id}/vision", json={"timestamp": ts, "x": 0.5, "y": 0.5, "confidence": 0.9}
+    )
+
+
+async def _timed(request) -> float:
+    start = time.perf_counter()
+    response = await request
+    assert response.status_code == 200
+    return time.perf_counter() - start
+
+
+class TestJournaledApi:
+    """Test that journal I/O for one session does not stall the others."""
+
+    @pytest.fixture
+    def journaled(self, tmp_path, monkeypatch) -> JournalStore:
+        """Run the Score API with a journal store in `tmp_path`."""
+        store = JournalStore(str(tmp_path))
+        monkeypatch.setattr(score_api, "journal", store)
+        score_api.registry.clear()
+        yield store
+        score_api.registry.clear()
+        store.close()
+
+    def test_recovery_runs_off_the_loop(self, journaled, monkeypatch) -> None:
+        """Test that a session being recovered from disk does not hold up another's ingest."""
+        gate = threading.Event()
+        recover = journaled.recover
+
+        def slow_recover(session_id: str, config=None):
+            if session_id == "cold":
+                gate.wait(2.0)
+            return recover(session_id, config)
+
+        monkeypatch.setattr(journaled, "recover", slow_recover)
+        score_api.registry.get("hot")
+
+        async def run() -> float:
+            transport = httpx.ASGITransport(app=score_api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                cold = asyncio.ensure_future(_post(client, "cold", 1.0))
+                await asyncio.sleep(0.05)
+                elapsed = await _timed(_post(client, "hot", 1.0))
+                gate.set()
+                assert (await cold).status_code == 200
+                return elapsed
+
+        assert asyncio.run(run()) < 1.0
+        assert score_api.registry.get("cold").tracker.last_ball_ts == 1.0
+
+    def test_eviction_does_not_wait_for_fsync(self, journaled, monkeypatch) -> None:
+        """Test that evicting a session leaves its final commit to the commit thread."""
+        gate = threading.Event()
+        monkeypatch.setattr(journal_module.os, "fsync", lambda fd: gate.wait(2.0))
+        now = [0.0]
+        monkeypatch.setattr(score_api.registry, "_clock", lambda: now[0])
+        monkeypatch.setattr(score_api.registry, "idle_ttl_s", 15.0)
+        journaled.start()
+
+        async def run() -> float:
+            transport = httpx.ASGITransport(app=score_api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await _timed(_post(client, "idle", 1.0))
+                now[0] = 10.0
+                await _timed(_post(client, "hot", 1.0))
+                await asyncio.sleep(0.05)  # the commit thread is now stuck in fsync
+                now[0] = 20.0  # "idle" has expired; this request evicts it
+                elapsed = await _timed(_post(client, "hot", 2.0))
+                gate.set()
+                return elapsed
+
+        assert asyncio.run(run()) < 1.0
+        assert "idle" not in score_api.registry
+
+    def test_sessions_use_registry_config(self, journaled, monkeypatch) -> None:
+        """Test that journaled sessions run with the registry's config, as unjournaled ones do."""
+        config = FusionConfig(reorder_lateness_ms=50)
+        monkeypatch.setattr(score_api.registry, "config", config)
+        engine = score_api.registry.get("t1")
+        assert isinstance(engine, JournaledEngine)
+        assert engine.config is config and engine.reorder is not None
@@ -0,0 +1,198 @@
+"""Tests for the timer-wheel tick scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api
+from src.api.scheduler import TickScheduler, TimerWheel
+from src.api.sessions import SessionRegistry
+from src.api.writer import SessionWriters
+from src.fusion.rally_tracker import RallyState
+
+
+class TestTimerWheel:
+    """Test timer placement, cascading and cancellation."""
+
+    def test_expires_at_deadline(self) -> None:
+        """Test that a timer fires on the first advance past its deadline."""
+        wheel = TimerWheel(resolution_s=0.01, slots=8, levels=3)
+        wheel.schedule("a", 0.05)
+        assert wheel.advance(0.04) == []
+        assert wheel.advance(0.05) == ["a"]
+        assert len(wheel) == 0
+
+    def test_cascades_from_higher_levels(self) -> None:
+        """Test that timers beyond level 0 fire at the right tick."""
+        wheel = TimerWheel(resolution_s=1.0, slots=4, levels=3)
+        deadlines = {f"t{i}": float(i) for i in range(1, 40)}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+        fired = {}
+        for now in range(1, 41):
+            for key in wheel.advance(float(now)):
+                fired[key] = now
+        assert fired == {key: int(d) for key, d in deadlines.items()}
+
+    def test_beyond_range_is_parked(self) -> None:
+        """Test that deadlines past the wheel's span still fire on time."""
+        wheel = TimerWheel(resolution_s=1.0, slots=4, levels=2)
+        wheel.schedule("far", 50.0)
+        assert wheel.advance(49.0) == []
+        assert wheel.advance(50.0) == ["far"]
+
+    def test_cancel_and_reschedule(self) -> None:
+        """Test that a key holds a single timer."""
+        wheel = TimerWheel(resolution_s=0.01, slots=8, levels=3)
+        wheel.schedule("a", 0.05)
+        wheel.schedule("a", 0.5)
+        assert wheel.advance(0.1) == []
+        assert wheel.cancel("a")
+        assert wheel.advance(1.0) == []
+        assert not wheel.cancel("a")
+
+    def test_past_deadline_fires_next_tick(self) -> None:
+        """Test that an already-expired deadline is not lost."""
+        wheel = TimerWheel(resolution_s=0.01, start=10.0)
+        wheel.schedule("late", 1.0)
+        assert wheel.advance(10.01) == ["late"]
+
+
+class TestTickScheduler:
+    """Test session ticking driven by the wheel."""
+
+    def _play(self, registry: SessionRegistry, session_id: str, ts: float) -> None:
+        engine = registry.get(session_id)
+        engine.process_vision(ts, 0.5, 0.5, 0.9)
+
+    def test_idle_sessions_are_not_armed(self) -> None:
+        """Test that only in-play sessions get a timer."""
+        registry = SessionRegistry()
+        scheduler = TickScheduler(registry, clock=lambda: 0.0)
+        registry.get("idle")
+        scheduler.arm("idle")
+        scheduler.arm("missing")
+        assert len(scheduler) == 0
+
+    def test_timeout_ends_rally_and_reports(self) -> None:
+        """Test that an expired vision timeout ends the rally once."""
+        registry = SessionRegistry()
+        changes = []
+        scheduler = TickScheduler(
+            registry, on_status=lambda sid, status: changes.append((sid, status.state)), clock=lambda: 0.0
+        )
+        self._play(registry, "t1", 0.0)
+        scheduler.arm("t1")
+        assert scheduler.armed() == {"t1"}
+
+        assert scheduler.fire_due(0.4) == []
+        assert scheduler.fire_due(0.51) == ["t1"]
+        assert changes == [("t1", RallyState.ENDED)]
+        assert len(scheduler) == 0
+
+    def test_late_events_push_the_deadline_back(self) -> None:
+        """Test that a lazily armed timer re-arms instead of ending early."""
+        registry = SessionRegistry()
+        changes = []
+        now = [0.0]
+        scheduler = TickScheduler(registry, on_status=lambda sid, s: changes.append(s.state), clock=lambda: now[0])
+        self._play(registry, "t1", 0.0)
+        scheduler.arm("t1")
+        now[0] = 0.4
+        self._play(registry, "t1", 0.4)
+        scheduler.arm("t1")
+
+        assert scheduler.fire_due(0.55) == ["t1"]
+        assert changes == []
+        assert scheduler.armed() == {"t1"}
+        scheduler.fire_due(0.95)
+        assert changes == [RallyState.ENDED]
+
+    def test_timeouts_follow_the_event_clock(self) -> None:
+        """Test that sessions not stamped in epoch seconds time out after the timeout, not at once."""
+        registry = SessionRegistry()
+        changes = []
+        scheduler = TickScheduler(
+            registry, on_status=lambda sid, s: changes.append((sid, s.state)), clock=lambda: 1000.0
+        )
+        self._play(registry, "sample-clock", 3.2)
+        self._play(registry, "epoch", 1.7e9)
+        scheduler.arm("sample-clock")
+        scheduler.arm("epoch")
+        assert scheduler.event_now("sample-clock", 1000.3) == pytest.approx(3.5)
+        assert scheduler.fire_due(1000.4) == []
+        assert sorted(scheduler.fire_due(1000.51)) == ["epoch", "sample-clock"]
+        assert sorted(changes) == [("epoch", RallyState.ENDED), ("sample-clock", RallyState.ENDED)]
+        assert registry.peek("sample-clock").tracker.get_status().state == RallyState.ENDED
+
+    def test_ticks_submitted_as_session_writes(self) -> None:
+        """Test that run() applies ticks through the session's writer queue."""
+        registry = SessionRegistry()
+        writers = SessionWriters()
+        submitted = []
+
+        async def submit(session_id, fn, *args):
+            submitted.append(session_id)
+            return await writers.submit(session_id, fn, *args)
+
+        scheduler = TickScheduler(registry, resolution_s=0.005, submit=submit)
+
+        async def main() -> None:
+            writers.bind(asyncio.get_running_loop())
+            scheduler.start()
+            self._play(registry, "t1", 0.0)
+            scheduler.arm("t1")
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if registry.peek("t1").tracker.state == RallyState.ENDED:
+                    break
+            await scheduler.stop()
+
+        asyncio.run(main())
+        assert registry.peek("t1").tracker.state == RallyState.ENDED
+        assert submitted and set(submitted) == {"t1"}
+
+    def test_scales_to_many_sessions(self) -> None:
+        """Test that thousands of sessions time out from one advance."""
+        registry = SessionRegistry(max_sessions=5000)
+        scheduler = TickScheduler(registry, clock=lambda: 0.0)
+        for i in range(5000):
+            self._play(registry, f"t{i}", (i % 50) / 100)
+            scheduler.arm(f"t{i}")
+        assert len(scheduler.fire_due(1.1)) == 5000
+        assert all(registry.peek(f"t{i}").tracker.state == RallyState.ENDED for i in range(5000))
+
+
+class TestScoreApiScheduler:
+    """Test that the running app pushes timeouts without client ticks."""
+
+    @pytest.fixture
+    def live_client(self):
+        """Run the app with its lifespan so the scheduler task is active."""
+        score_api.registry.clear()
+        with TestClient(score_api.app) as client:
+            yield client
+
+    def test_timeout_pushed_to_subscribers(self, live_client) -> None:
+        """Test that a rally ends and is pushed with no tick frames sent."""
+        with live_client.websocket_connect("/score/table-1/ws") as ws:
+            ws.receive_json()
+            ws.send_json({"type": "vision", "timestamp": time.time(), "x": 0.5, "y": 0.5, "confidence": 0.9})
+            assert ws.receive_json()["state"] == "IN_PLAY"
+            message = ws.receive_json()
+        assert message["state"] == "ENDED"
+
+    def test_relative_timestamps_do_not_end_rally_early(self, live_client) -> None:
+        """Test that a session stamped from t=0 stays in play until its timeout elapses."""
+        for ts in (0.0, 0.1):
+            live_client.post("/score/t0/vision", json={"timestamp": ts, "x": 0.5, "y": 0.5, "confidence": 0.9})
+        time.sleep(0.15)
+        assert live_client.get("/score/t0/state").json()["state"] == "IN_PLAY"
+        deadline = time.time() + 3
+        while live_client.get("/score/t0/state").json()["state"] != "ENDED":
+            assert time.time() < deadline
+            time.sleep(0.05)
@@ -0,0 +1,83 @@
+"""Tests for the multi-table session registry and per-session routes."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api
+from src.api.sessions import SessionRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def score_client() -> TestClient:
+    """Create a test client with an empty session registry."""
+    score_api.registry.clear()
+    return TestClient(score_api.app)
+
+
+class TestSessionRegistry:
+    """Test lazy creation and LRU/TTL eviction."""
+
+    def test_get_creates_lazily_and_reuses(self) -> None:
+        """Test that the same id maps to the same engine."""
+        registry = SessionRegistry()
+        engine = registry.get("t1")
+        assert registry.get("t1") is engine
+        assert registry.get("t2") is not engine
+        assert len(registry) == 2
+
+    def test_lru_eviction_at_capacity(self) -> None:
+        """Test that the least recently used session is evicted first."""
+        registry = SessionRegistry(max_sessions=2)
+        registry.get("t1")
+        registry.get("t2")
+        registry.get("t1")
+        registry.get("t3")
+        assert registry.session_ids() == ["t1", "t3"]
+
+    def test_idle_sessions_expire(self) -> None:
+        """Test that sessions idle beyond the TTL are evicted."""
+        clock = FakeClock()
+        registry = SessionRegistry(idle_ttl_s=10.0, clock=clock)
+        registry.get("t1")
+        clock.now = 5.0
+        registry.get("t2")
+        clock.now = 12.0
+        assert registry.evict_idle() == ["t1"]
+        assert "t2" in registry
+        assert registry.peek("t1") is None
+
+
+class TestSessionRoutes:
+    """Test that per-session routes are isolated from each other."""
+
+    def test_sessions_are_independent(self, score_client) -> None:
+        """Test that events for one table do not affect another."""
+        detection = {"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}
+        response = score_client.post("/score/table-1/vision", json=detection)
+        assert response.status_code == 200
+        assert response.json()["state"] == "IN_PLAY"
+
+        assert score_client.get("/score/table-2/state").json()["state"] == "IDLE"
+        assert score_client.get("/score/state").json()["state"] == "IDLE"
+        assert score_client.get("/score/table-1/state").json()["state"] == "IN_PLAY"
+
+    def test_session_tick_and_delete(self, score_client) -> None:
+        """Test ticking a session and deleting it."""
+        detection = {"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}
+        score_client.post("/score/table-1/vision", json=detection)
+        tick = score_client.post("/score/table-1/tick", params={"timestamp": 1.0})
+        assert tick.json()["state"] == "ENDED"
+
+        assert score_client.delete("/score/table-1").json() == {"ok": True}
+        assert score_client.delete("/score/table-1").json() == {"ok": False}
+        assert score_client.get("/score/table-1/state").json()["state"] == "IDLE"
@@ -0,0 +1,91 @@
+"""Tests for the Score API WebSocket stream."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import score_api, wire
+
+
+@pytest.fixture
+def score_client() -> TestClient:
+    """Create a test client with an empty session registry."""
+    score_api.registry.clear()
+    return TestClient(score_api.app)
+
+
+class TestScoreStream:
+    """Test streaming ingestion and status pushes."""
+
+    def test_initial_status_on_connect(self, score_client) -> None:
+        """Test that a new subscriber receives the current status."""
+        with score_client.websocket_connect("/score/table-1/ws") as ws:
+            message = ws.receive_json()
+        assert message["type"] == "status"
+        assert message["state"] == "IDLE"
+        assert message["rally_count"] == 0
+
+    def test_pushes_only_on_change(self, score_client) -> None:
+        """Test that frames which do not change state produce no push."""
+        with score_client.websocket_connect("/score/table-1/ws") as ws:
+            ws.receive_json()
+            # Low confidence: ignored, no push.
+            ws.send_json({"type": "vision", "timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.1})
+            # Enters play: pushed.
+            ws.send_json({"type": "vision", "timestamp": 0.1, "x": 0.5, "y": 0.5, "confidence": 0.9})
+            message = ws.receive_json()
+            assert message["state"] == "IN_PLAY"
+            assert message["last_ball_ts"] == 0.1
+
+    def test_binary_frames(self, score_client) -> None:
+        """Test that concatenated binary records are applied in order."""
+        frames = b"".join(
+            [
+                wire.encode_frame(wire.KIND_VISION, 0.0, 0.5, 0.5, 0.9),
+                wire.encode_frame(wire.KIND_VISION, 0.3, 0.5, 0.5, 0.9),
+                wire.encode_frame(wire.KIND_TICK, 5.0),
+            ]
+        )
+        with score_client.websocket_connect("/score/table-1/ws") as ws:
+            ws.receive_json()
+            ws.send_bytes(frames)
+            message = ws.receive_json()
+        assert message["state"] == "ENDED"
+        assert message["rally_count"] == 1
+
+    def test_other_subscribers_receive_pushes(self, score_client) -> None:
+        """Test that a viewer connection sees changes fed by another one."""
+        with score_client.websocket_connect("/score/table-1/ws") as viewer:
+            viewer.receive_json()
+            with score_client.websocket_connect("/score/table-1/ws") as feeder:
+                feeder.receive_json()
+                feeder.send_bytes(wire.encode_frame(wire.KIND_VISION, None, 0.5, 0.5, 0.9))
+                assert feeder.receive_json()["state"] == "IN_PLAY"
+            assert viewer.receive_json()["state"] == "IN_PLAY"
+
+    def test_http_ingest_and_reset_are_pushed(self) -> None:
+        """Test that a WebSocket subscriber sees changes made over HTTP."""
+        score_api.registry.clear()
+        with TestClient(score_api.app) as client:
+            with client.websocket_connect("/score/table-1/ws") as ws:
+                assert ws.receive_json()["state"] == "IDLE"
+                body = {"timestamp": 0.0, "x": 0.5, "y": 0.5, "confidence": 0.9}
+                client.post("/score/table-1/vision", json=body)
+                message = ws.receive_json()
+                assert (message["state"], message["rally_count"]) == ("IN_PLAY", 0)
+                client.post("/score/table-1/vision", json={**body, "timestamp": 0.3})
+                message = ws.receive_json()
+                assert (message["state"], message["rally_count"]) == ("IN_PLAY", 1)
+                client.post("/score/table-1/reset")
+                message = ws.receive_json()
+                assert (message["state"], message["rally_count"]) == ("IDLE", 0)
+
+    def test_malformed_frame_reports_error(self, score_client) -> None:
+        """Test that bad frames are reported without closing the stream."""
+        with score_client.websocket_connect("/score/table-1/ws") as ws:
+            ws.receive_json()
+            ws.send_bytes(b"\x00\x01")
+            assert ws.receive_json()["type"] == "error"
+            ws.send_json({"type": "bogus"})
+            assert ws.receive_json()["type"] == "error"
@@ -0,0 +1,88 @@
+"""Tests for the per-session single-writer queues."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from src.api.writer import QueueFull, SessionWriters
+
+
+class TestSessionWriters:
+    """Test write ordering and marshalling onto the loop."""
+
+    def test_inline_when_idle(self) -> None:
+        """Test that a write with nothing queued runs immediately on the loop."""
+        writers = SessionWriters()
+
+        async def main() -> int:
+            return await writers.submit("s", lambda: threading.get_ident())
+
+        assert asyncio.run(main()) == threading.get_ident()
+
+    def test_thread_writes_run_on_loop_in_order(self) -> None:
+        """Test that writes from threads and coroutines apply serially in FIFO order."""
+        writers = SessionWriters()
+        applied: List[int] = []
+        threads: List[int] = []
+
+        def write(value: int) -> int:
+            applied.append(value)
+            threads.append(threading.get_ident())
+            return value
+
+        async def main() -> None:
+            writers.bind(asyncio.get_running_loop())
+            results = await asyncio.gather(
+                *(asyncio.to_thread(writers.submit_threadsafe, "s", write, i) for i in range(50))
+            )
+            assert sorted(results) == list(range(50))
+            # Queue a write behind pending thread writes; it must run after them.
+            writers._enqueue("s", (write, (100,), asyncio.get_running_loop().create_future()))
+            assert await writers.submit("s", write, 101) == 101
+
+        asyncio.run(main())
+        assert sorted(applied[:50]) == list(range(50))
+        assert applied[50:] == [100, 101]
+        assert set(threads) == {threads[0]}
+        assert writers.pending("s") == 0
+
+    def test_errors_reach_submitter(self) -> None:
+        """Test that an exception in a queued write is raised to its caller."""
+        writers = SessionWriters()
+
+        def fail() -> None:
+            raise ValueError("bad frame")
+
+        async def main() -> None:
+            writers.bind(asyncio.get_running_loop())
+            with pytest.raises(ValueError):
+                await asyncio.to_thread(writers.submit_threadsafe, "s", fail)
+
+        asyncio.run(main())
+
+    def test_queue_bound(self) -> None:
+        """Test that a full session queue rejects further writes."""
+        writers = SessionWriters(max_pending=2)
+
+        async def main() -> None:
+            loop = asyncio.get_running_loop()
+            writers.bind(loop)
+            futures = [loop.create_future() for _ in range(3)]
+            writers._enqueue("s", (lambda: None, (), futures[0]))
+            writers._enqueue("s", (lambda: None, (), futures[1]))
+            writers._enqueue("s", (lambda: None, (), futures[2]))
+            with pytest.raises(QueueFull):
+                await futures[2]
+            with pytest.raises(QueueFull):
+                await writers.submit("s", lambda: None)
+            await asyncio.gather(*futures[:2])
+
+        asyncio.run(main())
+
+    def test_threadsafe_without_loop_runs_directly(self) -> None:
+        """Test that writes before startup are not stranded."""
+        assert SessionWriters().submit_threadsafe("s", lambda x: x + 1, 1) == 2
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+qa_sweep.py - FusionConfig parameter sweep for LockN Score
+
+Replays recorded vision/audio event logs through the rally state machine
+for every candidate FusionConfig in a grid or random search, scores each
+candidate against ground truth rally counts with the qa_metrics score
+accuracy metrics, and writes a ranked leaderboard.
+
+Candidates are evaluated across a process pool. Results are cached per
+(config, dataset) pair so re-running an extended sweep only evaluates the
+new candidates.
+
+Event log format (a JSON file holding one clip or a list of clips, or a
+directory of such files):
+
+    {
+      "clip_id": "match-01-rally-07",
+      "ground_truth_rally_count": 12,
+      "vision": [[timestamp, x, y, confidence], ...],
+      "audio": [[timestamp, confidence], ...],
+      "ticks": [timestamp, ...]
+    }
+
+Search space format (JSON): each key is a FusionConfig field. A list gives
+discrete candidates (grid and random search); an object with "min"/"max"
+gives a uniform range (random search only, integer if both bounds are).
+
+    {
+      "audio_window_ms": [80, 120, 160],
+      "min_bounce_interval_ms": {"min": 120, "max": 260},
+      "table_bbox": [[0.1, 0.2, 0.9, 0.8], [0.05, 0.15, 0.95, 0.85]]
+    }
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from qa_metrics import compute_score_accuracy
+
+BASE_DIR = Path(__file__).parent
+SCORE_DIR = BASE_DIR / "lockn-score"
+if str(SCORE_DIR) not in sys.path:
+    sys.path.insert(0, str(SCORE_DIR))
+
+from src.fusion.config import FusionConfig  # noqa: E402
+from src.fusion.replay import replay  # noqa: E402
+
+DEFAULT_OUTPUT_DIR = BASE_DIR / "tests" / "qa" / "results" / "sweep"
+CONFIG_FIELDS = {f.name for f in fields(FusionConfig)}
+
+# Per-worker clip arrays, populated by _init_worker.
+_CLIPS: list[dict[str, Any]] = []
+
+
+def load_event_logs(path: str) -> list[dict[str, Any]]:
+    """Load clips from a JSON file or every *.json file in a directory."""
+    source = Path(path)
+    files = sorted(source.glob("*.json")) if source.is_dir() else [source]
+    clips: list[dict[str, Any]] = []
+    for file in files:
+        with open(file, "r") as f:
+            data = json.load(f)
+        clips.extend([data] if isinstance(data, dict) else data)
+    for clip in clips:
+        if "ground_truth_rally_count" not in clip:
+            raise ValueError(f"clip {clip.get('clip_id', '?')} has no ground_truth_rally_count")
+    return clips
+
+
+def dataset_fingerprint(clips: list[dict[str, Any]]) -> str:
+    """Stable hash of the event logs, used to key the result cache."""
+    payload = json.dumps(clips, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _validate_space(space: dict[str, Any]) -> None:
+    unknown = set(space) - CONFIG_FIELDS
+    if unknown:
+        raise ValueError(f"unknown FusionConfig fields: {sorted(unknown)}")
+
+
+def grid_candidates(space: dict[str, Any]) -> list[dict[str, Any]]:
+    """Cartesian product of every listed value."""
+    _validate_space(space)
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"grid search needs a list of values for {name}")
+    names = sorted(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_candidates(space: dict[str, Any], samples: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Independently sample each parameter `samples` times."""
+    _validate_space(space)
+    rng = random.Random(seed)
+    names = sorted(space)
+    candidates = []
+    for _ in range(samples):
+        params = {}
+        for name in names:
+            spec = space[name]
+            if isinstance(spec, list):
+                params[name] = rng.choice(spec)
+            elif isinstance(spec.get("min"), int) and isinstance(spec.get("max"), int):
+                params[name] = rng.randint(spec["min"], spec["max"])
+            else:
+                params[name] = rng.uniform(spec["min"], spec["max"])
+        candidates.append(params)
+    return candidates
+
+
+def make_config(params: dict[str, Any]) -> FusionConfig:
+    """Build a FusionConfig from JSON-style parameters."""
+    params = dict(params)
+    if "table_bbox" in params:
+        params["table_bbox"] = tuple(params["table_bbox"])
+    if params.get("table_polygon") is not None:
+        params["table_polygon"] = tuple(tuple(p) for p in params["table_polygon"])
+    if params.get("table_homography") is not None:
+        params["table_homography"] = tuple(params["table_homography"])
+    return FusionConfig(**params)
+
+
+def _clip_arrays(clip: dict[str, Any]) -> dict[str, Any]:
+    vision = np.asarray(clip.get("vision") or np.empty((0, 4)), dtype=np.float64).reshape(-1, 4)
+    audio = np.asarray(clip.get("audio") or np.empty((0, 2)), dtype=np.float64).reshape(-1, 2)
+    return {
+        "clip_id": clip.get("clip_id", "unknown"),
+        "ground_truth": clip["ground_truth_rally_count"],
+        "vision": vision.T.copy(),
+        "audio": audio.T.copy(),
+        "ticks": np.asarray(clip.get("ticks") or [], dtype=np.float64),
+    }
+
+
+def _init_worker(clips: list[dict[str, Any]]) -> None:
+    global _CLIPS
+    _CLIPS = [_clip_arrays(clip) for clip in clips]
+
+
+def evaluate_config(params: dict[str, Any]) -> dict[str, Any]:
+    """Score one candidate against every loaded clip."""
+    config = make_config(params)
+    per_clip = []
+    for clip in _CLIPS:
+        result = replay(config, *clip["vision"], *clip["audio"], tick_ts=clip["ticks"])
+        metrics = compute_score_accuracy(result.status.rally_count, clip["ground_truth"])
+        metrics["clip_id"] = clip["clip_id"]
+        per_clip.append(metrics)
+
+    abs_errors = [m["absolute_error"] for m in per_clip]
+    return {
+        "params": params,
+        "mean_absolute_error": float(np.mean(abs_errors)) if abs_errors else 0.0,
+        "mean_error_percent": float(np.mean([m["error_percent"] for m in per_clip])) if per_clip else 0.0,
+        "exact_match_rate": float(np.mean([e == 0 for e in abs_errors])) if abs_errors else 0.0,
+        "clips": per_clip,
+    }
+
+
+def _cache_key(fingerprint: str, params: dict[str, Any]) -> str:
+    payload = fingerprint + json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def rank_results(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Sort by mean absolute error, then exact-match rate (best first)."""
+    ranked = sorted(results, key=lambda r: (r["mean_absolute_error"], -r["exact_match_rate"]))
+    for rank, result in enumerate(ranked, start=1):
+        result["rank"] = rank
+    return ranked
+
+
+def run_sweep(clips: list[dict[str, Any]],
+              candidates: list[dict[str, Any]],
+              workers: int = 4,
+              cache_dir: Path | None = None) -> list[dict[str, Any]]:
+    """Evaluate candidates (using the cache where possible) and rank them."""
+    fingerprint = dataset_fingerprint(clips)
+    results: list[dict[str, Any]] = []
+    pending: list[tuple[str, dict[str, Any]]] = []
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    for params in candidates:
+        key = _cache_key(fingerprint, params)
+        cached = cache_dir / f"{key}.json" if cache_dir is not None else None
+        if cached is not None and cached.exists():
+            with open(cached, "r") as f:
+                results.append(json.load(f))
+        else:
+            pending.append((key, params))
+
+    if pending:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(clips,)) as pool:
+                evaluated = list(pool.map(evaluate_config, [p for _, p in pending]))
+        else:
+            _init_worker(clips)
+            evaluated = [evaluate_config(p) for _, p in pending]
+        for (key, _), result in zip(pending, evaluated):
+            if cache_dir is not None:
+                with open(cache_dir / f"{key}.json", "w") as f:
+                    json.dump(result, f)
+            results.append(result)
+
+    return rank_results(results)
+
+
+def write_leaderboard(ranked: list[dict[str, Any]], output_dir: Path, top: int = 20) -> tuple[Path, Path]:
+    """Write leaderboard.json (all results) and leaderboard.md (top N)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / "leaderboard.json"
+    with open(json_path, "w") as f:
+        json.dump(ranked, f, indent=2)
+
+    lines = [
+        "# FusionConfig Sweep Leaderboard",
+        "",
+        "| Rank | MAE | Exact | Error % | Params |",
+        "|------|-----|-------|---------|--------|",
+    ]
+    for result in ranked[:top]:
+        lines.append(
+            f"| {result['rank']} | {result['mean_absolute_error']:.3f} "
+            f"| {result['exact_match_rate']:.1%} | {result['mean_error_percent']:.1f} "
+            f"| `{json.dumps(result['params'], sort_keys=True)}` |"
+        )
+    md_path = output_dir / "leaderboard.md"
+    md_path.write_text("\n".join(lines) + "\n")
+    return json_path, md_path
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="LockN Score FusionConfig Parameter Sweep",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python qa_sweep.py logs/ space.json                         # Grid search
+  python qa_sweep.py logs/ space.json --search random --samples 500 --workers 8
+        """
+    )
+    parser.add_argument("event_logs", help="Event log JSON file or directory of JSON files")
+    parser.add_argument("search_space", help="Search space JSON file")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid",
+                        help="Search strategy (default: grid)")
+    parser.add_argument("--samples", type=int, default=100,
+                        help="Number of random-search candidates (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="Random-search seed (default: 0)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of worker processes (default: 4)")
+    parser.add_argument("--output-dir", type=str, default=str(DEFAULT_OUTPUT_DIR),
+                        help=f"Leaderboard directory (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the per-config result cache")
+    parser.add_argument("--top", type=int, default=20, help="Rows in the markdown leaderboard")
+
+    args = parser.parse_args()
+
+    clips = load_event_logs(args.event_logs)
+    with open(args.search_space, "r") as f:
+        space = json.load(f)
+    if args.search == "grid":
+        candidates = grid_candidates(space)
+    else:
+        candidates = random_candidates(space, args.samples, args.seed)
+    print(f"Evaluating {len(candidates)} configs on {len(clips)} clips")
+
+    output_dir = Path(args.output_dir)
+    cache_dir = None if args.no_cache else output_dir / "cache"
+    ranked = run_sweep(clips, candidates, workers=args.workers, cache_dir=cache_dir)
+    json_path, md_path = write_leaderboard(ranked, output_dir, top=args.top)
+
+    best = ranked[0] if ranked else None
+    if best:
+        print(f"Best MAE {best['mean_absolute_error']:.3f} "
+              f"(exact {best['exact_match_rate']:.1%}): {json.dumps(best['params'], sort_keys=True)}")
+    print(f"Leaderboard: {md_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+
+import qa_sweep
+
+
+def _clip(clip_id, bounce_times, ground_truth):
+    # Ball in the middle of the table, one detection per bounce.
+    vision = [[0.0, 0.5, 0.5, 0.9]] + [[t, 0.5, 0.5, 0.9] for t in bounce_times]
+    return {
+        "clip_id": clip_id,
+        "ground_truth_rally_count": ground_truth,
+        "vision": vision,
+        "audio": [],
+        "ticks": [],
+    }
+
+
+def _clips():
+    # Bounces 150ms apart: only counted when min_bounce_interval_ms <= 150.
+    return [
+        _clip("a", list(np.arange(1, 11) * 0.15), 10),
+        _clip("b", list(np.arange(1, 6) * 0.15), 5),
+    ]
+
+
+def test_grid_candidates_product():
+    space = {"audio_window_ms": [80, 120], "min_bounce_interval_ms": [100, 200, 300]}
+    candidates = qa_sweep.grid_candidates(space)
+    assert len(candidates) == 6
+    assert {"audio_window_ms": 80, "min_bounce_interval_ms": 300} in candidates
+
+
+def test_random_candidates_respect_ranges():
+    space = {"min_bounce_interval_ms": {"min": 100, "max": 200}, "audio_window_ms": [90]}
+    candidates = qa_sweep.random_candidates(space, samples=50, seed=3)
+    assert len(candidates) == 50
+    assert all(100 <= c["min_bounce_interval_ms"] <= 200 for c in candidates)
+    assert all(isinstance(c["min_bounce_interval_ms"], int) for c in candidates)
+    assert candidates == qa_sweep.random_candidates(space, samples=50, seed=3)
+
+
+def test_unknown_field_rejected():
+    try:
+        qa_sweep.grid_candidates({"not_a_field": [1]})
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+def test_sweep_ranks_and_caches(tmp_path):
+    candidates = qa_sweep.grid_candidates({"min_bounce_interval_ms": [300, 100, 200]})
+    cache_dir = tmp_path / "cache"
+
+    ranked = qa_sweep.run_sweep(_clips(), candidates, workers=1, cache_dir=cache_dir)
+    assert ranked[0]["params"] == {"min_bounce_interval_ms": 100}
+    assert ranked[0]["mean_absolute_error"] == 0.0
+    assert ranked[0]["exact_match_rate"] == 1.0
+    assert [r["rank"] for r in ranked] == [1, 2, 3]
+    assert len(list(cache_dir.glob("*.json"))) == 3
+
+    # A second run is served entirely from the cache.
+    for cached in cache_dir.glob("*.json"):
+        data = json.loads(cached.read_text())
+        data["mean_absolute_error"] = -1.0
+        cached.write_text(json.dumps(data))
+    again = qa_sweep.run_sweep(_clips(), candidates, workers=1, cache_dir=cache_dir)
+    assert all(r["mean_absolute_error"] == -1.0 for r in again)
+
+
+def test_sweep_process_pool_matches_serial(tmp_path):
+    candidates = qa_sweep.grid_candidates({"min_bounce_interval_ms": [100, 200]})
+    serial = qa_sweep.run_sweep(_clips(), candidates, workers=1)
+    parallel = qa_sweep.run_sweep(_clips(), candidates, workers=2)
+    assert serial == parallel
+
+    json_path, md_path = qa_sweep.write_leaderboard(parallel, tmp_path)
+    assert json.loads(json_path.read_text())[0]["rank"] == 1
+    assert "| 1 |" in md_path.read_text()